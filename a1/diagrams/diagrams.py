@@ -4,12 +4,24 @@
 # Usage:
 #   python diagrams.py
 #   python diagrams.py --benchmarks ../benchmarks
+#   python diagrams.py --engines life_par life_bit
+#   python diagrams.py --fusion life_tb
 #
 # Generates:
 #   time_N64.png, speedup_N64.png
 #   time_N1024.png, speedup_N1024.png
 #   time_N4096.png, speedup_N4096.png
 #   results_full.txt  (tab-separated, with Speedup column)
+#
+# Engines other than life_par read from benchmarks/<engine>/ and get an
+# _<engine> suffix on every output. With more than one engine,
+# compare_time_N*.png and compare_speedup_N*.png are written as well
+# (speedup is relative to the T1 time of the first engine).
+#
+# --fusion <engine> instead reads every benchmarks/<engine>/**/life_<T>_<N>.out
+# whose GameOfLife line carries a "K <k>" step-fusion factor (life_tb) and
+# writes fusion_N*.png (time vs K, one line per thread count) and
+# results_fusion.txt.
 
 from pathlib import Path
 import argparse
@@ -18,17 +30,30 @@ import re
 import matplotlib.pyplot as plt
 
 RE_TIME = re.compile(r"Time\s+([0-9]*\.?[0-9]+)")
+RE_FUSION = re.compile(r"Size\s+(\d+).*Time\s+([0-9]*\.?[0-9]+)\s+K\s+(\d+)")
+RE_OUT_NAME = re.compile(r"life_(\d+)_(\d+)\.out$")
 
 EXPECTED_N = [64, 1024, 4096]
 EXPECTED_THREADS = [1, 2, 4, 6, 8]
+DEFAULT_ENGINE = "life_par"
 
 def parse_args():
     default_bench = Path(__file__).resolve().parents[1] / "benchmarks"
     p = argparse.ArgumentParser(description="Plot time & speedup from Game of Life benchmarks and write results_full.txt")
     p.add_argument("--benchmarks", type=Path, default=default_bench,
                    help="Path to the 'benchmarks' directory (default: ../benchmarks)")
+    p.add_argument("--engines", nargs="+", default=[DEFAULT_ENGINE],
+                   help=f"Engines to plot; non-default ones live in benchmarks/<engine>/ (default: {DEFAULT_ENGINE})")
+    p.add_argument("--fusion", default=None, metavar="ENGINE",
+                   help="Plot time vs step-fusion factor K for a temporally blocked engine (e.g. life_tb)")
     return p.parse_args()
 
+def engine_dir(bench_root: Path, engine: str) -> Path:
+    return bench_root if engine == DEFAULT_ENGINE else bench_root / engine
+
+def engine_suffix(engine: str) -> str:
+    return "" if engine == DEFAULT_ENGINE else f"_{engine}"
+
 def fail_if_errs(bench_root: Path):
     offending = []
     for n in EXPECTED_N:
@@ -88,22 +113,22 @@ def collect_times(bench_root: Path):
             sys.exit(1)
     return results
 
-def plot_time(n: int, times_by_threads: dict, out_dir: Path):
+def plot_time(n: int, times_by_threads: dict, out_dir: Path, suffix: str = ""):
     threads = sorted(times_by_threads.keys())
     times = [times_by_threads[t] for t in threads]
     plt.figure()
-    plt.title(f"Time vs Threads (N={n})")
+    plt.title(f"Time vs Threads (N={n}{', ' + suffix[1:] if suffix else ''})")
     plt.xlabel("Threads")
     plt.ylabel("Time (s)")
     plt.plot(threads, times, marker="o")
     plt.xticks(threads)
     plt.grid(True, linestyle="--", linewidth=0.5)
-    out_path = out_dir / f"time_N{n}.png"
+    out_path = out_dir / f"time_N{n}{suffix}.png"
     plt.savefig(out_path, bbox_inches="tight", dpi=150)
     plt.close()
     print(f"Wrote {out_path}")
 
-def plot_speedup(n: int, times_by_threads: dict, out_dir: Path):
+def plot_speedup(n: int, times_by_threads: dict, out_dir: Path, suffix: str = ""):
     threads = sorted(times_by_threads.keys())
     t1 = times_by_threads.get(1)
     if t1 is None or t1 <= 0:
@@ -111,23 +136,117 @@ def plot_speedup(n: int, times_by_threads: dict, out_dir: Path):
         sys.exit(1)
     speedup = [t1 / times_by_threads[t] for t in threads]
     plt.figure()
-    plt.title(f"Speedup vs Threads (N={n})")
+    plt.title(f"Speedup vs Threads (N={n}{', ' + suffix[1:] if suffix else ''})")
     plt.xlabel("Threads")
     plt.ylabel("Speedup (T1 / Tthreads)")
     plt.plot(threads, speedup, marker="o")
     plt.xticks(threads)
     plt.grid(True, linestyle="--", linewidth=0.5)
-    out_path = out_dir / f"speedup_N{n}.png"
+    out_path = out_dir / f"speedup_N{n}{suffix}.png"
+    plt.savefig(out_path, bbox_inches="tight", dpi=150)
+    plt.close()
+    print(f"Wrote {out_path}")
+
+def plot_compare(n: int, results_by_engine: dict, out_dir: Path):
+    engines = list(results_by_engine.keys())
+    base_t1 = results_by_engine[engines[0]][n].get(1)
+    if base_t1 is None or base_t1 <= 0:
+        print(f"ERROR: Missing or invalid T1 time for N={n} ({engines[0]})", file=sys.stderr)
+        sys.exit(1)
+
+    plt.figure()
+    plt.title(f"Time vs Threads (N={n})")
+    plt.xlabel("Threads")
+    plt.ylabel("Time (s)")
+    for engine in engines:
+        threads = sorted(results_by_engine[engine][n].keys())
+        plt.plot(threads, [results_by_engine[engine][n][t] for t in threads], marker="o", label=engine)
+    plt.xticks(EXPECTED_THREADS)
+    plt.grid(True, linestyle="--", linewidth=0.5)
+    plt.legend()
+    out_path = out_dir / f"compare_time_N{n}.png"
     plt.savefig(out_path, bbox_inches="tight", dpi=150)
     plt.close()
     print(f"Wrote {out_path}")
 
-def write_results_table(results: dict, out_dir: Path):
+    plt.figure()
+    plt.title(f"Speedup vs Threads (N={n}, baseline {engines[0]} T1)")
+    plt.xlabel("Threads")
+    plt.ylabel(f"Speedup (T1[{engines[0]}] / Tthreads)")
+    for engine in engines:
+        threads = sorted(results_by_engine[engine][n].keys())
+        plt.plot(threads, [base_t1 / results_by_engine[engine][n][t] for t in threads], marker="o", label=engine)
+    plt.xticks(EXPECTED_THREADS)
+    plt.grid(True, linestyle="--", linewidth=0.5)
+    plt.legend()
+    out_path = out_dir / f"compare_speedup_N{n}.png"
+    plt.savefig(out_path, bbox_inches="tight", dpi=150)
+    plt.close()
+    print(f"Wrote {out_path}")
+
+def collect_fusion(engine_root: Path):
     """
-    Writes results_full.txt with columns:
+    Returns {N: {threads: {K: time}}} from every life_<T>_<N>.out below engine_root.
+    Runs with several tile sizes for the same K keep the fastest time.
+    """
+    results = {}
+    for outp in sorted(engine_root.rglob("life_*_*.out")):
+        m_name = RE_OUT_NAME.search(outp.name)
+        text = outp.read_text(errors="ignore").strip()
+        if not m_name or not text:
+            continue
+        m = RE_FUSION.search(text.splitlines()[0])
+        if not m:
+            print(f"WARNING: no step-fusion factor in {outp}, skipping", file=sys.stderr)
+            continue
+        n, tm, k = int(m.group(1)), float(m.group(2)), int(m.group(3))
+        t = int(m_name.group(1))
+        by_k = results.setdefault(n, {}).setdefault(t, {})
+        by_k[k] = min(tm, by_k.get(k, tm))
+    if not results:
+        print(f"ERROR: No step-fusion results found under {engine_root}", file=sys.stderr)
+        sys.exit(1)
+    return results
+
+def plot_fusion(n: int, times_by_threads: dict, out_dir: Path):
+    plt.figure()
+    plt.title(f"Time vs step-fusion factor K (N={n})")
+    plt.xlabel("K (steps per pass)")
+    plt.ylabel("Time (s)")
+    ks = set()
+    for t in sorted(times_by_threads.keys()):
+        by_k = times_by_threads[t]
+        k_sorted = sorted(by_k.keys())
+        ks.update(k_sorted)
+        plt.plot(k_sorted, [by_k[k] for k in k_sorted], marker="o", label=f"{t} threads")
+    plt.xticks(sorted(ks))
+    plt.grid(True, linestyle="--", linewidth=0.5)
+    plt.legend()
+    out_path = out_dir / f"fusion_N{n}.png"
+    plt.savefig(out_path, bbox_inches="tight", dpi=150)
+    plt.close()
+    print(f"Wrote {out_path}")
+
+def write_fusion_table(results: dict, out_dir: Path):
+    """
+    Writes results_fusion.txt with columns:
+    N\tThreads\tK\tTime (s)
+    """
+    out_path = out_dir / "results_fusion.txt"
+    lines = ["N\tThreads\tK\tTime (s)"]
+    for n in sorted(results.keys()):
+        for t in sorted(results[n].keys()):
+            for k in sorted(results[n][t].keys()):
+                lines.append(f"{n}\t{t}\t{k}\t{results[n][t][k]:.6f}")
+    out_path.write_text("\n".join(lines) + "\n")
+    print(f"Wrote {out_path}")
+
+def write_results_table(results: dict, out_dir: Path, suffix: str = ""):
+    """
+    Writes results_full<suffix>.txt with columns:
     N\tThreads\tTime (s)\tSpeedup
     """
-    out_path = out_dir / "results_full.txt"
+    out_path = out_dir / f"results_full{suffix}.txt"
     lines = ["N\tThreads\tTime (s)\tSpeedup"]
     for n in sorted(results.keys()):
         t1 = results[n][1]
@@ -145,20 +264,46 @@ def main():
         print(f"ERROR: Benchmarks directory not found: {bench_root}", file=sys.stderr)
         sys.exit(1)
 
-    # 1) Stop if any .err has content
-    fail_if_errs(bench_root)
+    out_dir = Path(__file__).resolve().parent
 
-    # 2) Parse .out files
-    results = collect_times(bench_root)
+    if args.fusion:
+        engine_root = engine_dir(bench_root, args.fusion)
+        if not engine_root.exists():
+            print(f"ERROR: Benchmarks directory not found: {engine_root}", file=sys.stderr)
+            sys.exit(1)
+        fusion = collect_fusion(engine_root)
+        for n in sorted(fusion.keys()):
+            plot_fusion(n, fusion[n], out_dir)
+        write_fusion_table(fusion, out_dir)
+        return
 
-    # 3) Plots
-    out_dir = Path(__file__).resolve().parent
-    for n in EXPECTED_N:
-        plot_time(n, results[n], out_dir)
-        plot_speedup(n, results[n], out_dir)
+    results_by_engine = {}
+    for engine in args.engines:
+        engine_root = engine_dir(bench_root, engine)
+        if not engine_root.exists():
+            print(f"ERROR: Benchmarks directory not found: {engine_root}", file=sys.stderr)
+            sys.exit(1)
+        suffix = engine_suffix(engine)
+
+        # 1) Stop if any .err has content
+        fail_if_errs(engine_root)
+
+        # 2) Parse .out files
+        results = collect_times(engine_root)
+        results_by_engine[engine] = results
+
+        # 3) Plots
+        for n in EXPECTED_N:
+            plot_time(n, results[n], out_dir, suffix)
+            plot_speedup(n, results[n], out_dir, suffix)
+
+        # 4) Table with speedup
+        write_results_table(results, out_dir, suffix)
 
-    # 4) Table with speedup
-    write_results_table(results, out_dir)
+    # 5) Engine comparison
+    if len(results_by_engine) > 1:
+        for n in EXPECTED_N:
+            plot_compare(n, results_by_engine, out_dir)
 
 if __name__ == "__main__":
     main()
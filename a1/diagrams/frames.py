@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# frames.py
+#
+# Reader for the frames.bin log written by life_par built with -DRECORD
+# (see ../frame_log.h for the layout).
+#
+# Usage:
+#   python frames.py ../frames.bin                       # summary
+#   python frames.py ../frames.bin --png 0 10 100        # out<step>.png for those steps
+#   python frames.py ../frames.bin --gif output.gif      # every frame, like FINALIZE did
+#   python frames.py ../frames.bin --gif output.gif --every 10 --scale 4
+#
+# The log is memory-mapped, so only the frames that are rendered are read.
+
+from pathlib import Path
+import argparse
+import sys
+import numpy as np
+from PIL import Image
+
+MAGIC = b"GOLFRAME"
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("n", "<u4"),
+                   ("row_bytes", "<u4"), ("reserved", "<u4")])
+RECORD_HEADER_BYTES = 8
+
+class FrameLog:
+    def __init__(self, path: Path):
+        self.path = path
+        self.mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if self.mm.size < HEADER.itemsize:
+            raise ValueError(f"{path} is too short for a frame log header")
+        hdr = self.mm[:HEADER.itemsize].view(HEADER)[0]
+        if hdr["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a frame log (magic {hdr['magic']!r})")
+        if hdr["version"] != 1:
+            raise ValueError(f"{path}: unsupported frame log version {hdr['version']}")
+        self.n = int(hdr["n"])
+        self.row_bytes = int(hdr["row_bytes"])
+        self.frame_bytes = self.n * self.row_bytes
+        rec = RECORD_HEADER_BYTES + self.frame_bytes
+        body = self.mm[HEADER.itemsize:]
+        # A trailing partial record (e.g. the run was killed) is ignored
+        self.records = body[:(body.size // rec) * rec].reshape(-1, rec)
+        self.steps = self.records[:, :4].copy().view("<u4").ravel()
+
+    def __len__(self):
+        return self.records.shape[0]
+
+    def frame(self, i: int) -> np.ndarray:
+        """Frame i as an N x N uint8 array of 0/1 cells."""
+        packed = self.records[i, RECORD_HEADER_BYTES:].reshape(self.n, self.row_bytes)
+        return np.unpackbits(packed, axis=1, bitorder="little")[:, :self.n]
+
+    def index_of_step(self, step: int) -> int:
+        hits = np.nonzero(self.steps == step)[0]
+        if hits.size == 0:
+            raise KeyError(f"step {step} not in {self.path}")
+        return int(hits[0])
+
+def to_image(board: np.ndarray, scale: int) -> Image.Image:
+    img = Image.fromarray(board * 255, mode="L")
+    if scale > 1:
+        img = img.resize((board.shape[1] * scale, board.shape[0] * scale), Image.NEAREST)
+    return img
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Inspect and render a Game of Life frame log")
+    p.add_argument("log", type=Path, help="Frame log written by life_par -DRECORD (frames.bin)")
+    p.add_argument("--png", type=int, nargs="+", metavar="STEP", default=None,
+                   help="Write out<STEP>.png for these steps")
+    p.add_argument("--gif", type=Path, default=None, help="Write an animated GIF of the frames")
+    p.add_argument("--every", type=int, default=1, help="Use every k-th frame for the GIF (default: 1)")
+    p.add_argument("--scale", type=int, default=1, help="Pixels per cell (default: 1)")
+    p.add_argument("--delay", type=int, default=200, help="GIF frame delay in ms (default: 200, as convert -delay 20)")
+    p.add_argument("--out-dir", type=Path, default=Path("."), help="Directory for PNG output (default: .)")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        log = FrameLog(args.log)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if len(log) == 0:
+        print(f"ERROR: {args.log} holds no frames", file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.log}: N={log.n} frames={len(log)} steps {int(log.steps[0])}..{int(log.steps[-1])}")
+
+    if args.png:
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+        for step in args.png:
+            try:
+                i = log.index_of_step(step)
+            except KeyError as e:
+                print(f"ERROR: {e.args[0]}", file=sys.stderr)
+                sys.exit(1)
+            out_path = args.out_dir / f"out{step}.png"
+            to_image(log.frame(i), args.scale).save(out_path)
+            print(f"Wrote {out_path}")
+
+    if args.gif:
+        every = max(1, args.every)
+        images = [to_image(log.frame(i), args.scale) for i in range(0, len(log), every)]
+        images[0].save(args.gif, save_all=True, append_images=images[1:], duration=args.delay, loop=0)
+        print(f"Wrote {args.gif} ({len(images)} frames)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# life_np.py
+#
+# NumPy reference engine for Conway's Game of Life.
+#
+# Usage:
+#   python life_np.py ArraySize TimeSteps
+#   python life_np.py ArraySize TimeSteps --workers 8
+#   python life_np.py ArraySize TimeSteps --pgm out.pgm
+#
+# Same contract as life_par.c:
+#   - the border (rows/cols 0 and N-1) stays dead,
+#   - the initial board is drawn with the C library rand() in the same order
+#     as init_random(), so both engines start from the same pattern,
+#   - exactly one line "GameOfLife: Size N Steps T Time X" is printed,
+#     which read_time_from_out() in diagrams.py parses.
+#
+# With --workers P > 1 the interior rows are split into P bands that a
+# process pool updates in place over two shared-memory boards.
+# --pgm writes the final board in the same P5 format as print_to_pgm(),
+# so it can be compared byte-for-byte against a -DOUTPUT run of the C code.
+
+from multiprocessing import Pool, shared_memory
+import argparse
+import ctypes
+import ctypes.util
+import sys
+import time
+import numpy as np
+
+# Per-process views of the two shared boards (set by _attach in pool workers)
+_SHM = []
+_BOARDS = []
+
+def parse_args():
+    p = argparse.ArgumentParser(description="NumPy Game of Life engine with the life_par CLI and output line")
+    p.add_argument("N", type=int, help="ArraySize")
+    p.add_argument("T", type=int, help="TimeSteps")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes updating row bands over shared memory (default: 1, vectorised in-process)")
+    p.add_argument("--pgm", default=None,
+                   help="Write the final board to this PGM file (print_to_pgm format)")
+    return p.parse_args()
+
+def init_random(board: np.ndarray, n: int):
+    """Same pattern as init_random() in life_par.c (C rand(), default seed)."""
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        print("ERROR: C library not found; cannot reproduce life_par.c's rand() sequence", file=sys.stderr)
+        sys.exit(1)
+    libc = ctypes.CDLL(libc_name)
+    libc.srand(1)
+    span = (n - 2) * (n - 2)
+    for _ in range((n * n) // 10):
+        pos = libc.rand() % span
+        board[pos % (n - 2) + 1, pos // (n - 2) + 1] = 1
+
+def step_rows(prev: np.ndarray, cur: np.ndarray, lo: int, hi: int):
+    """Compute rows lo..hi-1 (interior only) of cur from prev with shifted-slice sums."""
+    up, mid, down = prev[lo - 1:hi - 1], prev[lo:hi], prev[lo + 1:hi + 1]
+    nbrs = (up[:, :-2] + up[:, 1:-1] + up[:, 2:] +
+            mid[:, :-2] + mid[:, 2:] +
+            down[:, :-2] + down[:, 1:-1] + down[:, 2:])
+    self_ = mid[:, 1:-1]
+    cur[lo:hi, 1:-1] = (nbrs == 3) | ((self_ + nbrs) == 3)
+
+def _attach(names, n):
+    for name in names:
+        shm = shared_memory.SharedMemory(name=name)
+        _SHM.append(shm)
+        _BOARDS.append(np.ndarray((n, n), dtype=np.uint8, buffer=shm.buf))
+
+def _band_task(args):
+    src, lo, hi = args
+    step_rows(_BOARDS[src], _BOARDS[1 - src], lo, hi)
+
+def row_bands(n: int, parts: int):
+    """Split interior rows 1..N-2 into contiguous bands, like schedule(static)."""
+    rows = n - 2
+    parts = max(1, min(parts, rows))
+    base, extra = divmod(rows, parts)
+    bands, lo = [], 1
+    for k in range(parts):
+        hi = lo + base + (1 if k < extra else 0)
+        bands.append((lo, hi))
+        lo = hi
+    return bands
+
+def run_serial(board: np.ndarray, n: int, steps: int):
+    """Returns (final board, seconds spent in the time-step loop)."""
+    prev = board
+    cur = np.zeros_like(board)
+    ts = time.perf_counter()
+    for _ in range(steps):
+        step_rows(prev, cur, 1, n - 1)
+        prev, cur = cur, prev
+    return prev, time.perf_counter() - ts
+
+def run_pool(board: np.ndarray, n: int, steps: int, workers: int):
+    """Like run_serial; pool start-up is kept outside the timed loop."""
+    shms = [shared_memory.SharedMemory(create=True, size=n * n) for _ in range(2)]
+    try:
+        boards = [np.ndarray((n, n), dtype=np.uint8, buffer=shm.buf) for shm in shms]
+        boards[0][:] = board
+        boards[1][:] = 0
+        bands = row_bands(n, workers)
+        src = 0
+        with Pool(workers, initializer=_attach, initargs=([shm.name for shm in shms], n)) as pool:
+            pool.map(_band_task, [(1, lo, lo) for lo, _ in bands])  # warm-up: attach in every worker
+            ts = time.perf_counter()
+            for _ in range(steps):
+                # map() returns only when every band is done: the per-step barrier
+                pool.map(_band_task, [(src, lo, hi) for lo, hi in bands])
+                src = 1 - src
+            elapsed = time.perf_counter() - ts
+        return boards[src].copy(), elapsed
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+def write_pgm(board: np.ndarray, n: int, path: str):
+    with open(path, "wb") as f:
+        f.write(f"P5\n{n} {n} 1\n".encode())
+        f.write(board.astype(np.uint8).tobytes())
+
+def main():
+    args = parse_args()
+    n, steps = args.N, args.T
+    if n < 3 or steps < 0 or args.workers < 1:
+        print("Usage: python life_np.py ArraySize TimeSteps [--workers P] [--pgm FILE]", file=sys.stderr)
+        sys.exit(-1)
+
+    board = np.zeros((n, n), dtype=np.uint8)
+    init_random(board, n)
+
+    if args.workers == 1:
+        final, elapsed = run_serial(board, n, steps)
+    else:
+        final, elapsed = run_pool(board, n, steps, args.workers)
+
+    print(f"GameOfLife: Size {n} Steps {steps} Time {elapsed:f}")
+    if args.pgm:
+        write_pgm(final, n, args.pgm)
+
+if __name__ == "__main__":
+    main()
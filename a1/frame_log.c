@@ -0,0 +1,139 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <pthread.h>
+#include "frame_log.h"
+
+struct frame_log
+{
+    FILE *f;
+    int N;
+    size_t frame_bytes;
+
+    int nslots;
+    unsigned char **slot; /* packed frames */
+    int *step;            /* step of the frame queued in each slot */
+
+    /* Ring: [head, head + count) are queued, head is written next */
+    int head, count;
+    int acquired; /* slot handed out by frame_log_acquire, -1 if none */
+    int done;
+
+    pthread_mutex_t mutex;
+    pthread_cond_t not_empty, not_full;
+    pthread_t writer;
+};
+
+static void write_u32(FILE *f, uint32_t v)
+{
+    unsigned char b[4] = {v & 0xff, (v >> 8) & 0xff, (v >> 16) & 0xff, (v >> 24) & 0xff};
+    fwrite(b, 1, 4, f);
+}
+
+static void *writer_main(void *arg)
+{
+    frame_log_t *log = arg;
+    int s;
+
+    pthread_mutex_lock(&log->mutex);
+    for (;;)
+    {
+        while (log->count == 0 && !log->done)
+            pthread_cond_wait(&log->not_empty, &log->mutex);
+        if (log->count == 0 && log->done)
+            break;
+
+        s = log->head;
+        pthread_mutex_unlock(&log->mutex);
+
+        /* The slot is ours until head moves past it: write without holding the lock */
+        write_u32(log->f, (uint32_t)log->step[s]);
+        write_u32(log->f, 0);
+        fwrite(log->slot[s], 1, log->frame_bytes, log->f);
+
+        pthread_mutex_lock(&log->mutex);
+        log->head = (log->head + 1) % log->nslots;
+        log->count--;
+        pthread_cond_signal(&log->not_full);
+    }
+    pthread_mutex_unlock(&log->mutex);
+    return NULL;
+}
+
+frame_log_t *frame_log_open(const char *path, int N, int slots)
+{
+    frame_log_t *log;
+    int s;
+
+    log = calloc(1, sizeof(*log));
+    log->f = fopen(path, "wb");
+    if (!log->f)
+    {
+        perror(path);
+        exit(-1);
+    }
+    log->N = N;
+    log->frame_bytes = (size_t)N * frame_log_row_bytes(N);
+    log->nslots = slots > 0 ? slots : FRAME_LOG_SLOTS;
+    log->slot = malloc(log->nslots * sizeof(unsigned char *));
+    log->step = malloc(log->nslots * sizeof(int));
+    for (s = 0; s < log->nslots; s++)
+        log->slot[s] = malloc(log->frame_bytes);
+    log->acquired = -1;
+
+    fwrite(FRAME_LOG_MAGIC, 1, 8, log->f);
+    write_u32(log->f, FRAME_LOG_VERSION);
+    write_u32(log->f, (uint32_t)N);
+    write_u32(log->f, (uint32_t)frame_log_row_bytes(N));
+    write_u32(log->f, 0);
+
+    pthread_mutex_init(&log->mutex, NULL);
+    pthread_cond_init(&log->not_empty, NULL);
+    pthread_cond_init(&log->not_full, NULL);
+    pthread_create(&log->writer, NULL, writer_main, log);
+    return log;
+}
+
+unsigned char *frame_log_acquire(frame_log_t *log)
+{
+    unsigned char *buf;
+
+    pthread_mutex_lock(&log->mutex);
+    while (log->count == log->nslots)
+        pthread_cond_wait(&log->not_full, &log->mutex);
+    log->acquired = (log->head + log->count) % log->nslots;
+    buf = log->slot[log->acquired];
+    pthread_mutex_unlock(&log->mutex);
+    return buf;
+}
+
+void frame_log_submit(frame_log_t *log, int step)
+{
+    pthread_mutex_lock(&log->mutex);
+    log->step[log->acquired] = step;
+    log->acquired = -1;
+    log->count++;
+    pthread_cond_signal(&log->not_empty);
+    pthread_mutex_unlock(&log->mutex);
+}
+
+void frame_log_close(frame_log_t *log)
+{
+    int s;
+
+    pthread_mutex_lock(&log->mutex);
+    log->done = 1;
+    pthread_cond_signal(&log->not_empty);
+    pthread_mutex_unlock(&log->mutex);
+    pthread_join(log->writer, NULL);
+
+    fclose(log->f);
+    pthread_mutex_destroy(&log->mutex);
+    pthread_cond_destroy(&log->not_empty);
+    pthread_cond_destroy(&log->not_full);
+    for (s = 0; s < log->nslots; s++)
+        free(log->slot[s]);
+    free(log->slot);
+    free(log->step);
+    free(log);
+}
@@ -0,0 +1,43 @@
+#ifndef FRAME_LOG_H
+#define FRAME_LOG_H
+
+/*
+ * Asynchronous, bit-packed frame recorder.
+ *
+ * Frames are packed 8 cells per byte (LSB first, each row padded to
+ * whole bytes) into one of a small ring of slots and handed to a
+ * background writer thread, which appends them to a single binary log.
+ * The simulation only blocks if every slot is still waiting to be written.
+ *
+ * Log layout (little-endian):
+ *   header: char magic[8] = "GOLFRAME", uint32 version, uint32 N,
+ *           uint32 row_bytes, uint32 reserved
+ *   frames: uint32 step, uint32 reserved, N * row_bytes packed cells
+ *
+ * diagrams/frames.py memory-maps this file.
+ */
+
+#include <stddef.h>
+
+#define FRAME_LOG_MAGIC "GOLFRAME"
+#define FRAME_LOG_VERSION 1
+#define FRAME_LOG_SLOTS 8
+
+typedef struct frame_log frame_log_t;
+
+/* Bytes per packed row */
+static inline size_t frame_log_row_bytes(int N) { return ((size_t)N + 7) / 8; }
+
+/* Create the log file, write the header and start the writer thread (slots <= 0: FRAME_LOG_SLOTS) */
+frame_log_t *frame_log_open(const char *path, int N, int slots);
+
+/* Next free slot (N * row_bytes bytes); blocks while all slots are pending */
+unsigned char *frame_log_acquire(frame_log_t *log);
+
+/* Queue the slot returned by the last frame_log_acquire() as frame 'step' */
+void frame_log_submit(frame_log_t *log, int step);
+
+/* Write out every pending frame, stop the writer and close the file */
+void frame_log_close(frame_log_t *log);
+
+#endif
@@ -0,0 +1,242 @@
+/******************************************************
+ ****** Conway's game of life (active tiles) **********
+ ******************************************************
+
+    Usage: ./exec ArraySize TimeSteps [TileSize]
+
+    Same board layout and output line as life_par.c, but
+    the interior is split into TileSize x TileSize tiles
+    (default 32). A tile is recomputed at step t only if
+    it, or one of its 8 neighbour tiles, changed at step
+    t-1; every other tile is still life locally and its
+    cells already hold the right values in both buffers.
+
+    After the GameOfLife line, one "ActiveTiles" line per
+    step reports how many tiles were scheduled.
+
+    Compile with -DOUTPUT to print output in output.gif
+    (You will need ImageMagick for that - Install with
+    sudo apt-get install imagemagick)
+    WARNING: Do not print output for large array sizes!
+    or multiple time steps!
+ ******************************************************/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/time.h>
+#include <omp.h>
+
+#define FINALIZE "\
+convert -delay 20 `ls -1 out*.pgm | sort -V` output.gif\n\
+rm *pgm\n\
+"
+
+#define DEFAULT_TILE 32
+
+int **allocate_array(int N);
+void free_array(int **array, int N);
+void init_random(int **array1, int **array2, int N);
+void print_to_pgm(int **array, int N, int t);
+
+/* Update the interior cells of tile (ti, tj); returns 1 if any cell changed */
+static int step_tile(int **previous, int **current, int N, int B, int ti, int tj)
+{
+    int i, j, nbrs, changed = 0;
+    int i0 = 1 + ti * B, i1 = i0 + B < N - 1 ? i0 + B : N - 1;
+    int j0 = 1 + tj * B, j1 = j0 + B < N - 1 ? j0 + B : N - 1;
+
+    for (i = i0; i < i1; ++i)
+    {
+        for (j = j0; j < j1; ++j)
+        {
+            nbrs =
+                previous[i + 1][j + 1] + previous[i + 1][j] + previous[i + 1][j - 1] +
+                previous[i][j - 1] + previous[i][j + 1] +
+                previous[i - 1][j - 1] + previous[i - 1][j] + previous[i - 1][j + 1];
+
+            current[i][j] = (nbrs == 3 || (previous[i][j] + nbrs == 3)) ? 1 : 0;
+            changed |= current[i][j] != previous[i][j];
+        }
+    }
+    return changed;
+}
+
+int main(int argc, char *argv[])
+{
+    int N;                     // array dimensions
+    int T;                     // time steps
+    int B;                     // tile size
+    int NT;                    // tiles per dimension
+    int **current, **previous; // arrays - one for current timestep, one for previous timestep
+    int **swap;                // array pointer
+    char *changed, *changed_next, *cswap; // per tile: changed in the last step
+    int *active;               // indices of the tiles scheduled this step
+    int *active_count;         // per step: number of active tiles
+    int n_active;
+    int t, k;                  // helper variables
+
+    double time; // variables for timing
+    struct timeval ts, tf;
+
+    /*Read input arguments*/
+    if (argc != 3 && argc != 4)
+    {
+        fprintf(stderr, "Usage: ./exec ArraySize TimeSteps [TileSize]\n");
+        exit(-1);
+    }
+    else
+    {
+        N = atoi(argv[1]);
+        T = atoi(argv[2]);
+        B = argc == 4 ? atoi(argv[3]) : DEFAULT_TILE;
+        if (B < 1)
+        {
+            fprintf(stderr, "TileSize must be positive\n");
+            exit(-1);
+        }
+    }
+
+    NT = (N - 2 + B - 1) / B;
+
+    /*Allocate and initialize matrices*/
+    current = allocate_array(N);  // allocate array for current time step
+    previous = allocate_array(N); // allocate array for previous time step
+    changed = malloc((size_t)NT * NT);
+    changed_next = malloc((size_t)NT * NT);
+    active = malloc((size_t)NT * NT * sizeof(int));
+    active_count = calloc(T > 0 ? T : 1, sizeof(int));
+
+    init_random(previous, current, N); // initialize previous array with pattern
+    memset(changed, 1, (size_t)NT * NT); // everything is active on the first step
+
+#ifdef OUTPUT
+    print_to_pgm(previous, N, 0);
+#endif
+
+    /*Game of Life*/
+
+    gettimeofday(&ts, NULL);
+
+    for (t = 0; t < T; ++t)
+    {
+#pragma omp parallel private(k) shared(N, B, NT, previous, current, changed, changed_next, active, n_active)
+        {
+            /* Dilate the changed set by one tile: only these can change now */
+#pragma omp for schedule(static)
+            for (k = 0; k < NT * NT; ++k)
+            {
+                int ti = k / NT, tj = k % NT, di, dj, hot = 0;
+
+                for (di = -1; di <= 1 && !hot; ++di)
+                    for (dj = -1; dj <= 1 && !hot; ++dj)
+                    {
+                        int ni = ti + di, nj = tj + dj;
+                        if (ni >= 0 && ni < NT && nj >= 0 && nj < NT)
+                            hot = changed[ni * NT + nj];
+                    }
+                changed_next[k] = hot; /* temporarily: "active" flag */
+            }
+
+            /* Compact active flags into a work list (tiles are cheap to scan) */
+#pragma omp single
+            {
+                n_active = 0;
+                for (k = 0; k < NT * NT; ++k)
+                {
+                    if (changed_next[k])
+                        active[n_active++] = k;
+                    changed_next[k] = 0;
+                }
+            } /* implicit barrier: work list is ready */
+
+            /* Only active tiles are scheduled */
+#pragma omp for schedule(static)
+            for (k = 0; k < n_active; ++k)
+            {
+                int tile = active[k];
+                changed_next[tile] = (char)step_tile(previous, current, N, B, tile / NT, tile % NT);
+            }
+        } /* implicit barrier here: all threads finished step t */
+
+        active_count[t] = n_active;
+
+#ifdef OUTPUT
+        print_to_pgm(current, N, t + 1); /* single thread here: we're back in serial */
+#endif
+
+        /* Inactive tiles hold identical values in both buffers, so a plain swap is enough */
+        swap = current;
+        current = previous;
+        previous = swap;
+        cswap = changed;
+        changed = changed_next;
+        changed_next = cswap;
+    }
+
+    gettimeofday(&tf, NULL);
+    time = (tf.tv_sec - ts.tv_sec) + (tf.tv_usec - ts.tv_usec) * 0.000001;
+
+    free_array(current, N);
+    free_array(previous, N);
+    free(changed);
+    free(changed_next);
+    free(active);
+    printf("GameOfLife: Size %d Steps %d Time %lf\n", N, T, time);
+    for (t = 0; t < T; ++t)
+        printf("ActiveTiles: Step %d Active %d Total %d Tile %d\n", t, active_count[t], NT * NT, B);
+    free(active_count);
+#ifdef OUTPUT
+    system(FINALIZE);
+#endif
+}
+
+int **allocate_array(int N)
+{
+    int **array;
+    int i, j;
+    array = malloc(N * sizeof(int *));
+    for (i = 0; i < N; i++)
+        array[i] = malloc(N * sizeof(int));
+    for (i = 0; i < N; i++)
+        for (j = 0; j < N; j++)
+            array[i][j] = 0;
+    return array;
+}
+
+void free_array(int **array, int N)
+{
+    int i;
+    for (i = 0; i < N; i++)
+        free(array[i]);
+    free(array);
+}
+
+void init_random(int **array1, int **array2, int N)
+{
+    int i, pos;
+
+    for (i = 0; i < (N * N) / 10; i++)
+    {
+        pos = rand() % ((N - 2) * (N - 2));
+        array1[pos % (N - 2) + 1][pos / (N - 2) + 1] = 1;
+        array2[pos % (N - 2) + 1][pos / (N - 2) + 1] = 1;
+    }
+}
+
+void print_to_pgm(int **array, int N, int t)
+{
+    int i, j;
+    char *s = malloc(30 * sizeof(char));
+    sprintf(s, "out%d.pgm", t);
+    FILE *f = fopen(s, "wb");
+    fprintf(f, "P5\n%d %d 1\n", N, N);
+    for (i = 0; i < N; i++)
+        for (j = 0; j < N; j++)
+            if (array[i][j] == 1)
+                fputc(1, f);
+            else
+                fputc(0, f);
+    fclose(f);
+    free(s);
+}
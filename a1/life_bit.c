@@ -0,0 +1,236 @@
+/******************************************************
+ ******** Conway's game of life (bit-packed) **********
+ ******************************************************
+
+    Usage: ./exec ArraySize TimeSteps
+
+    Same interface and output line as life_par.c, but
+    every row is packed 64 cells per uint64_t word and
+    the neighbour count is computed for a whole word at
+    a time with bitwise half/full adders.
+
+    Bit b of word w in row i holds cell (i, 64*w + b).
+    Rows 0, N-1 and columns 0, N-1 are the dead border,
+    exactly as in life_par.c.
+
+    Compile with -DOUTPUT to print output in output.gif
+    (You will need ImageMagick for that - Install with
+    sudo apt-get install imagemagick)
+    WARNING: Do not print output for large array sizes!
+    or multiple time steps!
+ ******************************************************/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <sys/time.h>
+#include <omp.h>
+
+#define FINALIZE "\
+convert -delay 20 `ls -1 out*.pgm | sort -V` output.gif\n\
+rm *pgm\n\
+"
+
+#define WORD_BITS 64
+
+typedef uint64_t word_t;
+
+word_t *allocate_board(int N, int W);
+word_t *make_col_mask(int N, int W);
+void init_random(word_t *board1, word_t *board2, int N, int W);
+void print_to_pgm(word_t *board, int N, int W, int t);
+
+static inline void set_cell(word_t *board, int W, int i, int j)
+{
+    board[(size_t)i * W + j / WORD_BITS] |= (word_t)1 << (j % WORD_BITS);
+}
+
+static inline int get_cell(const word_t *board, int W, int i, int j)
+{
+    return (board[(size_t)i * W + j / WORD_BITS] >> (j % WORD_BITS)) & 1;
+}
+
+/* Bitwise adders: every bit lane is an independent 1-bit addition */
+#define HALF_ADD(a, b, s, c) \
+    do                       \
+    {                        \
+        (s) = (a) ^ (b);     \
+        (c) = (a) & (b);     \
+    } while (0)
+
+#define FULL_ADD(a, b, d, s, c)           \
+    do                                    \
+    {                                     \
+        word_t _t = (a) ^ (b);            \
+        (s) = _t ^ (d);                   \
+        (c) = ((a) & (b)) | (_t & (d));   \
+    } while (0)
+
+/*
+ * Advance one row of W words.
+ * up/mid/down are rows i-1, i, i+1 of the previous board.
+ * The west neighbour of bit b is bit b-1 (carried in from word w-1),
+ * the east neighbour of bit b is bit b+1 (carried in from word w+1).
+ */
+static inline void step_row(const word_t *up, const word_t *mid, const word_t *down,
+                            word_t *out, const word_t *mask, int W)
+{
+    int w;
+
+    for (w = 0; w < W; ++w)
+    {
+        word_t u = up[w], m = mid[w], d = down[w];
+        word_t u_pw = w > 0 ? up[w - 1] : 0, u_nw = w < W - 1 ? up[w + 1] : 0;
+        word_t m_pw = w > 0 ? mid[w - 1] : 0, m_nw = w < W - 1 ? mid[w + 1] : 0;
+        word_t d_pw = w > 0 ? down[w - 1] : 0, d_nw = w < W - 1 ? down[w + 1] : 0;
+
+        word_t u_w = (u << 1) | (u_pw >> (WORD_BITS - 1));
+        word_t u_e = (u >> 1) | (u_nw << (WORD_BITS - 1));
+        word_t m_w = (m << 1) | (m_pw >> (WORD_BITS - 1));
+        word_t m_e = (m >> 1) | (m_nw << (WORD_BITS - 1));
+        word_t d_w = (d << 1) | (d_pw >> (WORD_BITS - 1));
+        word_t d_e = (d >> 1) | (d_nw << (WORD_BITS - 1));
+
+        word_t s_u, c_u, s_m, c_m, s_d, c_d;
+        word_t s0, k1, t0, t1, s1, t2, s2;
+
+        FULL_ADD(u_w, u, u_e, s_u, c_u); /* weights 1, 2 */
+        HALF_ADD(m_w, m_e, s_m, c_m);    /* weights 1, 2 */
+        FULL_ADD(d_w, d, d_e, s_d, c_d); /* weights 1, 2 */
+
+        FULL_ADD(s_u, s_m, s_d, s0, k1); /* bit 0 of the count, carry into 2s */
+        FULL_ADD(c_u, c_m, c_d, t0, t1); /* 2s column: weights 2, 4 */
+        HALF_ADD(t0, k1, s1, t2);        /* bit 1 of the count, carry into 4s */
+        s2 = t1 ^ t2;                    /* bit 2 of the count (8 wraps to 0: dead) */
+
+        /* alive iff count == 3, or count == 2 and the cell is alive */
+        out[w] = ~s2 & s1 & (s0 | m) & mask[w];
+    }
+}
+
+int main(int argc, char *argv[])
+{
+    int N;                       // array dimensions
+    int W;                       // words per row
+    int T;                       // time steps
+    word_t *current, *previous;  // boards - one for current timestep, one for previous timestep
+    word_t *swap;                // board pointer
+    word_t *mask;                // live columns of a row (1 .. N-2)
+    int i, t;                    // helper variables
+
+    double time; // variables for timing
+    struct timeval ts, tf;
+
+    /*Read input arguments*/
+    if (argc != 3)
+    {
+        fprintf(stderr, "Usage: ./exec ArraySize TimeSteps\n");
+        exit(-1);
+    }
+    else
+    {
+        N = atoi(argv[1]);
+        T = atoi(argv[2]);
+    }
+
+    W = (N + WORD_BITS - 1) / WORD_BITS;
+
+    /*Allocate and initialize boards*/
+    current = allocate_board(N, W);  // allocate board for current time step
+    previous = allocate_board(N, W); // allocate board for previous time step
+    mask = make_col_mask(N, W);
+
+    init_random(previous, current, N, W); // initialize previous board with pattern
+
+#ifdef OUTPUT
+    print_to_pgm(previous, N, W, 0);
+#endif
+
+    /*Game of Life*/
+
+    gettimeofday(&ts, NULL);
+
+    for (t = 0; t < T; ++t)
+    {
+/* Parallelize rows exactly like life_par.c; each row is W words */
+#pragma omp parallel for schedule(static) private(i) shared(N, W, previous, current, mask)
+        for (i = 1; i < N - 1; ++i)
+        {
+            step_row(previous + (size_t)(i - 1) * W,
+                     previous + (size_t)i * W,
+                     previous + (size_t)(i + 1) * W,
+                     current + (size_t)i * W, mask, W);
+        } /* implicit barrier here: all threads finished step t */
+
+#ifdef OUTPUT
+        print_to_pgm(current, N, W, t + 1); /* single thread here: we're back in serial */
+#endif
+
+        swap = current;
+        current = previous;
+        previous = swap;
+    }
+
+    gettimeofday(&tf, NULL);
+    time = (tf.tv_sec - ts.tv_sec) + (tf.tv_usec - ts.tv_usec) * 0.000001;
+
+    free(current);
+    free(previous);
+    free(mask);
+    printf("GameOfLife: Size %d Steps %d Time %lf\n", N, T, time);
+#ifdef OUTPUT
+    system(FINALIZE);
+#endif
+}
+
+word_t *allocate_board(int N, int W)
+{
+    word_t *board;
+    board = malloc((size_t)N * W * sizeof(word_t));
+    if (!board)
+    {
+        fprintf(stderr, "Could not allocate %d x %d board\n", N, W);
+        exit(-1);
+    }
+    memset(board, 0, (size_t)N * W * sizeof(word_t));
+    return board;
+}
+
+/* Bits set for columns 1 .. N-2; keeps the border and the padding bits dead */
+word_t *make_col_mask(int N, int W)
+{
+    word_t *mask = allocate_board(1, W);
+    int j;
+
+    for (j = 1; j < N - 1; j++)
+        mask[j / WORD_BITS] |= (word_t)1 << (j % WORD_BITS);
+    return mask;
+}
+
+/* Same rand() sequence as life_par.c, so both engines start from the same board */
+void init_random(word_t *board1, word_t *board2, int N, int W)
+{
+    int i, pos;
+
+    for (i = 0; i < (N * N) / 10; i++)
+    {
+        pos = rand() % ((N - 2) * (N - 2));
+        set_cell(board1, W, pos % (N - 2) + 1, pos / (N - 2) + 1);
+        set_cell(board2, W, pos % (N - 2) + 1, pos / (N - 2) + 1);
+    }
+}
+
+void print_to_pgm(word_t *board, int N, int W, int t)
+{
+    int i, j;
+    char *s = malloc(30 * sizeof(char));
+    sprintf(s, "out%d.pgm", t);
+    FILE *f = fopen(s, "wb");
+    fprintf(f, "P5\n%d %d 1\n", N, N);
+    for (i = 0; i < N; i++)
+        for (j = 0; j < N; j++)
+            fputc(get_cell(board, W, i, j), f);
+    fclose(f);
+    free(s);
+}
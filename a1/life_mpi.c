@@ -0,0 +1,228 @@
+/******************************************************
+ ********* Conway's game of life (MPI, 2D) ************
+ ******************************************************
+
+    Usage: mpirun -np P ./exec ArraySize TimeSteps Px Py
+
+    The N x N board is split into Px x Py blocks over a
+    2D Cartesian communicator (Px * Py == P); no rank ever
+    holds the whole board. Each step exchanges one-cell
+    halos: east/west columns first, then north/south rows
+    including the halo columns, which carries the corner
+    cells along.
+
+    Every rank seeds its own block from a hash of the
+    global cell coordinates (about 1 in 10 cells alive),
+    so the initial board does not depend on Px, Py and
+    the final Alive count can be compared across grids.
+
+    Output, in the Jacobi format of a6/heat_transfer/mpi:
+      GameOfLife X N Y N Px px Py py Iter T
+        ComputationTime c TotalTime t Alive a
+ ******************************************************/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <sys/time.h>
+#include "mpi.h"
+
+typedef unsigned char cell_t;
+
+cell_t *allocate_block(int rows, int cols);
+void init_hash(cell_t *block, int ld, int rows, int cols, int off_i, int off_j, int N);
+
+/* Block [off, off + len) of dimension n split over p ranks, remainder spread over the first ones */
+static void split(int n, int p, int coord, int *len, int *off)
+{
+    int base = n / p, rem = n % p;
+    *len = base + (coord < rem ? 1 : 0);
+    *off = coord * base + (coord < rem ? coord : rem);
+}
+
+int main(int argc, char **argv)
+{
+    int rank, size;
+    int N, T;               // board dimension and time steps
+    int grid[2];            // process grid dimensions
+    int local[2], off[2];   // local block dimensions and global offset
+    int ld;                 // leading dimension of the local block (local[1] + 2)
+    int i, j, t, nbrs;
+    int i_min, i_max, j_min, j_max;
+    cell_t *previous, *current, *swap;
+
+    struct timeval tts, ttf, tcs, tcf; // Timers
+    double ttotal = 0, tcomp = 0, total_time, comp_time;
+    long alive = 0, total_alive;
+
+    MPI_Init(&argc, &argv);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+    //----Read arguments----//
+    if (argc != 5)
+    {
+        if (rank == 0)
+            fprintf(stderr, "Usage: mpirun .... ./exec ArraySize TimeSteps Px Py\n");
+        MPI_Finalize();
+        exit(-1);
+    }
+    N = atoi(argv[1]);
+    T = atoi(argv[2]);
+    grid[0] = atoi(argv[3]);
+    grid[1] = atoi(argv[4]);
+    if (grid[0] * grid[1] != size || grid[0] > N || grid[1] > N)
+    {
+        if (rank == 0)
+            fprintf(stderr, "Px * Py must equal the number of processes and Px, Py <= ArraySize\n");
+        MPI_Finalize();
+        exit(-1);
+    }
+
+    //----Create 2D-cartesian communicator----//
+    MPI_Comm CART_COMM;
+    int periods[2] = {0, 0};
+    int rank_grid[2];
+
+    MPI_Cart_create(MPI_COMM_WORLD, 2, grid, periods, 0, &CART_COMM);
+    MPI_Comm_rank(CART_COMM, &rank);
+    MPI_Cart_coords(CART_COMM, rank, 2, rank_grid);
+
+    //----Compute local dimensions----//
+    for (i = 0; i < 2; i++)
+        split(N, grid[i], rank_grid[i], &local[i], &off[i]);
+    ld = local[1] + 2;
+
+    //----Allocate and seed local blocks (with one-cell halo)----//
+    previous = allocate_block(local[0] + 2, ld);
+    current = allocate_block(local[0] + 2, ld);
+    init_hash(previous, ld, local[0], local[1], off[0], off[1], N);
+
+    //----Communication Datatypes----//
+    MPI_Datatype row_type, col_type;
+    MPI_Type_contiguous(ld, MPI_UNSIGNED_CHAR, &row_type); /* halo columns included: corners */
+    MPI_Type_commit(&row_type);
+    MPI_Type_vector(local[0], 1, ld, MPI_UNSIGNED_CHAR, &col_type);
+    MPI_Type_commit(&col_type);
+
+    //----Find Neighbors----//
+    int north, south, east, west;
+    MPI_Cart_shift(CART_COMM, 0, 1, &north, &south);
+    MPI_Cart_shift(CART_COMM, 1, 1, &west, &east);
+
+    //---Define iteration ranges: global border cells stay dead-----//
+    i_min = off[0] == 0 ? 2 : 1;
+    i_max = off[0] + local[0] == N ? local[0] - 1 : local[0];
+    j_min = off[1] == 0 ? 2 : 1;
+    j_max = off[1] + local[1] == N ? local[1] - 1 : local[1];
+
+    //----Computational core----//
+    MPI_Barrier(CART_COMM);
+    gettimeofday(&tts, NULL);
+
+    for (t = 0; t < T; t++)
+    {
+        // 1. Communication: columns, then full-width rows (carries the corners)
+        MPI_Request reqs[4];
+        MPI_Status stats[4];
+
+        MPI_Isend(&previous[1 * ld + 1], 1, col_type, west, 3, CART_COMM, &reqs[0]);
+        MPI_Irecv(&previous[1 * ld + 0], 1, col_type, west, 4, CART_COMM, &reqs[1]);
+        MPI_Isend(&previous[1 * ld + local[1]], 1, col_type, east, 4, CART_COMM, &reqs[2]);
+        MPI_Irecv(&previous[1 * ld + local[1] + 1], 1, col_type, east, 3, CART_COMM, &reqs[3]);
+        MPI_Waitall(4, reqs, stats);
+
+        MPI_Isend(&previous[1 * ld], 1, row_type, north, 1, CART_COMM, &reqs[0]);
+        MPI_Irecv(&previous[0], 1, row_type, north, 2, CART_COMM, &reqs[1]);
+        MPI_Isend(&previous[(size_t)local[0] * ld], 1, row_type, south, 2, CART_COMM, &reqs[2]);
+        MPI_Irecv(&previous[(size_t)(local[0] + 1) * ld], 1, row_type, south, 1, CART_COMM, &reqs[3]);
+        MPI_Waitall(4, reqs, stats);
+
+        // 2. Computation
+        gettimeofday(&tcs, NULL);
+        for (i = i_min; i <= i_max; i++)
+        {
+            const cell_t *up = previous + (size_t)(i - 1) * ld;
+            const cell_t *mid = previous + (size_t)i * ld;
+            const cell_t *down = previous + (size_t)(i + 1) * ld;
+            cell_t *out = current + (size_t)i * ld;
+
+            for (j = j_min; j <= j_max; j++)
+            {
+                nbrs = up[j - 1] + up[j] + up[j + 1] +
+                       mid[j - 1] + mid[j + 1] +
+                       down[j - 1] + down[j] + down[j + 1];
+
+                out[j] = (nbrs == 3 || (mid[j] + nbrs == 3)) ? 1 : 0;
+            }
+        }
+        gettimeofday(&tcf, NULL);
+        tcomp += (tcf.tv_sec - tcs.tv_sec) + (tcf.tv_usec - tcs.tv_usec) * 0.000001;
+
+        // 3. Swap
+        swap = current;
+        current = previous;
+        previous = swap;
+    }
+    gettimeofday(&ttf, NULL);
+
+    ttotal = (ttf.tv_sec - tts.tv_sec) + (ttf.tv_usec - tts.tv_usec) * 0.000001;
+
+    MPI_Reduce(&ttotal, &total_time, 1, MPI_DOUBLE, MPI_MAX, 0, CART_COMM);
+    MPI_Reduce(&tcomp, &comp_time, 1, MPI_DOUBLE, MPI_MAX, 0, CART_COMM);
+
+    //----Checksum: live cells of the final board----//
+    for (i = 1; i <= local[0]; i++)
+        for (j = 1; j <= local[1]; j++)
+            alive += previous[(size_t)i * ld + j];
+    MPI_Reduce(&alive, &total_alive, 1, MPI_LONG, MPI_SUM, 0, CART_COMM);
+
+    //----Printing results----//
+    if (rank == 0)
+        printf("GameOfLife X %d Y %d Px %d Py %d Iter %d ComputationTime %lf TotalTime %lf Alive %ld\n",
+               N, N, grid[0], grid[1], T, comp_time, total_time, total_alive);
+
+    // Free Datatypes before Finalize
+    MPI_Type_free(&row_type);
+    MPI_Type_free(&col_type);
+    MPI_Comm_free(&CART_COMM);
+    free(previous);
+    free(current);
+
+    MPI_Finalize();
+    return 0;
+}
+
+cell_t *allocate_block(int rows, int cols)
+{
+    cell_t *block = calloc((size_t)rows * cols, sizeof(cell_t));
+    if (!block)
+    {
+        fprintf(stderr, "Could not allocate %d x %d block\n", rows, cols);
+        MPI_Abort(MPI_COMM_WORLD, -1);
+    }
+    return block;
+}
+
+/* splitmix64 finaliser: a well-mixed value per global cell index */
+static uint64_t cell_hash(uint64_t x)
+{
+    x += 0x9E3779B97F4A7C15ULL;
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return x ^ (x >> 31);
+}
+
+void init_hash(cell_t *block, int ld, int rows, int cols, int off_i, int off_j, int N)
+{
+    int i, j, gi, gj;
+
+    for (i = 1; i <= rows; i++)
+        for (j = 1; j <= cols; j++)
+        {
+            gi = off_i + i - 1;
+            gj = off_j + j - 1;
+            if (gi > 0 && gi < N - 1 && gj > 0 && gj < N - 1)
+                block[(size_t)i * ld + j] = cell_hash((uint64_t)gi * N + gj) % 10 == 0;
+        }
+}
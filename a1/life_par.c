@@ -9,22 +9,49 @@
     sudo apt-get install imagemagick)
     WARNING: Do not print output for large array sizes!
     or multiple time steps!
+
+    Compile with -DRECORD (and link frame_log.c) to record
+    every step, bit-packed, into frames.bin instead. A
+    background thread does the writing, so the time step
+    loop does not wait on I/O; render the frames with
+    diagrams/frames.py.
+
+    Each board is one contiguous, 64-byte aligned block
+    (rows padded to whole cache lines) whose pages are
+    first touched by the same static row schedule as the
+    compute loop, so every thread's rows live on its own
+    NUMA node. Compile with -DNUMA_INTERLEAVE (link with
+    -lnuma) to interleave the pages across all nodes
+    instead.
  ******************************************************/
 
 #include <stdio.h>
 #include <stdlib.h>
 #include <sys/time.h>
 #include <omp.h>
+#ifdef NUMA_INTERLEAVE
+#include <numa.h>
+#endif
+#ifdef RECORD
+#include "frame_log.h"
+#define FRAME_LOG_PATH "frames.bin"
+#endif
 
 #define FINALIZE "\
 convert -delay 20 `ls -1 out*.pgm | sort -V` output.gif\n\
 rm *pgm\n\
 "
 
+#define ALIGNMENT 64                             /* bytes, one cache line */
+#define ROW_PAD (ALIGNMENT / (int)sizeof(int))   /* row stride multiple, in cells */
+
 int **allocate_array(int N);
 void free_array(int **array, int N);
 void init_random(int **array1, int **array2, int N);
 void print_to_pgm(int **array, int N, int t);
+#ifdef RECORD
+void record_frame(frame_log_t *log, int **array, int N, int t);
+#endif
 
 int main(int argc, char *argv[])
 {
@@ -36,6 +63,9 @@ int main(int argc, char *argv[])
 
     double time; // variables for timing
     struct timeval ts, tf;
+#ifdef RECORD
+    frame_log_t *frames;
+#endif
 
     /*Read input arguments*/
     if (argc != 3)
@@ -58,6 +88,10 @@ int main(int argc, char *argv[])
 #ifdef OUTPUT
     print_to_pgm(previous, N, 0);
 #endif
+#ifdef RECORD
+    frames = frame_log_open(FRAME_LOG_PATH, N, FRAME_LOG_SLOTS);
+    record_frame(frames, previous, N, 0);
+#endif
 
     /*Game of Life*/
 
@@ -92,6 +126,9 @@ int main(int argc, char *argv[])
 #ifdef OUTPUT
         print_to_pgm(current, N, t + 1); /* single thread here: we're back in serial */
 #endif
+#ifdef RECORD
+        record_frame(frames, current, N, t + 1); /* packs in parallel, writer thread does the I/O */
+#endif
 
         /* Safe to swap: we're outside the parallel region created by 'parallel for' */
         swap = current;
@@ -102,6 +139,9 @@ int main(int argc, char *argv[])
     gettimeofday(&tf, NULL);
     time = (tf.tv_sec - ts.tv_sec) + (tf.tv_usec - ts.tv_usec) * 0.000001;
 
+#ifdef RECORD
+    frame_log_close(frames); /* drain pending frames (outside the timed region) */
+#endif
     free_array(current, N);
     free_array(previous, N);
     printf("GameOfLife: Size %d Steps %d Time %lf\n", N, T, time);
@@ -110,24 +150,58 @@ int main(int argc, char *argv[])
 #endif
 }
 
+static size_t array_bytes(int N)
+{
+    size_t stride = ((size_t)N + ROW_PAD - 1) / ROW_PAD * ROW_PAD;
+    return stride * N * sizeof(int);
+}
+
+/*
+ * One contiguous block, row pointers into it. Rows 1 .. N-2 are zeroed
+ * (first touched) by the same static schedule as the compute loop, so the
+ * thread that updates a row also owns the NUMA node its pages live on.
+ */
 int **allocate_array(int N)
 {
     int **array;
+    int *block;
+    size_t stride = ((size_t)N + ROW_PAD - 1) / ROW_PAD * ROW_PAD;
     int i, j;
+
     array = malloc(N * sizeof(int *));
+#ifdef NUMA_INTERLEAVE
+    block = numa_available() < 0 ? NULL : numa_alloc_interleaved(array_bytes(N));
+#else
+    if (posix_memalign((void **)&block, ALIGNMENT, array_bytes(N)) != 0)
+        block = NULL;
+#endif
+    if (!array || !block)
+    {
+        fprintf(stderr, "Could not allocate %d x %d array\n", N, N);
+        exit(-1);
+    }
     for (i = 0; i < N; i++)
-        array[i] = malloc(N * sizeof(int));
-    for (i = 0; i < N; i++)
-        for (j = 0; j < N; j++)
+        array[i] = block + i * stride;
+
+#pragma omp parallel for schedule(static) private(i, j) shared(N, array)
+    for (i = 1; i < N - 1; ++i)
+        for (j = 0; j < (int)stride; ++j)
             array[i][j] = 0;
+    for (j = 0; j < (int)stride; ++j)
+    {
+        array[0][j] = 0;
+        array[N - 1][j] = 0;
+    }
     return array;
 }
 
 void free_array(int **array, int N)
 {
-    int i;
-    for (i = 0; i < N; i++)
-        free(array[i]);
+#ifdef NUMA_INTERLEAVE
+    numa_free(array[0], array_bytes(N));
+#else
+    free(array[0]);
+#endif
     free(array);
 }
 
@@ -160,3 +234,25 @@ void print_to_pgm(int **array, int N, int t)
     free(s);
 }
 
+#ifdef RECORD
+/* Pack 8 cells per byte (LSB first) into a free slot and queue it */
+void record_frame(frame_log_t *log, int **array, int N, int t)
+{
+    unsigned char *buf = frame_log_acquire(log);
+    size_t rb = frame_log_row_bytes(N);
+    int i, j, b;
+
+#pragma omp parallel for schedule(static) private(i, j, b)
+    for (i = 0; i < N; i++)
+    {
+        for (b = 0; b < (int)rb; b++)
+        {
+            unsigned char byte = 0;
+            for (j = 8 * b; j < 8 * b + 8 && j < N; j++)
+                byte |= (unsigned char)(array[i][j] & 1) << (j - 8 * b);
+            buf[i * rb + b] = byte;
+        }
+    }
+    frame_log_submit(log, t);
+}
+#endif
@@ -0,0 +1,244 @@
+/******************************************************
+ **** Conway's game of life (temporal blocking) *******
+ ******************************************************
+
+    Usage: ./exec ArraySize TimeSteps [K] [TileSize]
+
+    Same board and output line as life_par.c, with the
+    step-fusion factor and tile size appended:
+      GameOfLife: Size N Steps T Time X K k Tile B
+
+    Each pass advances the board by K steps (default 4).
+    Every TileSize x TileSize tile (default 128) is copied
+    with a K-wide halo into a small per-thread buffer that
+    stays in cache, stepped K times there (the valid region
+    shrinks by one cell per step), and only the tile itself
+    is written back. Main memory is therefore swept once
+    per K steps instead of once per step, at the cost of
+    recomputing the halo cells.
+
+    Compile with -DOUTPUT to print output in output.gif;
+    only every K-th step exists in main memory, so only
+    those frames are written.
+    (You will need ImageMagick for that - Install with
+    sudo apt-get install imagemagick)
+    WARNING: Do not print output for large array sizes!
+    or multiple time steps!
+ ******************************************************/
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/time.h>
+#include <omp.h>
+
+#define FINALIZE "\
+convert -delay 20 `ls -1 out*.pgm | sort -V` output.gif\n\
+rm *pgm\n\
+"
+
+#define DEFAULT_K 4
+#define DEFAULT_TILE 128
+
+typedef unsigned char cell_t;
+
+cell_t *allocate_board(int N);
+void init_random(cell_t *board1, cell_t *board2, int N);
+void print_to_pgm(cell_t *board, int N, int t);
+
+static inline int imin(int a, int b) { return a < b ? a : b; }
+static inline int imax(int a, int b) { return a > b ? a : b; }
+
+/* One step on rows [r0, r1) x cols [c0, c1) of a local buffer with leading dimension ld */
+static void step_local(const cell_t *src, cell_t *dst, int ld, int r0, int r1, int c0, int c1)
+{
+    int i, j, nbrs;
+
+    for (i = r0; i < r1; ++i)
+    {
+        const cell_t *up = src + (size_t)(i - 1) * ld;
+        const cell_t *mid = src + (size_t)i * ld;
+        const cell_t *down = src + (size_t)(i + 1) * ld;
+        cell_t *out = dst + (size_t)i * ld;
+
+        for (j = c0; j < c1; ++j)
+        {
+            nbrs = up[j - 1] + up[j] + up[j + 1] +
+                   mid[j - 1] + mid[j + 1] +
+                   down[j - 1] + down[j] + down[j + 1];
+
+            out[j] = (nbrs == 3 || (mid[j] + nbrs == 3)) ? 1 : 0;
+        }
+    }
+}
+
+/*
+ * Advance tile (bi, bj) by kk steps: previous -> current.
+ * scratch must hold 2 * (B + 2K)^2 cells.
+ */
+static void advance_tile(const cell_t *previous, cell_t *current, cell_t *scratch,
+                         int N, int B, int K, int kk, int bi, int bj)
+{
+    int i0 = 1 + bi * B, i1 = imin(i0 + B, N - 1);
+    int j0 = 1 + bj * B, j1 = imin(j0 + B, N - 1);
+
+    /* Tile plus kk-wide halo, clipped to the board (border included) */
+    int gi0 = imax(0, i0 - kk), gi1 = imin(N, i1 + kk);
+    int gj0 = imax(0, j0 - kk), gj1 = imin(N, j1 + kk);
+    int ld = gj1 - gj0;
+    size_t L = (size_t)(B + 2 * K) * (B + 2 * K);
+    cell_t *src = scratch, *dst = scratch + L, *tmp;
+    int i, s;
+
+    /*
+     * Both buffers start from the same copy so that border cells (never
+     * updated) are valid in whichever buffer is the source.
+     */
+    for (i = gi0; i < gi1; ++i)
+    {
+        memcpy(src + (size_t)(i - gi0) * ld, previous + (size_t)i * N + gj0, ld);
+        memcpy(dst + (size_t)(i - gi0) * ld, previous + (size_t)i * N + gj0, ld);
+    }
+
+    for (s = 1; s <= kk; ++s)
+    {
+        /* Valid region after s steps: tile grown by kk - s, kept inside the interior */
+        int r0 = imax(1, i0 - kk + s), r1 = imin(N - 1, i1 + kk - s);
+        int c0 = imax(1, j0 - kk + s), c1 = imin(N - 1, j1 + kk - s);
+
+        step_local(src, dst, ld, r0 - gi0, r1 - gi0, c0 - gj0, c1 - gj0);
+        tmp = src;
+        src = dst;
+        dst = tmp;
+    }
+
+    for (i = i0; i < i1; ++i)
+        memcpy(current + (size_t)i * N + j0, src + (size_t)(i - gi0) * ld + (j0 - gj0), j1 - j0);
+}
+
+int main(int argc, char *argv[])
+{
+    int N;                        // array dimensions
+    int T;                        // time steps
+    int K;                        // steps fused per pass
+    int B;                        // tile size
+    int NT;                       // tiles per dimension
+    cell_t *current, *previous;   // boards - one for current pass, one for previous pass
+    cell_t *swap;                 // board pointer
+    cell_t **scratch;             // per-thread tile buffers
+    int nthreads;
+    int t, kk, bi, bj, p;         // helper variables
+
+    double time; // variables for timing
+    struct timeval ts, tf;
+
+    /*Read input arguments*/
+    if (argc < 3 || argc > 5)
+    {
+        fprintf(stderr, "Usage: ./exec ArraySize TimeSteps [K] [TileSize]\n");
+        exit(-1);
+    }
+    else
+    {
+        N = atoi(argv[1]);
+        T = atoi(argv[2]);
+        K = argc > 3 ? atoi(argv[3]) : DEFAULT_K;
+        B = argc > 4 ? atoi(argv[4]) : DEFAULT_TILE;
+        if (K < 1 || B < 1)
+        {
+            fprintf(stderr, "K and TileSize must be positive\n");
+            exit(-1);
+        }
+    }
+
+    NT = (N - 2 + B - 1) / B;
+
+    /*Allocate and initialize boards*/
+    current = allocate_board(N);  // allocate board for current pass
+    previous = allocate_board(N); // allocate board for previous pass
+
+    nthreads = omp_get_max_threads();
+    scratch = malloc(nthreads * sizeof(cell_t *));
+    for (p = 0; p < nthreads; p++)
+        scratch[p] = malloc(2 * (size_t)(B + 2 * K) * (B + 2 * K));
+
+    init_random(previous, current, N); // initialize previous board with pattern
+
+#ifdef OUTPUT
+    print_to_pgm(previous, N, 0);
+#endif
+
+    /*Game of Life*/
+
+    gettimeofday(&ts, NULL);
+
+    for (t = 0; t < T; t += kk)
+    {
+        kk = imin(K, T - t); /* the last pass may fuse fewer steps */
+
+/* One task per tile; each thread reuses its own scratch buffer */
+#pragma omp parallel for collapse(2) schedule(static) private(bi, bj) shared(N, B, K, kk, NT, previous, current, scratch)
+        for (bi = 0; bi < NT; ++bi)
+        {
+            for (bj = 0; bj < NT; ++bj)
+            {
+                advance_tile(previous, current, scratch[omp_get_thread_num()], N, B, K, kk, bi, bj);
+            }
+        } /* implicit barrier here: all tiles advanced by kk steps */
+
+#ifdef OUTPUT
+        print_to_pgm(current, N, t + kk); /* single thread here: we're back in serial */
+#endif
+
+        swap = current;
+        current = previous;
+        previous = swap;
+    }
+
+    gettimeofday(&tf, NULL);
+    time = (tf.tv_sec - ts.tv_sec) + (tf.tv_usec - ts.tv_usec) * 0.000001;
+
+    for (p = 0; p < nthreads; p++)
+        free(scratch[p]);
+    free(scratch);
+    free(current);
+    free(previous);
+    printf("GameOfLife: Size %d Steps %d Time %lf K %d Tile %d\n", N, T, time, K, B);
+#ifdef OUTPUT
+    system(FINALIZE);
+#endif
+}
+
+cell_t *allocate_board(int N)
+{
+    cell_t *board = calloc((size_t)N * N, sizeof(cell_t));
+    if (!board)
+    {
+        fprintf(stderr, "Could not allocate %d x %d board\n", N, N);
+        exit(-1);
+    }
+    return board;
+}
+
+void init_random(cell_t *board1, cell_t *board2, int N)
+{
+    int i, pos;
+
+    for (i = 0; i < (N * N) / 10; i++)
+    {
+        pos = rand() % ((N - 2) * (N - 2));
+        board1[(size_t)(pos % (N - 2) + 1) * N + pos / (N - 2) + 1] = 1;
+        board2[(size_t)(pos % (N - 2) + 1) * N + pos / (N - 2) + 1] = 1;
+    }
+}
+
+void print_to_pgm(cell_t *board, int N, int t)
+{
+    char *s = malloc(30 * sizeof(char));
+    sprintf(s, "out%d.pgm", t);
+    FILE *f = fopen(s, "wb");
+    fprintf(f, "P5\n%d %d 1\n", N, N);
+    fwrite(board, 1, (size_t)N * N, f);
+    fclose(f);
+    free(s);
+}
@@ -0,0 +1,50 @@
+#!/bin/bash
+#PBS -q parlab
+#PBS -N life_mpi
+#PBS -l nodes=8:ppn=8
+#PBS -l walltime=01:00:00
+#PBS -o life_mpi.out
+#PBS -e life_mpi.err
+
+
+module load openmpi/1.8.3
+
+cd $PBS_O_WORKDIR
+
+: "${STEPS:=1000}"
+
+SIZES=(4096 8192 16384)
+
+CONFIGS=(
+    "1 1 1"
+    "2 2 1"
+    "4 2 2"
+    "8 4 2"
+    "16 4 4"
+    "32 8 4"
+    "64 8 8"
+)
+
+echo "=================================================================="
+echo "Starting MPI Game of Life benchmarks at $(date)"
+echo "Config: T=${STEPS} steps"
+echo "=================================================================="
+
+for SIZE in "${SIZES[@]}"; do
+    echo "  --> Board Size: ${SIZE}x${SIZE}"
+
+    for CONF in "${CONFIGS[@]}"; do
+
+        read P Px Py <<< "$CONF"
+
+        echo "      Processes: $P (Grid: ${Px}x${Py})"
+
+        for (( i=1; i<=3; i++ )); do
+            mpirun -np $P --mca btl tcp,self ./life_mpi $SIZE $STEPS $Px $Py
+        done
+        echo "      ----------------------------------"
+    done
+    echo "=================================================================="
+done
+
+echo "Benchmarks finished at $(date)"
@@ -20,6 +20,8 @@ module load openmp
 : "${THREADS:=8}"
 : "${N:=1024}"
 : "${STEPS:=1000}"
+: "${EXEC:=life_par}"                 # life_par | life_bit | life_active | life_tb | life_np
+: "${ARGS:=}"                         # extra engine arguments (e.g. "K TileSize" for life_tb)
 
 ## Start
 cd /home/parallel/parlab05/a1/ || exit 1
@@ -28,9 +30,26 @@ cd /home/parallel/parlab05/a1/ || exit 1
 export OMP_NUM_THREADS="${THREADS}"   # 1,2,4,6,8 per the assignment
 
 # Run and capture outputs by config
-RESULT_DIR="benchmarks/N${N}_T${THREADS}"
+# life_par keeps the original layout, other engines get their own subfolder
+if [ "${EXEC}" = "life_par" ]; then
+  RESULT_DIR="benchmarks/N${N}_T${THREADS}"
+else
+  RESULT_DIR="benchmarks/${EXEC}/N${N}_T${THREADS}"
+fi
+# Sweeps over engine arguments (e.g. K) must not overwrite each other
+if [ -n "${ARGS}" ]; then
+  RESULT_DIR="${RESULT_DIR}_A${ARGS// /_}"
+fi
 mkdir -p "${RESULT_DIR}"
 
-./life_par "${N}" "${STEPS}" \
-  > "${RESULT_DIR}/life_${THREADS}_${N}.out" \
-  2> "${RESULT_DIR}/life_${THREADS}_${N}.err"
+if [ "${EXEC}" = "life_np" ]; then
+  # NumPy reference engine: THREADS becomes the number of pool workers
+  python3 diagrams/life_np.py "${N}" "${STEPS}" --workers "${THREADS}" \
+    > "${RESULT_DIR}/life_${THREADS}_${N}.out" \
+    2> "${RESULT_DIR}/life_${THREADS}_${N}.err"
+else
+  # shellcheck disable=SC2086
+  "./${EXEC}" "${N}" "${STEPS}" ${ARGS} \
+    > "${RESULT_DIR}/life_${THREADS}_${N}.out" \
+    2> "${RESULT_DIR}/life_${THREADS}_${N}.err"
+fi
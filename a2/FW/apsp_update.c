@@ -0,0 +1,73 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <omp.h>
+#include "apsp_update.h"
+
+/*
+ * A new shortest i -> j path either avoids the new edge (D[i][j]) or
+ * uses it exactly once (D[i][u] + w + D[v][j]). Column u and row v do
+ * not change (weights are non-negative, D[v][u] + w >= 0), so they are
+ * copied once and every row can be updated independently.
+ */
+int apsp_decrease_edge(int *D, int N, int u, int v, int w)
+{
+	int *col_u, *row_v;
+	int i;
+
+	if (w >= D[(size_t)u*N+v])
+		return 0;
+
+	col_u = malloc(N*sizeof(int));
+	row_v = malloc(N*sizeof(int));
+	memcpy(row_v, D+(size_t)v*N, N*sizeof(int));
+	for(i=0; i<N; i++) col_u[i]=D[(size_t)i*N+u];
+
+	#pragma omp parallel for schedule(static) shared(D,N,col_u,row_v,w)
+	for(i=0; i<N; i++){
+		int *row_i = D+(size_t)i*N;
+		const int via_u = col_u[i]+w;
+		int j;
+		#pragma omp simd
+		for(j=0; j<N; j++){
+			int via = via_u+row_v[j];
+			row_i[j] = row_i[j] < via ? row_i[j] : via;
+		}
+	}
+
+	free(col_u);
+	free(row_v);
+	return 1;
+}
+
+int apsp_apply_batch(int *D, int N, const edge_t *edges, int m)
+{
+	int e, changed=0;
+
+	for(e=0; e<m; e++)
+		changed += apsp_decrease_edge(D, N, edges[e].u, edges[e].v, edges[e].w);
+	return changed;
+}
+
+int edges_read(const char *path, edge_t **edges)
+{
+	FILE *f;
+	int m=0, cap=64;
+	edge_t e;
+
+	f = fopen(path, "r");
+	if (!f){
+		perror(path);
+		exit(1);
+	}
+	*edges = malloc(cap*sizeof(edge_t));
+	while (fscanf(f, "%d %d %d", &e.u, &e.v, &e.w) == 3){
+		if (m == cap){
+			cap *= 2;
+			*edges = realloc(*edges, cap*sizeof(edge_t));
+		}
+		(*edges)[m++] = e;
+	}
+	fclose(f);
+	return m;
+}
@@ -0,0 +1,27 @@
+/*
+ * Incremental all-pairs shortest paths for edge-weight decreases
+ * and edge insertions on a contiguous row-major N x N distance
+ * matrix (the result of any FW binary).
+ */
+#ifndef APSP_UPDATE_H
+#define APSP_UPDATE_H
+
+typedef struct {
+	int u, v;	/* edge u -> v */
+	int w;		/* new (smaller) weight, or weight of the inserted edge */
+} edge_t;
+
+/*
+ * Lower edge u -> v to weight w and repair D in O(N^2), rows in parallel.
+ * Returns 1 if the edge shortened D[u][v] (and possibly other paths),
+ * 0 if w >= D[u][v] and nothing had to change.
+ */
+int apsp_decrease_edge(int *D, int N, int u, int v, int w);
+
+/* Apply m updates in order; returns how many of them changed D */
+int apsp_apply_batch(int *D, int N, const edge_t *edges, int m);
+
+/* Read "u v w" lines; returns the number of edges, *edges is malloc'ed */
+int edges_read(const char *path, edge_t **edges);
+
+#endif
@@ -1,33 +1,41 @@
 /*
  * Standard implementation of the Floyd-Warshall Algorithm
+ * command-line arguments: N [IN|- [OUT]]
+ * IN/OUT = binary matrix files (matrix_io.h): the graph is read from IN
+ * instead of generated, and the result is written into OUT
  */
 
 #include <stdio.h>
 #include <stdlib.h>
 #include <sys/time.h>
 #include "util.h"
+#include "matrix_io.h"
 
 inline int min(int a, int b);
 
 int main(int argc, char **argv)
 {
 	int **A;
+	matrix_t MM;
 	int i,j,k;
 	struct timeval t1, t2;
 	double time;
 	int N=1024;
 
-	if (argc != 2) {
-		fprintf(stdout,"Usage: %s N\n", argv[0]);
+	if (argc < 2 || argc > 4) {
+		fprintf(stdout,"Usage: %s N [IN|- [OUT]]\n", argv[0]);
 		exit(0);
 	}
 
 	N=atoi(argv[1]);
 
+	// rows of the (possibly file-backed) contiguous matrix
+	int fromfile = matrix_open(&MM, argc>2 ? argv[2] : NULL, argc>3 ? argv[3] : NULL, N);
 	A = (int **) malloc(N*sizeof(int *));
-	for(i=0; i<N; i++) A[i] = (int *) malloc(N*sizeof(int));
+	for(i=0; i<N; i++) A[i] = MM.data + (size_t)i*N;
 
-	graph_init_random(A,-1,N,128*N);
+	if (!fromfile)
+		graph_init_random(A,-1,N,128*N);
 
 	gettimeofday(&t1,0);
 	for(k=0;k<N;k++)
@@ -45,6 +53,8 @@ int main(int argc, char **argv)
 		for(j=0; j<N; j++) fprintf(stdout,"%d\n", A[i][j]);
 	*/
 
+	matrix_close(&MM);
+	free(A);
 	return 0;     
 }
 
@@ -0,0 +1,65 @@
+/*
+ * Min-plus tile kernel for Floyd-Warshall on a contiguous row-major
+ * N x N matrix (leading dimension N).
+ *
+ * Updates tile (I,J) of size B with pivots K..K+B-1:
+ *   A[i][j] = min(A[i][j], A[i][k] + A[k][j])
+ *
+ * The inner loop is branch-free and unit-stride, so the compiler turns
+ * it into packed add/min instructions. It is also safe to vectorise when
+ * the tile overlaps row k or column k (diagonal, pivot row/column tiles):
+ * with non-negative weights and A[k][k] == 0 those entries never change
+ * during step k, so reading A[i][k] once per row and A[k][j] as a vector
+ * gives the same result as the scalar loop.
+ */
+#ifndef FW_KERNEL_H
+#define FW_KERNEL_H
+
+#include <stddef.h>
+
+static inline void fw_tile(int *A, int N, int K, int I, int J, int B)
+{
+	int i, j, k;
+
+	for(k=K; k<K+B; k++){
+		const int *rowk = A + (size_t)k*N + J;
+		for(i=I; i<I+B; i++){
+			int *rowi = A + (size_t)i*N + J;
+			const int aik = A[(size_t)i*N + k];
+			#pragma omp simd
+			for(j=0; j<B; j++){
+				int via = aik + rowk[j];
+				rowi[j] = rowi[j] < via ? rowi[j] : via;
+			}
+		}
+	}
+}
+
+/*
+ * Same update with the pivot column and row taken from separate buffers
+ * (the distributed engine keeps received pivot panels outside A):
+ *   C[i][j] = min(C[i][j], colk[i][k] + rowk[k][j]),  0 <= i,j,k < B
+ * C, colk and rowk point at the tile's first element; ldc, ldcol and
+ * ldrow are their leading dimensions. colk or rowk may alias C for
+ * pivot row/column tiles, for the same reason as above.
+ */
+static inline void fw_tile_panels(int *C, int ldc, const int *colk, int ldcol,
+				  const int *rowk, int ldrow, int B)
+{
+	int i, j, k;
+
+	for(k=0; k<B; k++){
+		const int *rk = rowk + (size_t)k*ldrow;
+		for(i=0; i<B; i++){
+			int *ci = C + (size_t)i*ldc;
+			const int aik = colk[(size_t)i*ldcol + k];
+			#pragma omp simd
+			for(j=0; j<B; j++){
+				int via = aik + rk[j];
+				ci[j] = ci[j] < via ? ci[j] : via;
+			}
+		}
+	}
+}
+
+#endif
@@ -0,0 +1,261 @@
+/*
+ * Distributed Floyd-Warshall (MPI + OpenMP) on a sqrt(P) x sqrt(P)
+ * process grid with a 2D block decomposition.
+ * command-line arguments: N, B
+ * N = size of graph
+ * B = size of tile (and of the pivot block of each round)
+ * Usage: mpirun -np P ./fw_mpi N B, with P a perfect square q*q and
+ * N a multiple of q*B; each rank holds one (N/q) x (N/q) block.
+ * No IN/OUT matrix files (matrix_io.h) yet: the graph is always
+ * generated, and the distributed result is not written out.
+ *
+ * Round K (pivot rows/columns K*B .. K*B+B-1):
+ *   1. the owner of diagonal tile (K,K) closes it and broadcasts it
+ *      along its row and column communicators;
+ *   2. the ranks of process row / column K update their tiles of the
+ *      pivot row / column and broadcast them (MPI_Ibcast) down the
+ *      column / along the row communicators;
+ *   3. every rank updates its remaining tiles from the two panels.
+ * Rounds are pipelined one deep: a rank first updates the tiles that
+ * round K+1 pivots on, starts round K+1's broadcasts, and only then
+ * updates the rest of its block for round K, so the panel broadcasts
+ * travel while the bulk of the local work is done.
+ *
+ * The graph is the one of the shared-memory drivers (rank 0 generates
+ * it strip by strip and scatters the blocks; untimed).
+ * Output (rank 0): FW_MPI,N,B,time
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <sys/time.h>
+#include <omp.h>
+#include "mpi.h"
+#include "util.h"
+#include "fw_kernel.h"
+
+/* Which local tiles update() touches, relative to the next pivot block */
+#define UPDATE_ALL  0
+#define UPDATE_NEXT 1	/* only tiles in the next pivot row/column */
+#define UPDATE_REST 2	/* all but those */
+
+/* Process grid and local block, shared by the helpers below */
+static int q, myrow, mycol, nb, B;
+static MPI_Comm cart_comm, row_comm, col_comm;
+
+static void scatter_random_graph(int *A, int N);
+static void pivot(int *A, int K, int *diag, int *rowbuf, int *colbuf, MPI_Request *req);
+static void update(int *A, int K, const int *rowbuf, const int *colbuf, int part, MPI_Request *req);
+
+int main(int argc, char **argv)
+{
+	int *A, *diag, *rowbuf[2], *colbuf[2];
+	int rank, size, provided;
+	int N=1024;
+	int K, nrounds;
+	int dims[2], periods[2] = {0, 0}, coords[2], keep[2];
+	MPI_Request req[2][2];
+	struct timeval t1, t2;
+	double time, max_time;
+
+	MPI_Init_thread(&argc, &argv, MPI_THREAD_FUNNELED, &provided);
+	MPI_Comm_size(MPI_COMM_WORLD, &size);
+	MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+	if (argc != 3){
+		if (rank == 0)
+			fprintf(stdout, "Usage mpirun -np P %s N B   (graph generated, no IN/OUT matrix files)\n", argv[0]);
+		MPI_Finalize();
+		exit(0);
+	}
+
+	N=atoi(argv[1]);
+	B=atoi(argv[2]);
+
+	q = (int)(sqrt((double)size) + 0.5);
+	if (q*q != size || N % (q*B) != 0){
+		if (rank == 0)
+			fprintf(stdout, "P must be a perfect square q*q and N a multiple of q*B\n");
+		MPI_Finalize();
+		exit(0);
+	}
+	nb = N/q;
+	nrounds = N/B;
+
+	//----q x q grid, row and column communicators----//
+	dims[0] = dims[1] = q;
+	MPI_Cart_create(MPI_COMM_WORLD, 2, dims, periods, 0, &cart_comm);
+	MPI_Comm_rank(cart_comm, &rank);
+	MPI_Cart_coords(cart_comm, rank, 2, coords);
+	myrow = coords[0];
+	mycol = coords[1];
+	keep[0] = 0; keep[1] = 1;	/* rank in row_comm == column coordinate */
+	MPI_Cart_sub(cart_comm, keep, &row_comm);
+	keep[0] = 1; keep[1] = 0;	/* rank in col_comm == row coordinate */
+	MPI_Cart_sub(cart_comm, keep, &col_comm);
+
+	A = graph_alloc_flat(nb);
+	diag = malloc((size_t)B*B*sizeof(int));
+	for (K = 0; K < 2; K++){
+		rowbuf[K] = malloc((size_t)B*nb*sizeof(int));
+		colbuf[K] = malloc((size_t)nb*B*sizeof(int));
+	}
+
+	scatter_random_graph(A, N);
+
+	MPI_Barrier(cart_comm);
+	gettimeofday(&t1,0);
+
+	pivot(A, 0, diag, rowbuf[0], colbuf[0], req[0]);
+	MPI_Waitall(2, req[0], MPI_STATUSES_IGNORE);
+	for (K = 0; K < nrounds; K++){
+		const int *rb = rowbuf[K%2], *cb = colbuf[K%2];
+
+		if (K+1 < nrounds){
+			/* round K on the tiles round K+1 pivots on, then start its broadcasts */
+			update(A, K, rb, cb, UPDATE_NEXT, NULL);
+			pivot(A, K+1, diag, rowbuf[(K+1)%2], colbuf[(K+1)%2], req[(K+1)%2]);
+			/* round K on everything else, polling the broadcasts in flight */
+			update(A, K, rb, cb, UPDATE_REST, req[(K+1)%2]);
+			MPI_Waitall(2, req[(K+1)%2], MPI_STATUSES_IGNORE);
+		}
+		else
+			update(A, K, rb, cb, UPDATE_ALL, NULL);
+	}
+
+	gettimeofday(&t2,0);
+
+	time=(double)((t2.tv_sec-t1.tv_sec)*1000000+t2.tv_usec-t1.tv_usec)/1000000;
+	MPI_Reduce(&time, &max_time, 1, MPI_DOUBLE, MPI_MAX, 0, cart_comm);
+	if (rank == 0)
+		printf("FW_MPI,%d,%d,%.4f\n", N,B,max_time);
+
+	for (K = 0; K < 2; K++){
+		free(rowbuf[K]);
+		free(colbuf[K]);
+	}
+	free(diag);
+	free(A);
+	MPI_Comm_free(&row_comm);
+	MPI_Comm_free(&col_comm);
+	MPI_Comm_free(&cart_comm);
+	MPI_Finalize();
+	return 0;
+}
+
+/*
+ * Same graph as graph_init_random_flat(-1): rank 0 draws it B rows at a
+ * time in lrand48 order and sends each B x nb piece to its owner.
+ */
+static void scatter_random_graph(int *A, int N)
+{
+	int *strip = NULL;
+	int rank, dest, s, r, c, pc, coords[2];
+	MPI_Datatype piece;
+
+	MPI_Comm_rank(cart_comm, &rank);
+	if (rank != 0){
+		for (s = 0; s < nb/B; s++)
+			MPI_Recv(A + (size_t)s*B*nb, B*nb, MPI_INT, 0, s, cart_comm, MPI_STATUS_IGNORE);
+		return;
+	}
+
+	MPI_Type_vector(B, nb, N, MPI_INT, &piece);
+	MPI_Type_commit(&piece);
+	strip = malloc((size_t)B*N*sizeof(int));
+
+	srand48(-1);
+	for (s = 0; s < N/B; s++){
+		for (r = 0; r < B; r++){
+			for (c = 0; c < N; c++)
+				strip[(size_t)r*N+c] = abs(((int)lrand48()) % 1048576);
+			strip[(size_t)r*N + s*B+r] = 0;
+		}
+		coords[0] = (s*B)/nb;
+		for (pc = 0; pc < q; pc++){
+			coords[1] = pc;
+			MPI_Cart_rank(cart_comm, coords, &dest);
+			if (dest == 0)
+				for (r = 0; r < B; r++)
+					memcpy(A + (size_t)((s*B)%nb + r)*nb, strip + (size_t)r*N + pc*nb, nb*sizeof(int));
+			else
+				MPI_Send(strip + (size_t)pc*nb, 1, piece, dest, s % (nb/B), cart_comm);
+		}
+	}
+
+	free(strip);
+	MPI_Type_free(&piece);
+}
+
+/*
+ * Phases 1 and 2 of round K: close the diagonal tile, update the local
+ * part of the pivot row/column, copy it to rowbuf/colbuf and start the
+ * panel broadcasts (req[0]: row panel, req[1]: column panel).
+ */
+static void pivot(int *A, int K, int *diag, int *rowbuf, int *colbuf, MPI_Request *req)
+{
+	int kr = (K*B)/nb, kc = (K*B)/nb, kl = (K*B)%nb;
+	int t, i;
+
+	if (myrow == kr && mycol == kc){
+		fw_tile(A, nb, kl, kl, kl, B);
+		for (i = 0; i < B; i++)
+			memcpy(diag + (size_t)i*B, A + (size_t)(kl+i)*nb + kl, B*sizeof(int));
+	}
+	if (myrow == kr)
+		MPI_Bcast(diag, B*B, MPI_INT, kc, row_comm);
+	if (mycol == kc)
+		MPI_Bcast(diag, B*B, MPI_INT, kr, col_comm);
+
+	if (myrow == kr){
+		#pragma omp parallel for schedule(static)
+		for (t = 0; t < nb; t += B)
+			if (!(mycol == kc && t == kl))
+				fw_tile_panels(A + (size_t)kl*nb + t, nb, diag, B,
+					       A + (size_t)kl*nb + t, nb, B);
+		memcpy(rowbuf, A + (size_t)kl*nb, (size_t)B*nb*sizeof(int));
+	}
+	if (mycol == kc){
+		#pragma omp parallel for schedule(static)
+		for (t = 0; t < nb; t += B)
+			if (!(myrow == kr && t == kl))
+				fw_tile_panels(A + (size_t)t*nb + kl, nb, A + (size_t)t*nb + kl, nb,
+					       diag, B, B);
+		for (i = 0; i < nb; i++)
+			memcpy(colbuf + (size_t)i*B, A + (size_t)i*nb + kl, B*sizeof(int));
+	}
+
+	MPI_Ibcast(rowbuf, B*nb, MPI_INT, kr, col_comm, &req[0]);
+	MPI_Ibcast(colbuf, nb*B, MPI_INT, kc, row_comm, &req[1]);
+}
+
+/*
+ * Phase 3 of round K on the local tiles outside pivot row/column K;
+ * 'part' selects them relative to pivot block K+1 (UPDATE_*). With req,
+ * thread 0 tests the pending broadcasts between tiles so they progress
+ * while the block is being updated.
+ */
+static void update(int *A, int K, const int *rowbuf, const int *colbuf, int part, MPI_Request *req)
+{
+	int ntiles = nb/B;
+	int x, flag;
+
+	#pragma omp parallel for schedule(dynamic) private(flag)
+	for (x = 0; x < ntiles*ntiles; x++){
+		int I = (x/ntiles)*B, J = (x%ntiles)*B;
+		int gi = (myrow*nb + I)/B, gj = (mycol*nb + J)/B;
+		int next = gi == K+1 || gj == K+1;
+
+		if (gi == K || gj == K)
+			continue;
+		if ((part == UPDATE_NEXT && !next) || (part == UPDATE_REST && next))
+			continue;
+
+		fw_tile_panels(A + (size_t)I*nb + J, nb, colbuf + (size_t)I*B, B,
+			       rowbuf + J, nb, B);
+
+		if (req && omp_get_thread_num() == 0)
+			MPI_Testall(2, req, &flag, MPI_STATUSES_IGNORE);
+	}
+}
@@ -1,8 +1,10 @@
 /*
  * Recursive implementation of the Floyd-Warshall algorithm.
- * command line arguments: N, B
+ * command line arguments: N, B [IN|- [OUT]]
  * N = size of graph
  * B = size of submatrix when recursion stops
+ * IN/OUT = binary matrix files (matrix_io.h): the graph is read from IN
+ * instead of generated, and the result is written into OUT
  * works only for N, B = 2^k
  */
 
@@ -11,6 +13,7 @@
 #include <sys/time.h>
 #include <omp.h>
 #include "util.h"
+#include "matrix_io.h"
 
 inline int min(int a, int b);
 void FW_SR (int **A, int arow, int acol, 
@@ -21,14 +24,15 @@ void FW_SR (int **A, int arow, int acol,
 int main(int argc, char **argv)
 {
 	int **A;
+	matrix_t MM;
 	int i,j,k;
 	struct timeval t1, t2;
 	double time;
 	int B=16;
 	int N=1024;
 
-	if (argc !=3){
-		fprintf(stdout, "Usage %s N B \n", argv[0]);
+	if (argc < 3 || argc > 5){
+		fprintf(stdout, "Usage %s N B [IN|- [OUT]]\n", argv[0]);
 		exit(0);
 	}
 
@@ -40,10 +44,13 @@ int main(int argc, char **argv)
 		exit(0);
 	}
 
+	// rows of the (possibly file-backed) contiguous matrix
+	int fromfile = matrix_open(&MM, argc>3 ? argv[3] : NULL, argc>4 ? argv[4] : NULL, N);
 	A = (int **) malloc(N*sizeof(int *));
-	for(i=0; i<N; i++) A[i] = (int *) malloc(N*sizeof(int));
+	for(i=0; i<N; i++) A[i] = MM.data + (size_t)i*N;
 
-	graph_init_random(A,-1,N,128*N);
+	if (!fromfile)
+		graph_init_random(A,-1,N,128*N);
 	
 //-----------------------------------------------------------------------
 	gettimeofday(&t1,0);
@@ -64,6 +71,8 @@ int main(int argc, char **argv)
 //		for(j=0; j<N; j++) fprintf(stdout,"%d\n", A[i][j]);
 	
 
+	matrix_close(&MM);
+	free(A);
 	return 0;
 }
 
@@ -0,0 +1,300 @@
+/*
+ * Recursive implementation of the Floyd-Warshall algorithm on a
+ * Z-order (Morton, recursive blocked) matrix layout.
+ * command line arguments: N, B [, IN [, OUT]]
+ * N = size of graph
+ * B = size of submatrix when recursion stops
+ * IN  = optional matrix file (matrix_io.h) used instead of the random graph
+ *       ("-" for the random graph)
+ * OUT = optional matrix file the result is written to, zero-copy
+ * works only for N, B = 2^k
+ *
+ * Same task decomposition as fw_sr_p.c, but every submatrix the
+ * recursion touches is one contiguous block: a myN x myN block holds
+ * its four quadrants back to back in Z order (00, 01, 10, 11), down to
+ * B x B leaves stored row-major. The base case therefore streams
+ * through three contiguous B*B arrays instead of B separate rows.
+ * The row-major matrix is converted into the layout (and back) inside
+ * the timed region, so the reported time is comparable to fw_sr_p.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <omp.h>
+#include "util.h"
+#include "matrix_io.h"
+
+inline int min(int a, int b);
+void FW_SR (int *A, int *B, int *C, int myN, int bsize);
+void to_zorder(const int *M, int *Z, int N, int bsize);
+void from_zorder(const int *Z, int *M, int N, int bsize);
+
+int main(int argc, char **argv)
+{
+	int *M, *Z;
+	matrix_t MM;
+	int i,j,k;
+	struct timeval t1, t2;
+	double time;
+	int B=16;
+	int N=1024;
+
+	if (argc < 3 || argc > 5){
+		fprintf(stdout, "Usage %s N B [IN|- [OUT]]\n", argv[0]);
+		exit(0);
+	}
+
+	N=atoi(argv[1]);
+	B=atoi(argv[2]);
+
+	if ((N%B)!=0 || (N&(N-1))!=0 || (B&(B-1))!=0){
+		fprintf(stdout, "N and B must be powers of 2, N multiple of B\n");
+		exit(0);
+	}
+
+	if (!matrix_open(&MM, argc>3 ? argv[3] : NULL, argc>4 ? argv[4] : NULL, N))
+		graph_init_random_flat(MM.data,-1,N,128*N);
+	M = MM.data;
+	Z = graph_alloc_flat(N);
+	
+//-----------------------------------------------------------------------
+	gettimeofday(&t1,0);
+
+	to_zorder(M,Z,N,B);
+
+	#pragma omp parallel
+	#pragma omp single
+	{
+	FW_SR(Z,Z,Z,N,B);
+	}
+
+	from_zorder(Z,M,N,B);
+	
+	gettimeofday(&t2,0);
+
+	time=(double)((t2.tv_sec-t1.tv_sec)*1000000+t2.tv_usec-t1.tv_usec)/1000000;
+	printf("FW_SR_Z,%d,%d,%.4f\n", N, B, time);
+
+	
+//	for(i=0; i<N; i++)
+//		for(j=0; j<N; j++) fprintf(stdout,"%d\n", M[(size_t)i*N+j]);
+	
+
+	matrix_close(&MM);
+	free(Z);
+	return 0;
+}
+
+inline int min(int a, int b)
+{
+	if(a<=b)return a;
+	else return b;
+}
+
+/* Position of leaf block (bi,bj) in Z order: interleave row and column bits */
+static size_t morton(unsigned bi, unsigned bj)
+{
+	size_t z=0;
+	int b;
+
+	for(b=0; b<16; b++)
+		z |= (size_t)((bj>>b)&1) << (2*b) | (size_t)((bi>>b)&1) << (2*b+1);
+	return z;
+}
+
+void to_zorder(const int *M, int *Z, int N, int bsize)
+{
+	int nb=N/bsize, bi, bj, i;
+
+	#pragma omp parallel for collapse(2) schedule(static) private(i)
+	for(bi=0; bi<nb; bi++)
+		for(bj=0; bj<nb; bj++){
+			int *leaf = Z + morton(bi,bj)*bsize*bsize;
+			for(i=0; i<bsize; i++){
+				const int *src = M + (size_t)(bi*bsize+i)*N + (size_t)bj*bsize;
+				int j;
+				for(j=0; j<bsize; j++) leaf[i*bsize+j]=src[j];
+			}
+		}
+}
+
+void from_zorder(const int *Z, int *M, int N, int bsize)
+{
+	int nb=N/bsize, bi, bj, i;
+
+	#pragma omp parallel for collapse(2) schedule(static) private(i)
+	for(bi=0; bi<nb; bi++)
+		for(bj=0; bj<nb; bj++){
+			const int *leaf = Z + morton(bi,bj)*bsize*bsize;
+			for(i=0; i<bsize; i++){
+				int *dst = M + (size_t)(bi*bsize+i)*N + (size_t)bj*bsize;
+				int j;
+				for(j=0; j<bsize; j++) dst[j]=leaf[i*bsize+j];
+			}
+		}
+}
+
+/* Quadrants of a contiguous myN x myN Z-order block X (q = (myN/2)^2) */
+#define Q00(X) (X)
+#define Q01(X) ((X)+q)
+#define Q10(X) ((X)+2*q)
+#define Q11(X) ((X)+3*q)
+
+void FW_SR (int *A, int *B, int *C, int myN, int bsize)
+{
+	int k,i,j;
+	int h=myN/2;
+	size_t q=(size_t)h*h;
+	/*we use different task paral depending on the blocks A,B,C use.
+	If they use same blocks therre may be future depedencies , else not*/
+	
+	//case check: a block is identified by its start address
+	int case_id;
+	if (A==B && A==C) case_id=0; //A,B,C same block
+	else if (A==B) case_id=1; //A,B same block
+	else if (A==C) case_id=2; //A,C same block
+	else case_id=3; //A separate from B and C
+
+	/*
+	 * Base case: same update as fw_sr_p.c, on a contiguous row-major leaf.
+	 */
+	if(myN<=bsize)
+		for(k=0; k<myN; k++)
+			for(i=0; i<myN; i++)
+				for(j=0; j<myN; j++)
+					A[i*myN+j]=min(A[i*myN+j], B[i*myN+k]+C[k*myN+j]);
+	else {
+
+		switch(case_id){
+			case 0: //A,B,C same block
+			{
+				//call1
+				FW_SR(Q00(A),Q00(B),Q00(C), h, bsize);
+
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call2	
+					FW_SR(Q01(A),Q00(B),Q01(C), h, bsize);
+				}	
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call3
+					FW_SR(Q10(A),Q10(B),Q00(C), h, bsize);
+				}
+				#pragma omp taskwait
+
+				//call4
+				FW_SR(Q11(A),Q10(B),Q01(C), h, bsize);
+
+				//call5
+				FW_SR(Q11(A),Q11(B),Q11(C), h, bsize);
+
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call6
+					FW_SR(Q10(A),Q11(B),Q10(C), h, bsize);
+				}
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call7
+					FW_SR(Q01(A),Q01(B),Q11(C), h, bsize);
+				}
+				#pragma omp taskwait
+				
+				//call8
+				FW_SR(Q00(A),Q01(B),Q10(C), h, bsize);
+			}
+			break;
+			case 1: //A,B same block
+			{
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call1
+					FW_SR(Q00(A),Q00(B),Q00(C), h, bsize);
+					//call2
+					FW_SR(Q01(A),Q00(B),Q01(C), h, bsize);
+					//call7
+					FW_SR(Q01(A),Q01(B),Q11(C), h, bsize);
+					//call8
+					FW_SR(Q00(A),Q01(B),Q10(C), h, bsize);
+				}	
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call3
+					FW_SR(Q10(A),Q10(B),Q00(C), h, bsize);
+					//call4
+					FW_SR(Q11(A),Q10(B),Q01(C), h, bsize);
+					//call5
+					FW_SR(Q11(A),Q11(B),Q11(C), h, bsize);
+					//call6
+					FW_SR(Q10(A),Q11(B),Q10(C), h, bsize);
+				}
+				
+				#pragma omp taskwait
+			}
+			break;
+			case 2: //A,C same block
+			{
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call1
+					FW_SR(Q00(A),Q00(B),Q00(C), h, bsize);
+					//call3
+					FW_SR(Q10(A),Q10(B),Q00(C), h, bsize);
+					//call6
+					FW_SR(Q10(A),Q11(B),Q10(C), h, bsize);
+					//call8
+					FW_SR(Q00(A),Q01(B),Q10(C), h, bsize);
+				}	
+				#pragma omp task firstprivate(A,B,C,h,q,bsize)
+				{
+					//call2
+					FW_SR(Q01(A),Q00(B),Q01(C), h, bsize);
+					//call4
+					FW_SR(Q11(A),Q10(B),Q01(C), h, bsize);
+					//call5
+					FW_SR(Q11(A),Q11(B),Q11(C), h, bsize);
+					//call7
+					FW_SR(Q01(A),Q01(B),Q11(C), h, bsize);
+				}
+				
+				#pragma omp taskwait
+			}
+			break;
+			case 3: //A separate from B and C
+			#pragma omp task firstprivate(A,B,C,h,q,bsize)
+			{
+				//call1
+				FW_SR(Q00(A),Q00(B),Q00(C), h, bsize);
+				//call8
+				FW_SR(Q00(A),Q01(B),Q10(C), h, bsize);
+
+			}
+			#pragma omp task firstprivate(A,B,C,h,q,bsize)
+			{
+				//call2
+				FW_SR(Q01(A),Q00(B),Q01(C), h, bsize);
+				//call7
+				FW_SR(Q01(A),Q01(B),Q11(C), h, bsize);
+			}
+			#pragma omp task firstprivate(A,B,C,h,q,bsize)
+			{
+				//call3
+				FW_SR(Q10(A),Q10(B),Q00(C), h, bsize);
+				//call6
+				FW_SR(Q10(A),Q11(B),Q10(C), h, bsize);
+			}
+			#pragma omp task firstprivate(A,B,C,h,q,bsize)
+			{
+				//call4
+				FW_SR(Q11(A),Q10(B),Q01(C), h, bsize);
+				//call5
+				FW_SR(Q11(A),Q11(B),Q11(C), h, bsize);
+			}
+			#pragma omp taskwait
+			
+			break;
+		}
+	}
+}
@@ -0,0 +1,86 @@
+/*
+ * Tiled version of the Floyd-Warshall algorithm on one contiguous,
+ * 64-byte aligned matrix, with a vectorisable min-plus tile kernel
+ * (see fw_kernel.h) and OpenMP parallel phases.
+ * command-line arguments: N, B [, IN [, OUT]]
+ * N = size of graph
+ * B = size of tile
+ * IN  = optional matrix file (matrix_io.h) used instead of the random graph
+ *       ("-" for the random graph)
+ * OUT = optional matrix file the result is written to, zero-copy
+ * works only when N is a multiple of B
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <omp.h>
+#include "util.h"
+#include "fw_kernel.h"
+#include "matrix_io.h"
+
+int main(int argc, char **argv)
+{
+	int *A;
+	matrix_t M;
+	int i,j,k;
+	struct timeval t1, t2;
+	double time;
+	int B=64;
+	int N=1024;
+	int nb;
+
+	if (argc < 3 || argc > 5){
+		fprintf(stdout, "Usage %s N B [IN|- [OUT]]\n", argv[0]);
+		exit(0);
+	}
+
+	N=atoi(argv[1]);
+	B=atoi(argv[2]);
+
+	if ((N%B)!=0){
+		fprintf(stdout, "N must be multiple of B\n");
+		exit(0);
+	}
+	nb=N/B;
+
+	if (!matrix_open(&M, argc>3 ? argv[3] : NULL, argc>4 ? argv[4] : NULL, N))
+		graph_init_random_flat(M.data,-1,N,128*N);
+	A=M.data;
+
+	gettimeofday(&t1,0);
+
+	#pragma omp parallel private(i,j,k) shared(A,N,B,nb)
+	for(k=0;k<N;k+=B){
+		/* phase 1: diagonal tile */
+		#pragma omp single
+		fw_tile(A,N,k,k,k,B);
+
+		/* phase 2: pivot row and pivot column tiles */
+		#pragma omp for schedule(static)
+		for(i=0; i<2*nb; i++){
+			int t=(i%nb)*B;
+			if (t==k) continue;
+			if (i<nb) fw_tile(A,N,k,t,k,B);
+			else      fw_tile(A,N,k,k,t,B);
+		}
+
+		/* phase 3: remaining tiles */
+		#pragma omp for collapse(2) schedule(static)
+		for(i=0; i<N; i+=B)
+			for(j=0; j<N; j+=B)
+				if (i!=k && j!=k)
+					fw_tile(A,N,k,i,j,B);
+	}
+	gettimeofday(&t2,0);
+
+	time=(double)((t2.tv_sec-t1.tv_sec)*1000000+t2.tv_usec-t1.tv_usec)/1000000;
+	printf("FW_TILED,%d,%d,%.4f\n", N,B,time);
+
+	/*
+	for(i=0; i<N; i++)
+		for(j=0; j<N; j++) fprintf(stdout,"%d\n", A[(size_t)i*N+j]);
+	*/
+
+	matrix_close(&M);
+	return 0;
+}
@@ -0,0 +1,107 @@
+/*
+ * Tiled Floyd-Warshall as an OpenMP task graph.
+ * command-line arguments: N, B [, IN [, OUT]]
+ * N = size of graph
+ * B = size of tile
+ * IN  = optional matrix file (matrix_io.h) used instead of the random graph
+ *       ("-" for the random graph)
+ * OUT = optional matrix file the result is written to, zero-copy
+ * works only when N is a multiple of B
+ *
+ * Every tile update of every round k is one task. Dependencies are
+ * declared on the first element of each tile, so the runtime only
+ * orders what the algorithm really needs:
+ *   diagonal (K,K):     inout (K,K)
+ *   pivot row (K,J):    in (K,K),           inout (K,J)
+ *   pivot column (I,K): in (K,K),           inout (I,K)
+ *   other (I,J):        in (I,K), in (K,J), inout (I,J)
+ * There are no barriers between phases or rounds: once the pivot tiles
+ * of round k+1 are ready, its updates start while round k still drains.
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/time.h>
+#include <omp.h>
+#include "util.h"
+#include "fw_kernel.h"
+#include "matrix_io.h"
+
+/* First element of tile (I,J): the dependency object for the whole tile */
+#define TILE(A,N,I,J) (A)[(size_t)(I)*(N)+(J)]
+
+int main(int argc, char **argv)
+{
+	int *A;
+	matrix_t M;
+	int i,j,k;
+	struct timeval t1, t2;
+	double time;
+	int B=64;
+	int N=1024;
+
+	if (argc < 3 || argc > 5){
+		fprintf(stdout, "Usage %s N B [IN|- [OUT]]\n", argv[0]);
+		exit(0);
+	}
+
+	N=atoi(argv[1]);
+	B=atoi(argv[2]);
+
+	if ((N%B)!=0){
+		fprintf(stdout, "N must be multiple of B\n");
+		exit(0);
+	}
+
+	if (!matrix_open(&M, argc>3 ? argv[3] : NULL, argc>4 ? argv[4] : NULL, N))
+		graph_init_random_flat(M.data,-1,N,128*N);
+	A=M.data;
+
+	gettimeofday(&t1,0);
+
+	#pragma omp parallel
+	#pragma omp single
+	{
+	for(k=0;k<N;k+=B){
+		#pragma omp task firstprivate(k) shared(A,N,B) \
+			depend(inout: TILE(A,N,k,k))
+		fw_tile(A,N,k,k,k,B);
+
+		for(j=0; j<N; j+=B){
+			if (j==k) continue;
+			#pragma omp task firstprivate(k,j) shared(A,N,B) \
+				depend(in: TILE(A,N,k,k)) depend(inout: TILE(A,N,k,j))
+			fw_tile(A,N,k,k,j,B);
+		}
+
+		for(i=0; i<N; i+=B){
+			if (i==k) continue;
+			#pragma omp task firstprivate(k,i) shared(A,N,B) \
+				depend(in: TILE(A,N,k,k)) depend(inout: TILE(A,N,i,k))
+			fw_tile(A,N,k,i,k,B);
+		}
+
+		for(i=0; i<N; i+=B){
+			if (i==k) continue;
+			for(j=0; j<N; j+=B){
+				if (j==k) continue;
+				#pragma omp task firstprivate(k,i,j) shared(A,N,B) \
+					depend(in: TILE(A,N,i,k), TILE(A,N,k,j)) depend(inout: TILE(A,N,i,j))
+				fw_tile(A,N,k,i,j,B);
+			}
+		}
+	}
+	#pragma omp taskwait
+	}
+	gettimeofday(&t2,0);
+
+	time=(double)((t2.tv_sec-t1.tv_sec)*1000000+t2.tv_usec-t1.tv_usec)/1000000;
+	printf("FW_TILED_TASKS,%d,%d,%.4f\n", N,B,time);
+
+	/*
+	for(i=0; i<N; i++)
+		for(j=0; j<N; j++) fprintf(stdout,"%d\n", A[(size_t)i*N+j]);
+	*/
+
+	matrix_close(&M);
+	return 0;
+}
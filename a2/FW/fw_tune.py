@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# fw_tune.py
+#
+# Block-size auto-tuner for the FW binaries that take "N B" arguments
+# (fw_sr_p, fw_sr_z, fw_tiled, fw_tiled_flat, fw_tiled_tasks).
+#
+# Usage:
+#   python3 fw_tune.py tune ./fw_sr_p 4096 --threads 64       # search, store, print best B
+#   python3 fw_tune.py get  ./fw_sr_p 4096 --threads 64       # cached B (searches on a miss)
+#   python3 fw_tune.py show                                   # dump the cache
+#
+# Candidates are the powers of two from --min-b up to N that divide N.
+# Each candidate is one timed trial run of the binary (the time is the last
+# field of its "FW_*,N,B,time" line). Trials are kept short: a candidate
+# is killed as soon as it runs longer than the best time seen so far, and
+# the search starts from --start-b (default 64) and walks outwards,
+# stopping in a direction once times get worse twice in a row.
+#
+# Winners are stored in a JSON cache keyed by (binary, N, threads, host),
+# by default fw_tune_cache.json next to this script (or $FW_TUNE_CACHE).
+
+from pathlib import Path
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+DEFAULT_CACHE = Path(__file__).resolve().parent / "fw_tune_cache.json"
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Search and cache the best block size B for an FW binary")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    for name, help_text in (("tune", "Search candidate B values and store the winner"),
+                            ("get", "Print the cached B, searching first on a cache miss")):
+        s = sub.add_parser(name, help=help_text)
+        s.add_argument("binary", help="FW binary taking 'N B' arguments, e.g. ./fw_sr_p")
+        s.add_argument("N", type=int, help="Graph size")
+        s.add_argument("--threads", type=int, default=None,
+                       help="OMP_NUM_THREADS for the trials (default: $OMP_NUM_THREADS or all CPUs)")
+        s.add_argument("--min-b", type=int, default=8, help="Smallest candidate B (default: 8)")
+        s.add_argument("--start-b", type=int, default=64, help="First candidate tried (default: 64)")
+        s.add_argument("--no-search", action="store_true", help="(get) fail instead of searching on a miss")
+        s.add_argument("--force", action="store_true", help="(tune) search even if a cached entry exists")
+    sub.add_parser("show", help="Print every cache entry")
+    p.add_argument("--cache", type=Path, default=Path(os.environ.get("FW_TUNE_CACHE", DEFAULT_CACHE)),
+                   help=f"Cache file (default: $FW_TUNE_CACHE or {DEFAULT_CACHE.name} next to this script)")
+    return p.parse_args()
+
+def default_threads() -> int:
+    env = os.environ.get("OMP_NUM_THREADS", "")
+    return int(env) if env.isdigit() and int(env) > 0 else (os.cpu_count() or 1)
+
+def cache_key(binary: str, n: int, threads: int, host: str) -> str:
+    return f"{Path(binary).name}|{n}|{threads}|{host}"
+
+def load_cache(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable cache {path}: {e}", file=sys.stderr)
+        return {}
+
+def save_cache(path: Path, cache: dict):
+    # Write-then-rename so concurrent queue jobs never see a half-written file
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+    tmp.replace(path)
+
+def candidates(n: int, min_b: int):
+    b, out = max(1, min_b), []
+    while b <= n:
+        if n % b == 0:
+            out.append(b)
+        b *= 2
+    return out
+
+def trial(binary: str, n: int, b: int, threads: int, limit):
+    """Run one trial; returns its reported time, or None if it failed or exceeded limit."""
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads))
+    try:
+        res = subprocess.run([binary, str(n), str(b)], env=env, capture_output=True,
+                             text=True, timeout=limit)
+    except subprocess.TimeoutExpired:
+        return None
+    lines = [l for l in res.stdout.splitlines() if l.startswith("FW")]
+    if res.returncode != 0 or not lines:
+        print(f"WARNING: {binary} {n} {b} failed: {res.stderr.strip() or res.stdout.strip()}", file=sys.stderr)
+        return None
+    return float(lines[-1].split(",")[-1])
+
+def search(binary: str, n: int, threads: int, min_b: int, start_b: int):
+    cands = candidates(n, min_b)
+    if not cands:
+        print(f"ERROR: no power-of-two B >= {min_b} divides N={n}", file=sys.stderr)
+        sys.exit(1)
+    start = min(range(len(cands)), key=lambda i: abs(cands[i] - start_b))
+    times = {}
+    best_b, best_t = None, None
+
+    def run(i):
+        nonlocal best_b, best_t
+        b = cands[i]
+        # Generous slack over the incumbent for start-up and noise
+        limit = None if best_t is None else best_t * 1.5 + 1.0
+        ts = time.perf_counter()
+        t = trial(binary, n, b, threads, limit)
+        wall = time.perf_counter() - ts
+        times[b] = t
+        shown = f"{t:.4f}" if t is not None else f"> {wall:.1f} (stopped)"
+        print(f"  B={b:<6d} time {shown}", file=sys.stderr)
+        if t is not None and (best_t is None or t < best_t):
+            best_b, best_t = b, t
+        return t
+
+    print(f"Tuning {binary} N={n} threads={threads}: candidates {cands}", file=sys.stderr)
+    run(start)
+    for direction in (-1, 1):
+        worse, prev = 0, times[cands[start]]
+        i = start + direction
+        while 0 <= i < len(cands) and worse < 2:
+            t = run(i)
+            worse = worse + 1 if t is None or (prev is not None and t >= prev) else 0
+            prev = t
+            i += direction
+    if best_b is None:
+        print(f"ERROR: every trial of {binary} failed", file=sys.stderr)
+        sys.exit(1)
+    return best_b, best_t
+
+def main():
+    args = parse_args()
+    cache = load_cache(args.cache)
+
+    if args.cmd == "show":
+        for key in sorted(cache):
+            binary, n, threads, host = key.split("|")
+            e = cache[key]
+            print(f"{binary}\t{n}\t{threads}\t{host}\tB={e['B']}\ttime={e['time']:.4f}")
+        return
+
+    threads = args.threads or default_threads()
+    host = socket.gethostname()
+    key = cache_key(args.binary, args.N, threads, host)
+
+    if key in cache and not (args.cmd == "tune" and args.force):
+        print(cache[key]["B"])
+        return
+    if args.cmd == "get" and args.no_search:
+        print(f"ERROR: no cached B for {key}", file=sys.stderr)
+        sys.exit(1)
+
+    b, t = search(args.binary, args.N, threads, args.min_b, args.start_b)
+    cache = load_cache(args.cache)  # re-read: another job may have written meanwhile
+    cache[key] = {"B": b, "time": t}
+    save_cache(args.cache, cache)
+    print(b)
+
+if __name__ == "__main__":
+    main()
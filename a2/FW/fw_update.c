@@ -0,0 +1,100 @@
+/*
+ * Incremental APSP: apply a batch of edge-weight decreases / edge
+ * insertions to an existing distance matrix in O(N^2) per edge.
+ * command-line arguments: N, EDGES [, DIST [, OUT]]
+ * N     = size of graph
+ * EDGES = text file with one "u v w" update per line
+ * DIST  = distance matrix, either a matrix file (matrix_io.h, memory-mapped)
+ *         or N*N integers one per line (the output of the FW drivers'
+ *         print loop). Without it (or with "-"), the random graph of the
+ *         other drivers is solved first with the tiled kernel (untimed).
+ * OUT   = optional matrix file the updated matrix is written to, zero-copy
+ *         (use the DIST file itself to update it in place)
+ * Only the batch update is timed: FW_UPDATE,N,edges,time
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/time.h>
+#include <omp.h>
+#include "util.h"
+#include "fw_kernel.h"
+#include "apsp_update.h"
+#include "matrix_io.h"
+
+#define SOLVE_B 64
+
+int main(int argc, char **argv)
+{
+	int *A;
+	matrix_t M;
+	int loaded;
+	edge_t *edges;
+	int i,j,k,m,e;
+	struct timeval t1, t2;
+	double time;
+	int N=1024;
+
+	if (argc < 3 || argc > 5){
+		fprintf(stdout, "Usage %s N EDGES [DIST|- [OUT]]\n", argv[0]);
+		exit(0);
+	}
+
+	N=atoi(argv[1]);
+	m=edges_read(argv[2], &edges);
+	for(e=0; e<m; e++)
+		if (edges[e].u<0 || edges[e].u>=N || edges[e].v<0 || edges[e].v>=N || edges[e].w<0){
+			fprintf(stdout, "Edge %d (%d %d %d) out of range\n", e, edges[e].u, edges[e].v, edges[e].w);
+			exit(0);
+		}
+
+	if (argc > 3 && strcmp(argv[3], "-") != 0 && !matrix_probe(argv[3])){
+		/* text matrix: read it into the (possibly file-backed) result */
+		loaded = 1;
+		matrix_open(&M, NULL, argc>4 ? argv[4] : NULL, N);
+		graph_read_text(argv[3], M.data, N);
+	}
+	else
+		loaded = matrix_open(&M, argc>3 ? argv[3] : NULL, argc>4 ? argv[4] : NULL, N);
+	A=M.data;
+
+	if (!loaded){
+		if ((N%SOLVE_B)!=0){
+			fprintf(stdout, "Without DIST, N must be multiple of %d\n", SOLVE_B);
+			exit(0);
+		}
+		graph_init_random_flat(A,-1,N,128*N);
+		for(k=0;k<N;k+=SOLVE_B){
+			fw_tile(A,N,k,k,k,SOLVE_B);
+			#pragma omp parallel for schedule(static)
+			for(i=0; i<N; i+=SOLVE_B)
+				if (i!=k){
+					fw_tile(A,N,k,i,k,SOLVE_B);
+					fw_tile(A,N,k,k,i,SOLVE_B);
+				}
+			#pragma omp parallel for collapse(2) schedule(static)
+			for(i=0; i<N; i+=SOLVE_B)
+				for(j=0; j<N; j+=SOLVE_B)
+					if (i!=k && j!=k)
+						fw_tile(A,N,k,i,j,SOLVE_B);
+		}
+	}
+
+	gettimeofday(&t1,0);
+
+	apsp_apply_batch(A,N,edges,m);
+
+	gettimeofday(&t2,0);
+
+	time=(double)((t2.tv_sec-t1.tv_sec)*1000000+t2.tv_usec-t1.tv_usec)/1000000;
+	printf("FW_UPDATE,%d,%d,%.4f\n", N,m,time);
+
+	/*
+	for(i=0; i<N; i++)
+		for(j=0; j<N; j++) fprintf(stdout,"%d\n", A[(size_t)i*N+j]);
+	*/
+
+	free(edges);
+	matrix_close(&M);
+	return 0;
+}
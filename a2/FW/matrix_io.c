@@ -0,0 +1,169 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include "util.h"
+#include "matrix_io.h"
+
+typedef struct {
+	char magic[8];
+	uint32_t version;
+	uint32_t dtype;
+	uint32_t layout;
+	uint32_t block;
+	uint64_t n;
+	char pad[MATRIX_HEADER_BYTES-32];
+} matrix_header_t;
+
+static int given(const char *path)
+{
+	return path && strcmp(path, "-") != 0;
+}
+
+static size_t file_bytes(int n)
+{
+	return MATRIX_HEADER_BYTES + (size_t)n*n*sizeof(int);
+}
+
+static void *map_input(const char *path, int n, int shared, size_t *bytes)
+{
+	matrix_header_t *h;
+	struct stat st;
+	void *p;
+	int fd;
+
+	fd = open(path, shared ? O_RDWR : O_RDONLY);
+	if (fd < 0 || fstat(fd, &st) < 0){
+		perror(path);
+		exit(1);
+	}
+	if ((size_t)st.st_size < MATRIX_HEADER_BYTES){
+		fprintf(stderr, "%s: too short for a matrix header\n", path);
+		exit(1);
+	}
+	/* Private unless updated in place: the solver may write to it without touching the file */
+	p = mmap(NULL, st.st_size, PROT_READ|PROT_WRITE, shared ? MAP_SHARED : MAP_PRIVATE, fd, 0);
+	close(fd);
+	if (p == MAP_FAILED){
+		perror(path);
+		exit(1);
+	}
+	h = p;
+	if (memcmp(h->magic, MATRIX_MAGIC, sizeof(MATRIX_MAGIC)) != 0 || h->version != MATRIX_VERSION){
+		fprintf(stderr, "%s: not a version %d matrix file\n", path, MATRIX_VERSION);
+		exit(1);
+	}
+	if (h->dtype != MATRIX_INT32 || h->layout != MATRIX_ROW_MAJOR){
+		fprintf(stderr, "%s: unsupported dtype %u / layout %u\n", path, h->dtype, h->layout);
+		exit(1);
+	}
+	if (h->n != (uint64_t)n || (size_t)st.st_size < file_bytes(n)){
+		fprintf(stderr, "%s: holds a %llu x %llu matrix, expected %d x %d\n",
+			path, (unsigned long long)h->n, (unsigned long long)h->n, n, n);
+		exit(1);
+	}
+	*bytes = st.st_size;
+	return p;
+}
+
+static void *map_output(const char *path, int n)
+{
+	matrix_header_t *h;
+	void *p;
+	int fd;
+
+	fd = open(path, O_RDWR|O_CREAT|O_TRUNC, 0644);
+	if (fd < 0 || ftruncate(fd, file_bytes(n)) < 0){
+		perror(path);
+		exit(1);
+	}
+	p = mmap(NULL, file_bytes(n), PROT_READ|PROT_WRITE, MAP_SHARED, fd, 0);
+	close(fd);
+	if (p == MAP_FAILED){
+		perror(path);
+		exit(1);
+	}
+	h = p;
+	memset(h, 0, MATRIX_HEADER_BYTES);
+	memcpy(h->magic, MATRIX_MAGIC, sizeof(MATRIX_MAGIC));
+	h->version = MATRIX_VERSION;
+	h->dtype = MATRIX_INT32;
+	h->layout = MATRIX_ROW_MAJOR;
+	h->block = 0;
+	h->n = n;
+	return p;
+}
+
+static int same_file(const char *a, const char *b)
+{
+	struct stat sa, sb;
+
+	return stat(a, &sa) == 0 && stat(b, &sb) == 0 &&
+	       sa.st_dev == sb.st_dev && sa.st_ino == sb.st_ino;
+}
+
+int matrix_open(matrix_t *m, const char *in, const char *out, int n)
+{
+	void *src = NULL;
+	size_t src_bytes = 0;
+	int inplace;
+
+	m->n = n;
+	m->map = NULL;
+	m->map_bytes = 0;
+
+	inplace = given(in) && given(out) && same_file(in, out);
+	if (given(in))
+		src = map_input(in, n, inplace, &src_bytes);
+
+	if (given(out) && !inplace){
+		m->map = map_output(out, n);
+		m->map_bytes = file_bytes(n);
+		m->data = (int *)((char *)m->map + MATRIX_HEADER_BYTES);
+		if (src){
+			memcpy(m->data, (char *)src + MATRIX_HEADER_BYTES, (size_t)n*n*sizeof(int));
+			munmap(src, src_bytes);
+		}
+	}
+	else if (src){
+		/* input only, or in == out: work on the input mapping itself */
+		m->map = src;
+		m->map_bytes = src_bytes;
+		m->data = (int *)((char *)src + MATRIX_HEADER_BYTES);
+	}
+	else
+		m->data = graph_alloc_flat(n);
+
+	return src != NULL;
+}
+
+int matrix_probe(const char *path)
+{
+	char magic[8];
+	FILE *f;
+	int ok;
+
+	f = fopen(path, "rb");
+	if (!f)
+		return 0;
+	ok = fread(magic, 1, sizeof(magic), f) == sizeof(magic) &&
+	     memcmp(magic, MATRIX_MAGIC, sizeof(MATRIX_MAGIC)) == 0;
+	fclose(f);
+	return ok;
+}
+
+void matrix_close(matrix_t *m)
+{
+	if (m->map){
+		msync(m->map, m->map_bytes, MS_SYNC);	/* no-op for a private input mapping */
+		munmap(m->map, m->map_bytes);
+	}
+	else
+		free(m->data);
+	m->data = NULL;
+	m->map = NULL;
+}
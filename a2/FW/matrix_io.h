@@ -0,0 +1,55 @@
+/*
+ * Binary on-disk distance / adjacency matrix, memory-mapped.
+ *
+ * File layout (little-endian, 64-byte header so the data is 64-byte aligned):
+ *   char     magic[8]  = "APSPMAT"
+ *   uint32   version   = 1
+ *   uint32   dtype     (MATRIX_INT32)
+ *   uint32   layout    (MATRIX_ROW_MAJOR)
+ *   uint32   block     (0 for row-major)
+ *   uint64   n
+ *   padding up to 64 bytes
+ *   n * n    elements
+ *
+ * matrix_io.py opens the same files as numpy.memmap.
+ */
+#ifndef MATRIX_IO_H
+#define MATRIX_IO_H
+
+#include <stddef.h>
+
+#define MATRIX_MAGIC "APSPMAT"
+#define MATRIX_VERSION 1
+#define MATRIX_HEADER_BYTES 64
+
+#define MATRIX_INT32 1
+#define MATRIX_ROW_MAJOR 0
+
+typedef struct {
+	int *data;		/* n x n, row-major */
+	int n;
+	void *map;		/* mapping (header included), NULL if heap allocated */
+	size_t map_bytes;
+} matrix_t;
+
+/*
+ * Set up the matrix a driver works on:
+ *   in  == NULL or "-": no input; returns 0 and the caller fills m->data
+ *   in  given:          the file is mapped and its contents used; returns 1
+ *   out == NULL or "-": m->data is private memory (an input mapping is
+ *                       copy-on-write, the file is never modified)
+ *   out given:          out is created and mapped shared; when in is given
+ *                       too, its contents are copied over once. The solver
+ *                       then writes its result straight into the file.
+ *                       If out is the same file as in, it is updated in place.
+ * n must match the size stored in 'in'.
+ */
+int matrix_open(matrix_t *m, const char *in, const char *out, int n);
+
+/* 1 if path starts with the matrix file magic */
+int matrix_probe(const char *path);
+
+/* Flush (if the data is backed by 'out') and release */
+void matrix_close(matrix_t *m);
+
+#endif
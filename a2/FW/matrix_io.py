@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# matrix_io.py
+#
+# numpy side of the binary matrix files of matrix_io.h: graphs fed to the FW
+# drivers and the APSP results they write (see the header for the layout).
+# Files are opened as numpy.memmap, so a query touches only the pages it reads.
+#
+# Usage:
+#   python3 matrix_io.py info dist.bin                    # size and header fields
+#   python3 matrix_io.py query dist.bin 3 17              # one distance
+#   python3 matrix_io.py from-text fw.out dist.bin 1024   # N*N integers, one per line
+#   python3 matrix_io.py to-text dist.bin                 # back to the print-loop format
+#
+# From Python:
+#   from matrix_io import open_matrix, create_matrix
+#   D = open_matrix("dist.bin")        # read-only n x n int32 memmap
+#   G = create_matrix("graph.bin", n)  # writable, zero-filled
+
+from pathlib import Path
+import argparse
+import sys
+import numpy as np
+
+MAGIC = b"APSPMAT"
+VERSION = 1
+HEADER_BYTES = 64
+INT32 = 1
+ROW_MAJOR = 0
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("dtype", "<u4"),
+                   ("layout", "<u4"), ("block", "<u4"), ("n", "<u8")])
+
+def read_header(path: Path):
+    raw = np.fromfile(path, dtype=np.uint8, count=HEADER_BYTES)
+    if raw.size < HEADER_BYTES:
+        raise ValueError(f"{path} is too short for a matrix header")
+    hdr = raw[:HEADER.itemsize].view(HEADER)[0]
+    if hdr["magic"] != MAGIC or hdr["version"] != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} matrix file")
+    if hdr["dtype"] != INT32 or hdr["layout"] != ROW_MAJOR:
+        raise ValueError(f"{path}: unsupported dtype {hdr['dtype']} / layout {hdr['layout']}")
+    return hdr
+
+def open_matrix(path, mode: str = "r") -> np.memmap:
+    """The n x n int32 matrix stored in path ('r', 'r+' or 'c' as for numpy.memmap)."""
+    path = Path(path)
+    n = int(read_header(path)["n"])
+    return np.memmap(path, dtype="<i4", mode=mode, offset=HEADER_BYTES, shape=(n, n))
+
+def create_matrix(path, n: int) -> np.memmap:
+    """Create (or truncate) path as an n x n matrix file and map it writable."""
+    path = Path(path)
+    hdr = np.zeros(1, dtype=HEADER)
+    hdr["magic"], hdr["version"], hdr["dtype"], hdr["layout"], hdr["n"] = MAGIC, VERSION, INT32, ROW_MAJOR, n
+    with open(path, "wb") as f:
+        f.write(hdr.tobytes().ljust(HEADER_BYTES, b"\0"))
+        f.truncate(HEADER_BYTES + n * n * 4)
+    return np.memmap(path, dtype="<i4", mode="r+", offset=HEADER_BYTES, shape=(n, n))
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Inspect and convert FW binary matrix files")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("info", help="Print the header of a matrix file")
+    s.add_argument("path", type=Path)
+    s = sub.add_parser("query", help="Print entry (i, j)")
+    s.add_argument("path", type=Path)
+    s.add_argument("i", type=int)
+    s.add_argument("j", type=int)
+    s = sub.add_parser("from-text", help="Convert N*N integers, one per line, to a matrix file")
+    s.add_argument("text", type=Path)
+    s.add_argument("path", type=Path)
+    s.add_argument("N", type=int)
+    s = sub.add_parser("to-text", help="Print a matrix file as N*N integers, one per line")
+    s.add_argument("path", type=Path)
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        if args.cmd == "info":
+            hdr = read_header(args.path)
+            print(f"{args.path}: n={int(hdr['n'])} dtype=int32 layout=row-major version={int(hdr['version'])}")
+        elif args.cmd == "query":
+            D = open_matrix(args.path)
+            if not (0 <= args.i < D.shape[0] and 0 <= args.j < D.shape[1]):
+                raise ValueError(f"({args.i}, {args.j}) outside a {D.shape[0]} x {D.shape[1]} matrix")
+            print(int(D[args.i, args.j]))
+        elif args.cmd == "from-text":
+            values = np.loadtxt(args.text, dtype=np.int32, ndmin=1)
+            if values.size != args.N * args.N:
+                raise ValueError(f"{args.text} holds {values.size} values, expected {args.N * args.N}")
+            D = create_matrix(args.path, args.N)
+            D[:] = values.reshape(args.N, args.N)
+            D.flush()
+        elif args.cmd == "to-text":
+            np.savetxt(sys.stdout, open_matrix(args.path).ravel(), fmt="%d")
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
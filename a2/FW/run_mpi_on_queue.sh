@@ -0,0 +1,36 @@
+#!/bin/bash
+#PBS -q parlab
+#PBS -N run_fw_mpi
+#PBS -l nodes=8:ppn=8
+#PBS -l walltime=02:00:00
+#PBS -o run_fw_mpi.pbs_out
+#PBS -e run_fw_mpi.pbs_err
+
+
+module load openmpi/1.8.3
+
+cd $PBS_O_WORKDIR
+
+N_VALUES="4096 8192 16384 32768"
+
+# Tile / pivot block size; N must be a multiple of sqrt(P)*B
+: "${B:=64}"
+
+# One rank per node, OpenMP inside the node (P must be a perfect square)
+: "${PROCS:=1 4}"
+: "${THREADS:=8}"
+export OMP_NUM_THREADS=$THREADS
+
+OUTDIR="benchmarks"
+mkdir -p "$OUTDIR"
+
+for N in $N_VALUES; do
+    for P in $PROCS; do
+        echo "Running fw_mpi N=$N, B=$B, P=$P, threads=$THREADS"
+
+        OUT="${OUTDIR}/fw_mpi_N${N}_P${P}_T${THREADS}.out"
+        ERR="${OUTDIR}/fw_mpi_N${N}_P${P}_T${THREADS}.err"
+
+        mpirun -np $P --map-by node --bind-to none ./fw_mpi "$N" "$B" >"$OUT" 2>"$ERR"
+    done
+done
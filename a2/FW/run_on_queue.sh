@@ -18,8 +18,12 @@ module load openmp
 
 N_VALUES="1024 2048 4096"
 
-# Block size 
-B=64
+# Binary (fw_sr_p | fw_sr_z | fw_tiled | fw_tiled_flat | fw_tiled_tasks)
+: "${EXEC:=fw_sr_p}"
+
+# Block size: pass -v B=64 to pin it, otherwise it comes from the
+# tuning cache (fw_tune.py searches once per binary/N/threads/host)
+: "${B:=}"
 
 OUTDIR="benchmarks"
 mkdir -p "$OUTDIR"
@@ -28,15 +32,19 @@ for N in $N_VALUES; do
     for T in 1 2 4 8 16 32 64; do
         
         export OMP_NUM_THREADS=$T
-        echo "Running N=$N, B=$B, threads=$T"
+        BS="$B"
+        if [ -z "$BS" ]; then
+            BS=$(python3 fw_tune.py get "./${EXEC}" "$N" --threads "$T") || exit 1
+        fi
+        echo "Running ${EXEC} N=$N, B=$BS, threads=$T"
         
         #outputs
-        OUT="${OUTDIR}/fw_sr_p_N${N}_T${T}.out"
-        ERR="${OUTDIR}/fw_sr_p_N${N}_T${T}.err"
+        OUT="${OUTDIR}/${EXEC}_N${N}_T${T}.out"
+        ERR="${OUTDIR}/${EXEC}_N${N}_T${T}.err"
         
         #  - stdout → OUT
         #  - stderr → ERR
-        ./fw_sr_p "$N" "$B" >"$OUT" 2>"$ERR"
+        "./${EXEC}" "$N" "$BS" >"$OUT" 2>"$ERR"
     done
 done
 
@@ -16,3 +16,44 @@ void graph_init_random(int **adjm, int seed, int n,  int m)
 	for(i=0; i<n; i++)adjm[i][i]=0;
 }
 
+int *graph_alloc_flat(int n)
+{
+	int *adjm;
+
+	if (posix_memalign((void **)&adjm, 64, (size_t)n*n*sizeof(int)) != 0){
+		fprintf(stderr, "Could not allocate %d x %d matrix\n", n, n);
+		exit(1);
+	}
+	return adjm;
+}
+
+/* Same graph as graph_init_random for the same seed */
+void graph_init_random_flat(int *adjm, int seed, int n, int m)
+{
+	size_t i, j;
+
+	srand48(seed);
+	for(i=0; i<n; i++)
+		for(j=0; j<n; j++)
+			adjm[i*n+j] = abs((( int)lrand48()) % 1048576);
+
+	for(i=0; i<n; i++)adjm[i*n+i]=0;
+}
+
+void graph_read_text(const char *path, int *adjm, int n)
+{
+	FILE *f;
+	size_t i;
+
+	f = fopen(path, "r");
+	if (!f){
+		perror(path);
+		exit(1);
+	}
+	for(i=0; i<(size_t)n*n; i++)
+		if (fscanf(f, "%d", &adjm[i]) != 1){
+			fprintf(stderr, "%s: expected %d x %d entries, got %zu\n", path, n, n, i);
+			exit(1);
+		}
+	fclose(f);
+}
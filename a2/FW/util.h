@@ -1,3 +1,9 @@
 //inline int min(int a, int b);
 void graph_init_random(int **adjm, int seed, int n,  int m);
 
+/* Contiguous n x n matrix (row-major, 64-byte aligned) */
+int *graph_alloc_flat(int n);
+void graph_init_random_flat(int *adjm, int seed, int n, int m);
+
+/* n*n integers, one per line (the format of the drivers' print loop) */
+void graph_read_text(const char *path, int *adjm, int n);
@@ -5,6 +5,8 @@
 
 void kmeans(double * objects, int numCoords, int numObjs, int numClusters, double threshold, long loop_threshold, int *membership, double * clusters);
 
+void kmeans_parallel_init(double * objects, int numCoords, int numObjs, int numClusters, double * clusters);
+
 double * dataset_generation(int numObjs, int numCoords);
 
 int check_repeated_clusters(int, int, double*);
@@ -13,4 +15,11 @@ double wtime(void);
 
 extern int _debug;
 
+/* mini-batch version only (-b, -r) */
+extern long   _batch_size;
+extern double _learning_rate;
+
+/* seq and reduction versions only (-u) */
+extern long   _recompute_every;
+
 #endif
@@ -0,0 +1,271 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <omp.h>
+
+#include "kmeans.h"
+
+/*
+ * K-means|| initialisation (Bahmani et al., "Scalable K-Means++").
+ *
+ * Instead of k sequential k-means++ passes over the data, a few parallel
+ * passes oversample about INIT_OVERSAMPLING*k candidates each, with
+ * probability proportional to their squared distance to the candidates
+ * picked so far. The candidates are weighted by the number of objects
+ * closest to them and reduced to numClusters centers with a weighted
+ * k-means++ on that small set.
+ *
+ * Random numbers are a hash of (stream, index), so the result does not
+ * depend on the number of threads.
+ */
+
+#define INIT_ROUNDS       5   /* oversampling passes */
+#define INIT_OVERSAMPLING 2   /* expected candidates per pass, times numClusters */
+
+// square of Euclid distance between two multi-dimensional points
+inline static double euclid_dist_2(int numdims, double *coord1, double *coord2)
+{
+    int i;
+    double ans = 0.0;
+
+    for (i = 0; i < numdims; i++)
+        ans += (coord1[i] - coord2[i]) * (coord1[i] - coord2[i]);
+
+    return ans;
+}
+
+// uniform in [0, 1): splitmix64 of (stream, i)
+inline static double init_uniform(uint64_t stream, uint64_t i)
+{
+    uint64_t x = stream * 0xD1B54A32D192ED03ULL + i + 0x9E3779B97F4A7C15ULL;
+
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return (double)((x ^ (x >> 31)) >> 11) / 9007199254740992.0;
+}
+
+/*
+ * min_dist[i] = min(min_dist[i], distance to candidates [first, ncand)) and
+ * nearest[i] = the candidate at that distance (first one on ties); returns
+ * the new total cost
+ */
+static double update_cost(double *objects, int numCoords, int numObjs, double *cand,
+                          int first, int ncand, double *min_dist, int *nearest)
+{
+    int i, c;
+    double cost = 0.0;
+
+#pragma omp parallel for private(c) reduction(+ : cost) schedule(static)
+    for (i = 0; i < numObjs; i++)
+    {
+        double d, best = min_dist[i];
+        for (c = first; c < ncand; c++)
+        {
+            d = euclid_dist_2(numCoords, &objects[i * numCoords], &cand[c * numCoords]);
+            if (d < best)
+            {
+                best = d;
+                nearest[i] = c;
+            }
+        }
+        min_dist[i] = best;
+        cost += best;
+    }
+    return cost;
+}
+
+/*
+ * Roulette draw: the first c whose running sum of p[] passes r, counting
+ * only the c with p[c] > 0 (a draw that rounds up past the end takes the
+ * last of them); -1 if every p[c] is 0.
+ */
+static int draw(const double *p, int n, double r)
+{
+    int c, last = -1;
+
+    for (c = 0; c < n; c++)
+    {
+        if (p[c] <= 0.0)
+            continue;
+        last = c;
+        if (r < p[c])
+            break;
+        r -= p[c];
+    }
+    return last;
+}
+
+/*
+ * Weighted k-means++ over the ncand candidates: up to numClusters of them
+ * become the initial centers. Serial, the candidate set is small. A
+ * candidate with weight * d2 == 0 is never drawn (d2 == 0: it coincides
+ * with a center already chosen), so the centers are distinct; returns how
+ * many were chosen, fewer than numClusters once no candidate is left that
+ * differs from all of them (tiny or degenerate data).
+ */
+static int weighted_kmeanspp(double *cand, double *weight, int ncand, int numCoords,
+                             int numClusters, double *clusters)
+{
+    double *d2 = (double *)malloc(ncand * sizeof(double));
+    double *p = (double *)malloc(ncand * sizeof(double));
+    double total, d;
+    int c, k, pick;
+
+    total = 0.0;
+    for (c = 0; c < ncand; c++)
+        total += (p[c] = weight[c]);
+    pick = draw(p, ncand, init_uniform(INIT_ROUNDS + 1, 0) * total);
+    k = 0;
+    if (pick >= 0)
+    {
+        memcpy(clusters, &cand[pick * numCoords], numCoords * sizeof(double));
+        for (c = 0; c < ncand; c++)
+            d2[c] = euclid_dist_2(numCoords, &cand[c * numCoords], clusters);
+
+        for (k = 1; k < numClusters; k++)
+        {
+            total = 0.0;
+            for (c = 0; c < ncand; c++)
+                total += (p[c] = weight[c] * d2[c]);
+            pick = draw(p, ncand, init_uniform(INIT_ROUNDS + 1, k) * total);
+            if (pick < 0)
+                break;
+            memcpy(&clusters[k * numCoords], &cand[pick * numCoords], numCoords * sizeof(double));
+
+            for (c = 0; c < ncand; c++)
+            {
+                d = euclid_dist_2(numCoords, &cand[c * numCoords], &clusters[k * numCoords]);
+                if (d < d2[c])
+                    d2[c] = d;
+            }
+        }
+    }
+    free(p);
+    free(d2);
+    return k;
+}
+
+// 1 if object differs from each of the first k centers
+inline static int is_new_center(int numCoords, double *object, double *clusters, int k)
+{
+    int c;
+
+    for (c = 0; c < k; c++)
+        if (euclid_dist_2(numCoords, object, &clusters[c * numCoords]) == 0.0)
+            return 0;
+    return 1;
+}
+
+/*
+ * Centers [k, numClusters) when the candidates ran out: the next objects,
+ * in order, that differ from every center so far. With fewer distinct
+ * objects than clusters the previous center is repeated, and main()'s
+ * check_repeated_clusters() reports it.
+ */
+static void pad_centers(double *objects, int numCoords, int numObjs, int k, int numClusters, double *clusters)
+{
+    int i = 0;
+
+    for (; k < numClusters; k++)
+    {
+        while (i < numObjs && !is_new_center(numCoords, &objects[i * numCoords], clusters, k))
+            i++;
+        memcpy(&clusters[k * numCoords], i < numObjs ? &objects[i * numCoords] : &clusters[(k - 1) * numCoords],
+               numCoords * sizeof(double));
+    }
+}
+
+void kmeans_parallel_init(double *objects, /* in: [numObjs][numCoords] */
+                          int numCoords,
+                          int numObjs,
+                          int numClusters,
+                          double *clusters) /* out: [numClusters][numCoords] */
+{
+    int i, c, k, round, ncand, first;
+    int nthreads = omp_get_max_threads();
+    double cost, l = (double)INIT_OVERSAMPLING * numClusters;
+
+    double *cand = (double *)malloc(numCoords * sizeof(double));
+    double *min_dist = (double *)malloc(numObjs * sizeof(double));
+    int *nearest = (int *)malloc(numObjs * sizeof(int));   // [numObjs]: candidate at min_dist
+    int *picked = (int *)malloc(numObjs * sizeof(int));
+    int *counts = (int *)malloc(nthreads * sizeof(int));   // [nthreads]: picks of each thread in a round
+    int npicked;
+
+    // first candidate: one object, uniformly
+    i = (int)(init_uniform(0, 0) * numObjs);
+    memcpy(cand, &objects[i * numCoords], numCoords * sizeof(double));
+    ncand = 1;
+
+    for (i = 0; i < numObjs; i++)
+    {
+        min_dist[i] = __builtin_inf();
+        nearest[i] = 0;
+    }
+    cost = update_cost(objects, numCoords, numObjs, cand, 0, ncand, min_dist, nearest);
+
+    for (round = 1; round <= INIT_ROUNDS && cost > 0.0; round++)
+    {
+        // each object is picked independently with probability l * d^2 / cost
+        // two passes over a static partition: count, then write at the thread's offset, so picks stay in object order
+        npicked = 0;
+#pragma omp parallel private(i)
+        {
+            int n = 0, t, offset = 0;
+            int tid = omp_get_thread_num(), T = omp_get_num_threads();
+            int lo = (int)((long)numObjs * tid / T), hi = (int)((long)numObjs * (tid + 1) / T);
+
+            for (i = lo; i < hi; i++)
+                if (init_uniform(round, i) * cost < l * min_dist[i])
+                    n++;
+            counts[tid] = n;
+#pragma omp barrier
+            for (t = 0; t < tid; t++)
+                offset += counts[t];
+            n = 0;
+            for (i = lo; i < hi; i++)
+                if (init_uniform(round, i) * cost < l * min_dist[i])
+                    picked[offset + n++] = i;
+#pragma omp single
+            for (t = 0; t < T; t++)
+                npicked += counts[t];
+        }
+
+        first = ncand;
+        cand = (double *)realloc(cand, (size_t)(ncand + npicked) * numCoords * sizeof(double));
+        for (k = 0; k < npicked; k++)
+            memcpy(&cand[ncand++ * numCoords], &objects[picked[k] * numCoords], numCoords * sizeof(double));
+        cost = update_cost(objects, numCoords, numObjs, cand, first, ncand, min_dist, nearest);
+    }
+
+    // weight of a candidate: no. objects closest to it, already tracked by update_cost
+    double *local_weight = (double *)calloc((size_t)nthreads * ncand, sizeof(double));
+    double *weight = (double *)calloc(ncand, sizeof(double));
+#pragma omp parallel
+    {
+        double *w = &local_weight[(size_t)omp_get_thread_num() * ncand];
+#pragma omp for schedule(static)
+        for (i = 0; i < numObjs; i++)
+            w[nearest[i]] += 1.0;
+    }
+    for (k = 0; k < nthreads; k++)
+        for (c = 0; c < ncand; c++)
+            weight[c] += local_weight[(size_t)k * ncand + c];
+
+    // fewer distinct candidates than clusters (tiny or degenerate data): pad with other objects
+    k = weighted_kmeanspp(cand, weight, ncand, numCoords, numClusters, clusters);
+    if (k < numClusters)
+        pad_centers(objects, numCoords, numObjs, k, numClusters, clusters);
+
+    if (_debug)
+        printf("kmeans|| init: %d candidates after %d rounds\n", ncand, round - 1);
+
+    free(local_weight);
+    free(counts);
+    free(picked);
+    free(nearest);
+    free(min_dist);
+    free(weight);
+    free(cand);
+}
@@ -7,8 +7,33 @@
 #include <unistd.h>     /* getopt() */
 
 int _debug;
+long   _batch_size;
+double _learning_rate;
+long   _recompute_every;
 #include "kmeans.h"
 
+// sum of squared distances of every object to its nearest center (result quality)
+static double sse(double *objects, long numObjs, long numCoords, double *clusters, long numClusters)
+{
+    long i, j, k;
+    double d, diff, min_d, sum = 0.0;
+
+    for (i=0; i<numObjs; i++) {
+        min_d = -1.0;
+        for (k=0; k<numClusters; k++) {
+            d = 0.0;
+            for (j=0; j<numCoords; j++) {
+                diff = objects[i*numCoords + j] - clusters[k*numCoords + j];
+                d += diff * diff;
+            }
+            if (min_d < 0.0 || d < min_d)
+                min_d = d;
+        }
+        sum += min_d;
+    }
+    return sum;
+}
+
 static void usage(char *argv0) {
     char *help =
         "Usage: %s [switches]\n"
@@ -17,6 +42,14 @@ static void usage(char *argv0) {
         "       -n num_coords      : number of coordinates\n"
         "       -t threshold       : threshold value (default : 0.001)\n"
         "       -l loop_threshold  : iterations threshold (default : 10)\n"
+        "       -b batch_size      : objects sampled per loop, mini-batch version (default : 4096)\n"
+        "       -r learning_rate   : mini-batch step size: 0 = 1/(objects seen by the center),\n"
+        "                            > 0 = learning_rate/sqrt(loop) (default : 0)\n"
+        "       -u period          : seq/reduction: incremental centre updates, only the objects that\n"
+        "                            change cluster are moved between the sums, with a full\n"
+        "                            recompute every period loops; 0 = first loop only (default : 1)\n"
+        "       -i                 : K-means|| initialisation (default : first num_clusters objects)\n"
+        "       -q                 : print the final SSE over the whole dataset (serial pass, after the timing)\n"
         "       -d                 : enable debug mode\n"
         "       -h                 : print this help information\n";
     fprintf(stderr, help, argv0);
@@ -36,16 +69,24 @@ int main(int argc, char **argv)
     double   dataset_size = 0, threshold;
     long     loop_threshold;
     double   io_timing_read;
+    int      parallel_init;
+    int      print_sse;
+    double   init_timing;
 
     /* some default values */
     _debug         = 0;
     threshold      = 0.001;
     loop_threshold = 10;
     numClusters    = 0;
+    _batch_size    = 4096;
+    _learning_rate = 0.0;
+    _recompute_every = 1;
+    parallel_init  = 0;
+    print_sse      = 0;
 
     printf("\n~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n\n");
 
-    while ( (opt = getopt(argc,argv,"n:t:l:c:s:dh")) != EOF) {
+    while ( (opt = getopt(argc,argv,"n:t:l:c:s:b:r:u:iqdh")) != EOF) {
         switch (opt) {
             case 'c': numClusters = atol(optarg);
                       break;
@@ -57,6 +98,16 @@ int main(int argc, char **argv)
                       break;
             case 'n': numCoords=atol(optarg);
                       break;
+            case 'b': _batch_size=atol(optarg);
+                      break;
+            case 'r': _learning_rate=atof(optarg);
+                      break;
+            case 'u': _recompute_every=atol(optarg);
+                      break;
+            case 'i': parallel_init = 1;
+                      break;
+            case 'q': print_sse = 1;
+                      break;
             case 'd': _debug = 1;
                       break;
             case 'h':
@@ -64,7 +115,7 @@ int main(int argc, char **argv)
                       break;
         }
     }
-    if (numClusters <= 1)
+    if (numClusters <= 1 || _batch_size <= 0 || _learning_rate < 0 || _recompute_every < 0)
         usage(argv[0]);
 
     numObjs = (dataset_size*1024*1024) / (numCoords*sizeof(double));
@@ -80,10 +131,18 @@ int main(int argc, char **argv)
     // Allocate space for clusters (coordinates of cluster centers)
     clusters = (double*)  malloc(numClusters * numCoords * sizeof(double));
 
-    // The first numClusters elements are selected as initial centers
-    for (i=0; i<numClusters; i++)
-        for (j=0; j<numCoords; j++)
-            clusters[i*numCoords + j] = objects[i*numCoords + j];
+    if (parallel_init) {
+        // K-means||: a few oversampling passes over the data, reduced to numClusters seeds
+        init_timing = wtime();
+        kmeans_parallel_init(objects, numCoords, numObjs, numClusters, clusters);
+        init_timing = wtime() - init_timing;
+        printf("K-means|| initialisation (total = %7.4fs)\n", init_timing);
+    } else {
+        // The first numClusters elements are selected as initial centers
+        for (i=0; i<numClusters; i++)
+            for (j=0; j<numCoords; j++)
+                clusters[i*numCoords + j] = objects[i*numCoords + j];
+    }
 
     // check initial cluster centers for repeatition 
     if (check_repeated_clusters(numClusters, numCoords, clusters) == 0) {
@@ -114,6 +173,8 @@ int main(int argc, char **argv)
             printf("%6.2f ", clusters[i*numCoords + j]);
         printf("\n");
     }
+    if (print_sse)
+        printf("SSE = %e\n", sse(objects, numObjs, numCoords, clusters, numClusters));
 
     free(objects);
     free(membership);
@@ -0,0 +1,284 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "kmeans.h"
+#include <omp.h>
+
+/*
+ * K-means with Hamerly's triangle-inequality bounds.
+ *
+ * Every object keeps an upper bound on the distance to its assigned centre
+ * and a lower bound on the distance to every other centre. With s[c] half
+ * the distance from centre c to its nearest other centre, an object whose
+ * upper bound is below max(s[c], lower) cannot change cluster, so its
+ * distances are not computed at all. After the centres move, the bounds
+ * are loosened by how far the centres moved instead of being recomputed.
+ * The assignments (and so the final centres) are those of the reduction
+ * version; new centres are accumulated the same way (per-thread arrays,
+ * reduced by one thread).
+ */
+
+// square of Euclid distance between two multi-dimensional points
+inline static double euclid_dist_2(int numdims,    /* no. dimensions */
+                                   double *coord1, /* [numdims] */
+                                   double *coord2) /* [numdims] */
+{
+    int i;
+    double ans = 0.0;
+
+    for (i = 0; i < numdims; i++)
+        ans += (coord1[i] - coord2[i]) * (coord1[i] - coord2[i]);
+
+    return ans;
+}
+
+/*
+ * Nearest centre of object, also returning the distance to it (*upper) and
+ * to the second nearest one (*lower). Bounds are kept as real distances,
+ * not squared ones, for the triangle inequality. The squared distance to
+ * centre 'known' (-1: none) is already known and not computed again.
+ */
+inline static int find_nearest_cluster_bounds(int numClusters,  /* no. clusters */
+                                              int numCoords,    /* no. coordinates */
+                                              double *object,   /* [numCoords] */
+                                              double *clusters, /* [numClusters][numCoords] */
+                                              int known,
+                                              double known_dist,
+                                              double *upper,
+                                              double *lower)
+{
+    int index, i;
+    double dist, min_dist, second_dist;
+
+    index = 0;
+    min_dist = known == 0 ? known_dist : euclid_dist_2(numCoords, object, clusters);
+    second_dist = INFINITY;
+
+    for (i = 1; i < numClusters; i++)
+    {
+        dist = known == i ? known_dist : euclid_dist_2(numCoords, object, &clusters[i * numCoords]);
+        if (dist < min_dist)
+        {
+            second_dist = min_dist;
+            min_dist = dist;
+            index = i;
+        }
+        else if (dist < second_dist)
+            second_dist = dist;
+    }
+    *upper = sqrt(min_dist);
+    *lower = sqrt(second_dist);
+    return index;
+}
+
+void kmeans(double *objects,     /* in: [numObjs][numCoords] */
+            int numCoords,       /* no. coordinates */
+            int numObjs,         /* no. objects */
+            int numClusters,     /* no. clusters */
+            double threshold,    /* minimum fraction of objects that change membership */
+            long loop_threshold, /* maximum number of iterations */
+            int *membership,     /* out: [numObjs] */
+            double *clusters)    /* out: [numClusters][numCoords] */
+{
+    int i, j, k;
+    int index, loop = 0;
+    double timing = 0;
+
+    double delta;        // fraction of objects whose clusters change in each loop
+    int *newClusterSize; // [numClusters]: no. objects assigned in each new cluster
+    double *newClusters; // [numClusters][numCoords]
+    int nthreads;        // no. threads
+
+    double *upper;       // [numObjs]: upper bound of distance to own centre
+    double *lower;       // [numObjs]: lower bound of distance to any other centre
+    double *half_min;    // [numClusters]: half distance to the nearest other centre
+    double *moved;       // [numClusters]: distance each centre moved in the last update
+    long evals, skipped, total_skipped = 0;
+
+    nthreads = omp_get_max_threads();
+    printf("OpenMP Kmeans - Hamerly bounds\t(number of threads: %d)\n", nthreads);
+
+    // initialize membership
+    for (i = 0; i < numObjs; i++)
+        membership[i] = -1;
+
+    // initialize newClusterSize and newClusters to all 0
+    newClusterSize = (typeof(newClusterSize))calloc(numClusters, sizeof(*newClusterSize));
+    newClusters = (typeof(newClusters))calloc(numClusters * numCoords, sizeof(*newClusters));
+
+    upper = (typeof(upper))malloc(numObjs * sizeof(*upper));
+    lower = (typeof(lower))malloc(numObjs * sizeof(*lower));
+    half_min = (typeof(half_min))malloc(numClusters * sizeof(*half_min));
+    moved = (typeof(moved))malloc(numClusters * sizeof(*moved));
+
+    // Each thread calculates new centers using a private space. After that, thread 0 does an array reduction on them.
+    int *local_newClusterSize[nthreads]; // [nthreads][numClusters]
+    double *local_newClusters[nthreads]; // [nthreads][numClusters][numCoords]
+
+    for (k = 0; k < nthreads; k++)
+    {
+        local_newClusterSize[k] = (typeof(*local_newClusterSize))calloc(numClusters, sizeof(**local_newClusterSize));
+        local_newClusters[k] = (typeof(*local_newClusters))calloc(numClusters * numCoords, sizeof(**local_newClusters));
+    }
+
+    timing = wtime();
+    do
+    {
+        // before each loop, set cluster data to 0
+        for (i = 0; i < numClusters; i++)
+        {
+            for (j = 0; j < numCoords; j++)
+                newClusters[i * numCoords + j] = 0.0;
+            newClusterSize[i] = 0;
+        }
+
+        delta = 0.0;
+        evals = 0;
+
+        // s(c): half the distance from each centre to its nearest other centre
+#pragma omp parallel for private(j)
+        for (i = 0; i < numClusters; i++)
+        {
+            double d, min_d = INFINITY;
+            for (j = 0; j < numClusters; j++)
+            {
+                if (j == i)
+                    continue;
+                d = euclid_dist_2(numCoords, &clusters[i * numCoords], &clusters[j * numCoords]);
+                if (d < min_d)
+                    min_d = d;
+            }
+            half_min[i] = 0.5 * sqrt(min_d);
+        }
+
+#pragma omp parallel private(i, j, k, index)
+        {
+            int tid = omp_get_thread_num();
+            int T   = omp_get_num_threads();   // actual number of threads in this team
+
+            for (i = 0; i < numClusters; i++)
+                local_newClusterSize[tid][i] = 0;
+            for (i = 0; i < numClusters * numCoords; i++)
+                local_newClusters[tid][i] = 0.0;
+
+#pragma omp for reduction(+ : delta, evals)
+            for (i = 0; i < numObjs; i++)
+            {
+                double *object = &objects[i * numCoords];
+                double bound, dist;
+
+                index = membership[i];
+                if (index < 0)
+                {
+                    // first loop: no bounds yet
+                    index = find_nearest_cluster_bounds(numClusters, numCoords, object, clusters,
+                                                        -1, 0.0, &upper[i], &lower[i]);
+                    evals += numClusters;
+                }
+                else
+                {
+                    bound = half_min[index] > lower[i] ? half_min[index] : lower[i];
+                    if (upper[i] > bound)
+                    {
+                        // tighten the upper bound, then test again before a full search
+                        dist = euclid_dist_2(numCoords, object, &clusters[index * numCoords]);
+                        upper[i] = sqrt(dist);
+                        evals++;
+                        if (upper[i] > bound)
+                        {
+                            index = find_nearest_cluster_bounds(numClusters, numCoords, object, clusters,
+                                                                index, dist, &upper[i], &lower[i]);
+                            evals += numClusters - 1;
+                        }
+                    }
+                }
+
+                // if membership changes, increase delta by 1
+                if (membership[i] != index)
+                    delta += 1.0;
+
+                // assign the membership to object i
+                membership[i] = index;
+
+                local_newClusterSize[tid][index]++;
+                for (j = 0; j < numCoords; j++)
+                    local_newClusters[tid][index * numCoords + j] += object[j];
+            }
+
+#pragma omp single
+            {
+                for (k = 0; k < T; k++)   // only sum over the threads actually in this team
+                {
+                    int *srcS = local_newClusterSize[k];
+                    double *srcC = local_newClusters[k];
+                    for (i = 0; i < numClusters; i++)
+                    {
+                        newClusterSize[i] += srcS[i];
+                        for (j = 0; j < numCoords; j++)
+                            newClusters[i * numCoords + j] += srcC[i * numCoords + j];
+                    }
+                }
+            } /* implicit barrier after single */
+        }     /* end parallel region */
+
+        // average the sum and replace old cluster centers with newClusters, recording how far each moved
+        double max_moved = 0.0, second_moved = 0.0;
+        int max_index = -1;
+        for (i = 0; i < numClusters; i++)
+        {
+            moved[i] = 0.0;
+            if (newClusterSize[i] > 0)
+            {
+                for (j = 0; j < numCoords; j++)
+                    newClusters[i * numCoords + j] /= newClusterSize[i];
+                moved[i] = sqrt(euclid_dist_2(numCoords, &clusters[i * numCoords], &newClusters[i * numCoords]));
+                for (j = 0; j < numCoords; j++)
+                    clusters[i * numCoords + j] = newClusters[i * numCoords + j];
+            }
+            if (moved[i] > max_moved)
+            {
+                second_moved = max_moved;
+                max_moved = moved[i];
+                max_index = i;
+            }
+            else if (moved[i] > second_moved)
+                second_moved = moved[i];
+        }
+
+        // loosen the bounds by the centre movement
+#pragma omp parallel for
+        for (i = 0; i < numObjs; i++)
+        {
+            upper[i] += moved[membership[i]];
+            lower[i] -= (membership[i] == max_index) ? second_moved : max_moved;
+        }
+
+        // Get fraction of objects whose membership changed during this loop. This is used as a convergence criterion.
+        delta /= numObjs;
+
+        skipped = (long)numObjs * numClusters - evals;
+        total_skipped += skipped;
+
+        loop++;
+        printf("\tcompleted loop %d\tskipped %ld of %ld distance evaluations (%5.1f%%)\n",
+               loop, skipped, (long)numObjs * numClusters, 100.0 * skipped / ((double)numObjs * numClusters));
+        fflush(stdout);
+    } while (delta > threshold && loop < loop_threshold);
+    timing = wtime() - timing;
+    printf("\n nloops = %3d (total = %7.4fs) (per loop = %7.4fs)\n", loop, timing, timing / loop);
+    printf(" skipped = %ld of %ld distance evaluations (%5.1f%%)\n",
+           total_skipped, (long)numObjs * numClusters * loop,
+           100.0 * total_skipped / ((double)numObjs * numClusters * loop));
+
+    for (k = 0; k < nthreads; k++)
+    {
+        free(local_newClusterSize[k]);
+        free(local_newClusters[k]);
+    }
+    free(upper);
+    free(lower);
+    free(half_min);
+    free(moved);
+    free(newClusters);
+    free(newClusterSize);
+}
@@ -0,0 +1,223 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <math.h>
+#include "kmeans.h"
+#include <omp.h>
+
+/*
+ * Mini-batch K-means (Sculley, "Web-scale k-means clustering").
+ *
+ * Every loop samples _batch_size objects (-b) instead of sweeping the whole
+ * dataset, assigns them to their nearest center in parallel and moves each
+ * center towards the mean of its batch objects:
+ *   -r 0:  step 1/(objects seen by the center so far), i.e. every center is
+ *          the running mean of all objects ever assigned to it
+ *   -r a:  fixed step a/sqrt(loop)
+ * The sample only depends on the loop number, not on the number of threads.
+ * delta is the fraction of batch objects that changed cluster since they
+ * were last sampled, so in practice -l bounds the number of loops.
+ * After the timed loops every object is assigned once, for membership.
+ */
+
+// square of Euclid distance between two multi-dimensional points
+inline static double euclid_dist_2(int numdims,    /* no. dimensions */
+                                   double *coord1, /* [numdims] */
+                                   double *coord2) /* [numdims] */
+{
+    int i;
+    double ans = 0.0;
+
+    for (i = 0; i < numdims; i++)
+        ans += (coord1[i] - coord2[i]) * (coord1[i] - coord2[i]);
+
+    return ans;
+}
+
+inline static int find_nearest_cluster(int numClusters,  /* no. clusters */
+                                       int numCoords,    /* no. coordinates */
+                                       double *object,   /* [numCoords] */
+                                       double *clusters) /* [numClusters][numCoords] */
+{
+    int index, i;
+    double dist, min_dist;
+
+    // find the cluster id that has min distance to object
+    index = 0;
+    min_dist = euclid_dist_2(numCoords, object, clusters);
+
+    for (i = 1; i < numClusters; i++)
+    {
+        dist = euclid_dist_2(numCoords, object, &clusters[i * numCoords]);
+        // no need square root
+        if (dist < min_dist)
+        { // find the min and its array index
+            min_dist = dist;
+            index = i;
+        }
+    }
+    return index;
+}
+
+// s-th sample of a loop: splitmix64 of its global sample number
+inline static int sample_object(long loop, long s, long batch, int numObjs)
+{
+    uint64_t x = (uint64_t)loop * batch + s + 0x9E3779B97F4A7C15ULL;
+
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return (int)((x ^ (x >> 31)) % (uint64_t)numObjs);
+}
+
+void kmeans(double *objects,     /* in: [numObjs][numCoords] */
+            int numCoords,       /* no. coordinates */
+            int numObjs,         /* no. objects */
+            int numClusters,     /* no. clusters */
+            double threshold,    /* minimum fraction of objects that change membership */
+            long loop_threshold, /* maximum number of iterations */
+            int *membership,     /* out: [numObjs] */
+            double *clusters)    /* out: [numClusters][numCoords] */
+{
+    int i, j, k;
+    int index, loop = 0;
+    double timing = 0;
+
+    double delta;        // fraction of batch objects whose clusters change in each loop
+    int *newClusterSize; // [numClusters]: no. batch objects assigned to each cluster
+    double *newClusters; // [numClusters][numCoords]: sum of those objects
+    long *seen;          // [numClusters]: no. objects assigned to each cluster in all loops
+    int nthreads;        // no. threads
+
+    long batch = _batch_size < numObjs ? _batch_size : numObjs;
+    int *sample;         // [batch]: object ids of this loop's batch
+    int *sample_index;   // [batch]: their nearest cluster
+    double eta;
+
+    nthreads = omp_get_max_threads();
+    printf("OpenMP Kmeans - Mini-batch\t(number of threads: %d)\t(batch: %ld, rate: ", nthreads, batch);
+    if (_learning_rate > 0)
+        printf("%g/sqrt(loop))\n", _learning_rate);
+    else
+        printf("1/count)\n");
+
+    // initialize membership
+    for (i = 0; i < numObjs; i++)
+        membership[i] = -1;
+
+    newClusterSize = (typeof(newClusterSize))calloc(numClusters, sizeof(*newClusterSize));
+    newClusters = (typeof(newClusters))calloc(numClusters * numCoords, sizeof(*newClusters));
+    seen = (typeof(seen))calloc(numClusters, sizeof(*seen));
+    sample = (typeof(sample))malloc(batch * sizeof(*sample));
+    sample_index = (typeof(sample_index))malloc(batch * sizeof(*sample_index));
+
+    // Each thread sums its batch objects in a private space, reduced by one thread afterwards.
+    int *local_newClusterSize[nthreads]; // [nthreads][numClusters]
+    double *local_newClusters[nthreads]; // [nthreads][numClusters][numCoords]
+
+    for (k = 0; k < nthreads; k++)
+    {
+        local_newClusterSize[k] = (typeof(*local_newClusterSize))calloc(numClusters, sizeof(**local_newClusterSize));
+        local_newClusters[k] = (typeof(*local_newClusters))calloc(numClusters * numCoords, sizeof(**local_newClusters));
+    }
+
+    timing = wtime();
+    do
+    {
+        for (i = 0; i < numClusters; i++)
+        {
+            for (j = 0; j < numCoords; j++)
+                newClusters[i * numCoords + j] = 0.0;
+            newClusterSize[i] = 0;
+        }
+
+        delta = 0.0;
+
+#pragma omp parallel private(i, j, k, index)
+        {
+            int tid = omp_get_thread_num();
+            int T   = omp_get_num_threads();   // actual number of threads in this team
+
+            for (i = 0; i < numClusters; i++)
+                local_newClusterSize[tid][i] = 0;
+            for (i = 0; i < numClusters * numCoords; i++)
+                local_newClusters[tid][i] = 0.0;
+
+            // sample and assign the batch
+#pragma omp for
+            for (i = 0; i < batch; i++)
+            {
+                int obj = sample_object(loop, i, batch, numObjs);
+
+                index = find_nearest_cluster(numClusters, numCoords, &objects[obj * numCoords], clusters);
+                sample[i] = obj;
+                sample_index[i] = index;
+
+                local_newClusterSize[tid][index]++;
+                for (j = 0; j < numCoords; j++)
+                    local_newClusters[tid][index * numCoords + j] += objects[obj * numCoords + j];
+            }
+
+#pragma omp single
+            {
+                for (k = 0; k < T; k++)   // only sum over the threads actually in this team
+                {
+                    for (i = 0; i < numClusters; i++)
+                    {
+                        newClusterSize[i] += local_newClusterSize[k][i];
+                        for (j = 0; j < numCoords; j++)
+                            newClusters[i * numCoords + j] += local_newClusters[k][i * numCoords + j];
+                    }
+                }
+            } /* implicit barrier after single */
+        }     /* end parallel region */
+
+        // membership of the sampled objects (serial: an object may be sampled twice)
+        for (i = 0; i < batch; i++)
+        {
+            if (membership[sample[i]] != sample_index[i])
+                delta += 1.0;
+            membership[sample[i]] = sample_index[i];
+        }
+
+        // move each center towards the mean of its batch objects
+        for (i = 0; i < numClusters; i++)
+        {
+            if (newClusterSize[i] == 0)
+                continue;
+            seen[i] += newClusterSize[i];
+            if (_learning_rate > 0)
+                eta = _learning_rate / sqrt((double)(loop + 1));
+            else
+                eta = (double)newClusterSize[i] / seen[i];
+            if (eta > 1.0)
+                eta = 1.0;
+            for (j = 0; j < numCoords; j++)
+                clusters[i * numCoords + j] += eta * (newClusters[i * numCoords + j] / newClusterSize[i] -
+                                                      clusters[i * numCoords + j]);
+        }
+
+        delta /= batch;
+
+        loop++;
+        printf("\r\tcompleted loop %d", loop);
+        fflush(stdout);
+    } while (delta > threshold && loop < loop_threshold);
+    timing = wtime() - timing;
+    printf("\n nloops = %3d (total = %7.4fs) (per loop = %7.4fs)\n", loop, timing, timing / loop);
+
+    // final membership of every object (not timed)
+#pragma omp parallel for
+    for (i = 0; i < numObjs; i++)
+        membership[i] = find_nearest_cluster(numClusters, numCoords, &objects[i * numCoords], clusters);
+
+    for (k = 0; k < nthreads; k++)
+    {
+        free(local_newClusterSize[k]);
+        free(local_newClusters[k]);
+    }
+    free(sample);
+    free(sample_index);
+    free(seen);
+    free(newClusters);
+    free(newClusterSize);
+}
@@ -5,6 +5,9 @@
  * TODO: include openmp header file
  */
 #include <omp.h>
+#ifdef SOA
+#include "kmeans_soa.h"
+#endif
 
 // square of Euclid distance between two multi-dimensional points
 inline static double euclid_dist_2(int numdims,    /* no. dimensions */
@@ -57,14 +60,37 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
     int i, j, k;
     int index, loop = 0;
     double timing = 0;
+    double red_start = 0, red_time = 0;   // reduction phase (merge of the per-thread arrays)
 
     double delta;        // fraction of objects whose clusters change in each loop
     int *newClusterSize; // [numClusters]: no. objects assigned in each new cluster
     double *newClusters; // [numClusters][numCoords]
     int nthreads;        // no. threads
 
+    /*
+     * Incremental updates (-u): newClusters/newClusterSize are kept across
+     * loops. In a loop that is not a full recompute the per-thread arrays
+     * only collect the changes (an object that changes cluster is subtracted
+     * from its old cluster and added to the new one), and the reduction adds
+     * them to the previous sums, so accumulation costs O(delta) instead of
+     * O(numObjs). Every recompute_every loops (and in the first) the sums are
+     * rebuilt from scratch, which also drops the accumulated rounding error.
+     * 0 = only the first loop; 1 (default) = every loop.
+     */
+    long recompute_every = _recompute_every;
+    long accumulated = 0; // objects added to (or moved between) the sums
+    int full;             // this loop rebuilds the sums
+
     nthreads = omp_get_max_threads();
-    printf("OpenMP Kmeans - Reduction\t(number of threads: %d)\n", nthreads);
+#ifdef SOA
+    printf("OpenMP Kmeans - Reduction, float SoA\t(number of threads: %d)\t(full recompute every: %ld)\n", nthreads, recompute_every);
+
+    // float, coordinate-major copy of the objects: the only object data read by the loop
+    float *soa = soa_transpose(objects, numObjs, numCoords);           // [numCoords][numObjs]
+    float *clusters_f = (float *)malloc(numClusters * numCoords * sizeof(float));
+#else
+    printf("OpenMP Kmeans - Reduction\t(number of threads: %d)\t(full recompute every: %ld)\n", nthreads, recompute_every);
+#endif
 
     // initialize membership
     for (i = 0; i < numObjs; i++)
@@ -74,7 +100,7 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
     newClusterSize = (typeof(newClusterSize))calloc(numClusters, sizeof(*newClusterSize));
     newClusters = (typeof(newClusters))calloc(numClusters * numCoords, sizeof(*newClusters));
 
-    // Each thread calculates new centers using a private space. After that, thread 0 does an array reduction on them.
+    // Each thread calculates new centers using a private space. After that, the team reduces them in parallel.
     int *local_newClusterSize[nthreads]; // [nthreads][numClusters]
     double *local_newClusters[nthreads]; // [nthreads][numClusters][numCoords]
 
@@ -93,16 +119,14 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
     timing = wtime();
     do
     {
-        // before each loop, set cluster data to 0
-        for (i = 0; i < numClusters; i++)
-        {
-            for (j = 0; j < numCoords; j++)
-                newClusters[i * numCoords + j] = 0.0;
-            newClusterSize[i] = 0;
-        }
+        // newClusters/newClusterSize need no clearing: the reduction below overwrites them (full) or adds to them
+        full = (loop == 0 || (recompute_every > 0 && loop % recompute_every == 0));
 
         // reset delta before each iteration; it will be updated via reduction in the parallel region
         delta = 0.0;
+#ifdef SOA
+        soa_clusters(clusters, clusters_f, numClusters, numCoords);
+#endif
 
         /*
          * TODO: Initiliaze local cluster data to zero (separate for each thread)
@@ -110,7 +134,8 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
          * We now use an OpenMP parallel region where:
          *  - Each thread zeroes its own local_newClusterSize/local_newClusters.
          *  - The object loop is distributed with 'omp for' and 'reduction(+ : delta)'.
-         *  - A single thread reduces the per-thread local arrays into the shared arrays.
+         *  - All threads reduce the per-thread local arrays into the shared arrays,
+         *    each one a separate slice of them.
          */
 #pragma omp parallel private(i, j, k, index)
         {
@@ -125,20 +150,90 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
 
             // Distribute objects across threads and compute per-thread contributions.
             // delta is accumulated using a reduction to avoid atomics on a shared variable.
-#pragma omp for reduction(+ : delta)
+#ifdef SOA
+            // blocks of SOA_BLOCK objects: distances to all centers, then the sums coordinate by coordinate
+#pragma omp for reduction(+ : delta, accumulated) schedule(static)
+            for (i = 0; i < numObjs; i += SOA_BLOCK)
+            {
+                int block_index[SOA_BLOCK];
+                int block_old[SOA_BLOCK];   // previous membership (incremental loops)
+                int len = numObjs - i < SOA_BLOCK ? numObjs - i : SOA_BLOCK;
+                int o;
+
+                soa_find_nearest_block(soa, numObjs, numCoords, clusters_f, numClusters, i, len, block_index);
+
+                for (o = 0; o < len; o++)
+                {
+                    index = block_index[o];
+                    block_old[o] = membership[i + o];
+                    if (block_old[o] != index)
+                        delta += 1.0;
+                    membership[i + o] = index;
+                    if (full)
+                    {
+                        local_newClusterSize[tid][index]++;
+                        accumulated++;
+                    }
+                    else if (block_old[o] != index)
+                    {
+                        local_newClusterSize[tid][block_old[o]]--;
+                        local_newClusterSize[tid][index]++;
+                        accumulated++;
+                    }
+                }
+                for (j = 0; j < numCoords; j++)
+                {
+                    const float *x = &soa[(size_t)j * numObjs + i];
+                    if (full)
+                    {
+                        for (o = 0; o < len; o++)
+                            local_newClusters[tid][block_index[o] * numCoords + j] += x[o];
+                    }
+                    else
+                    {
+                        for (o = 0; o < len; o++)
+                            if (block_old[o] != block_index[o])
+                            {
+                                local_newClusters[tid][block_old[o] * numCoords + j] -= x[o];
+                                local_newClusters[tid][block_index[o] * numCoords + j] += x[o];
+                            }
+                    }
+                }
+            }
+#else
+#pragma omp for reduction(+ : delta, accumulated)
             for (i = 0; i < numObjs; i++)
             {
+                int old = membership[i];
+
                 // find the array index of nearest cluster center
                 index = find_nearest_cluster(numClusters, numCoords,
                                              &objects[i * numCoords], clusters);
 
                 // if membership changes, increase delta by 1
-                if (membership[i] != index)
+                if (old != index)
                     delta += 1.0;
 
                 // assign the membership to object i
                 membership[i] = index;
 
+                if (!full)
+                {
+                    // incremental loop: only move object i from its old cluster to the new one
+                    if (old != index)
+                    {
+                        local_newClusterSize[tid][old]--;
+                        local_newClusterSize[tid][index]++;
+                        for (j = 0; j < numCoords; j++)
+                        {
+                            local_newClusters[tid][old * numCoords + j] -= objects[i * numCoords + j];
+                            local_newClusters[tid][index * numCoords + j] += objects[i * numCoords + j];
+                        }
+                        accumulated++;
+                    }
+                    continue;
+                }
+
                 // update new cluster centers : sum of all objects located within (average will be performed later)
                 /*
                  * TODO: Collect cluster data in local arrays (local to each thread)
@@ -147,31 +242,42 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
                 local_newClusterSize[tid][index]++;
                 for (j = 0; j < numCoords; j++)
                     local_newClusters[tid][index * numCoords + j] += objects[i * numCoords + j];
+                accumulated++;
             }
+#endif
 
             /*
              * TODO: Reduction of cluster data from local arrays to shared.
-             *       This operation will be performed by one thread
              *
-             * Here we use 'omp single' so that exactly one thread accumulates
-             * all per-thread local arrays into the shared newClusterSize/newClusters.
+             * Partitioned reduction: the numClusters*numCoords sums (and the
+             * numClusters sizes) are split over the team with 'omp for', and
+             * each thread adds up the T local copies of its own slice. No
+             * thread ever writes another's slice, so no synchronization is
+             * needed besides the barrier at the end, and the merge costs
+             * O(T x C x D / T) per thread instead of O(T x C x D) on one.
              */
-#pragma omp single
+#pragma omp master
+            red_start = wtime();   /* the object loop above ends with a barrier */
+
+#pragma omp for schedule(static) nowait
+            for (i = 0; i < numClusters; i++)
             {
+                int size = full ? 0 : newClusterSize[i];
                 for (k = 0; k < T; k++)   // only sum over the threads actually in this team
-                {
-                    int *srcS = local_newClusterSize[k];
-                    double *srcC = local_newClusters[k];
-                    if (!srcS || !srcC)
-                        continue;
-                    for (i = 0; i < numClusters; i++)
-                    {
-                        newClusterSize[i] += srcS[i];
-                        for (j = 0; j < numCoords; j++)
-                            newClusters[i * numCoords + j] += srcC[i * numCoords + j];
-                    }
-                }
-            } /* implicit barrier after single */
+                    size += local_newClusterSize[k][i];
+                newClusterSize[i] = size;
+            }
+#pragma omp for schedule(static)
+            for (i = 0; i < numClusters * numCoords; i++)
+            {
+                double sum = full ? 0.0 : newClusters[i];
+                for (k = 0; k < T; k++)
+                    sum += local_newClusters[k][i];
+                newClusters[i] = sum;
+            } /* implicit barrier */
+
+#pragma omp master
+            red_time += wtime() - red_start;
         }     /* end parallel region */
 
         // average the sum and replace old cluster centers with newClusters
@@ -195,12 +301,20 @@ void kmeans(double *objects,     /* in: [numObjs][numCoords] */
     } while (delta > threshold && loop < loop_threshold);
     timing = wtime() - timing;
     printf("\n nloops = %3d (total = %7.4fs) (per loop = %7.4fs)\n", loop, timing, timing / loop);
+    printf(" reduction   (total = %9.6fs) (per loop = %9.6fs)\n", red_time, red_time / loop);
+    if (recompute_every != 1)
+        printf(" accumulated = %ld of %ld object updates (%5.1f%%)\n",
+               accumulated, (long)loop * numObjs, 100.0 * accumulated / ((double)loop * numObjs));
 
     for (k = 0; k < nthreads; k++)
     {
         free(local_newClusterSize[k]);
         free(local_newClusters[k]);
     }
+#ifdef SOA
+    free(soa);
+    free(clusters_f);
+#endif
     free(newClusters);
     free(newClusterSize);
 }
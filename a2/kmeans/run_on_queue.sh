@@ -9,8 +9,12 @@
 # Submission details
 # usage—no affinity (default): C
 # with default affinity (bind 0..T-1): qsub -q serial -l nodes=sandman:ppn=64 -v THREADS=32,AFFINITY=default,BIN=omp_naive_kmeans run_on_queue.sh
-# BIN=seq_kmeans|omp_naive_kmeans|omp_reduction_kmeans
+# BIN=seq_kmeans|omp_naive_kmeans|omp_reduction_kmeans|omp_hamerly_kmeans|omp_minibatch_kmeans|omp_reduction_kmeans_soa
 # optional VARS: SIZE=256,COORDS=16,CLUSTERS=32,LOOPS=10
+# mini-batch only: BATCH=4096,RATE=0 (0 = 1/count step); mini-batch runs also print the final SSE (-q)
+# SSE=1: final SSE (-q) for any BIN, e.g. the full-batch baseline of a mini-batch comparison
+# INIT=1: K-means|| initialisation (-i), any BIN
+# seq/reduction only: RECOMPUTE=1 (-u: incremental centre updates with a full recompute every RECOMPUTE loops, 0 = first loop only; 1 = plain)
 
 set -euo pipefail
 cd /home/parallel/parlab05/a2/kmeans || exit 1
@@ -20,6 +24,11 @@ cd /home/parallel/parlab05/a2/kmeans || exit 1
 : "${COORDS:=16}"
 : "${CLUSTERS:=32}"
 : "${LOOPS:=10}"
+: "${BATCH:=4096}"
+: "${RATE:=0}"
+: "${INIT:=0}"
+: "${SSE:=0}"
+: "${RECOMPUTE:=1}"
 : "${THREADS:?Set THREADS via qsub -v THREADS=...}"
 : "${AFFINITY:=none}"
 
@@ -37,12 +46,31 @@ BENCH_ROOT="/home/parallel/parlab05/a2/kmeans/benchmarks"
 case "${BIN}" in
   *seq*)                BENCH_SUBDIR_BASE="serial" ;;
   *naive*)              BENCH_SUBDIR_BASE="naive" ;;
+  *reduction*soa*)      BENCH_SUBDIR_BASE="reduction_soa" ;;
   *reduction*|*copied*) BENCH_SUBDIR_BASE="reduction" ;;
+  *hamerly*)            BENCH_SUBDIR_BASE="hamerly" ;;
+  *minibatch*)          BENCH_SUBDIR_BASE="minibatch" ;;
   *)                    BENCH_SUBDIR_BASE="other" ;;
 esac
 BENCH_SUBDIR="${BENCH_SUBDIR_BASE}/${AFF_LABEL}"
 
 RUN_TAG="S${SIZE}_N${COORDS}_C${CLUSTERS}_L${LOOPS}_T${THREADS}"
+EXTRA_ARGS=()
+if [[ "${BIN}" == *minibatch* ]]; then
+  RUN_TAG="${RUN_TAG}_B${BATCH}_R${RATE}"
+  EXTRA_ARGS=(-b "${BATCH}" -r "${RATE}")
+fi
+if [[ "${BIN}" == *minibatch* || "${SSE}" == "1" ]]; then
+  EXTRA_ARGS+=(-q)
+fi
+if [[ "${RECOMPUTE}" != "1" && ( "${BIN}" == *seq* || "${BIN}" == *reduction* ) ]]; then
+  RUN_TAG="${RUN_TAG}_U${RECOMPUTE}"
+  EXTRA_ARGS+=(-u "${RECOMPUTE}")
+fi
+if [[ "${INIT}" == "1" ]]; then
+  RUN_TAG="${RUN_TAG}_init"
+  EXTRA_ARGS+=(-i)
+fi
 RESULT_DIR="${BENCH_ROOT}/${BENCH_SUBDIR}/${RUN_TAG}"
 mkdir -p "${RESULT_DIR}"
 
@@ -51,11 +79,11 @@ mkdir -p "${RESULT_DIR}"
   echo "[run_on_queue] OMP_NUM_THREADS=${OMP_NUM_THREADS}"
   echo "[run_on_queue] GOMP_CPU_AFFINITY=${GOMP_CPU_AFFINITY:-<unset>}"
   echo "[run_on_queue] AFF_LABEL=${AFF_LABEL}"
-  echo "[run_on_queue] Params: -s ${SIZE} -n ${COORDS} -c ${CLUSTERS} -l ${LOOPS}"
+  echo "[run_on_queue] Params: -s ${SIZE} -n ${COORDS} -c ${CLUSTERS} -l ${LOOPS} ${EXTRA_ARGS[*]+${EXTRA_ARGS[*]}}"
   echo "[run_on_queue] Result dir: ${RESULT_DIR}"
 } | tee "${RESULT_DIR}/meta.txt"
 
-"./${BIN}" -s "${SIZE}" -n "${COORDS}" -c "${CLUSTERS}" -l "${LOOPS}" \
+"./${BIN}" -s "${SIZE}" -n "${COORDS}" -c "${CLUSTERS}" -l "${LOOPS}" ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"} \
   | tee "${RESULT_DIR}/output.txt"
 
 
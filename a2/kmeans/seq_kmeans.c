@@ -49,14 +49,26 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             double * clusters)         /* out: [numClusters][numCoords] */
 {
     int i, j;
-    int index, loop=0;
+    int index, old, loop=0;
     double timing = 0;
 
     double delta;          // fraction of objects whose clusters change in each loop 
     int * newClusterSize; // [numClusters]: no. objects assigned in each new cluster 
     double * newClusters;  // [numClusters][numCoords] 
 
-    printf("Sequential Kmeans\n");
+    /*
+     * Incremental updates (-u): newClusters/newClusterSize are kept across
+     * loops, and in a loop that is not a full recompute only the objects
+     * that change cluster are moved from the old sum to the new one, so the
+     * accumulation costs O(delta) instead of O(numObjs). Every recompute_every
+     * loops (and in the first) the sums are rebuilt from scratch, which also
+     * drops the rounding error the subtractions accumulate. 0 = only the
+     * first loop; 1 (default) = every loop, the plain algorithm.
+     */
+    long recompute_every = _recompute_every;
+    long accumulated = 0;  // objects added to (or moved between) the sums
+
+    printf("Sequential Kmeans\t(full recompute every: %ld)\n", recompute_every);
 
     // initialize membership
     for (i=0; i<numObjs; i++) 
@@ -69,11 +81,15 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     timing = wtime();   
     
     do {
-        // before each loop, set cluster data to 0
-        for (i=0; i<numClusters; i++) {
-            for (j=0; j<numCoords; j++)
-                newClusters[i*numCoords + j] = 0.0;
-            newClusterSize[i] = 0;
+        int full = (loop == 0 || (recompute_every > 0 && loop % recompute_every == 0));
+
+        // before each full recompute, set cluster data to 0
+        if (full) {
+            for (i=0; i<numClusters; i++) {
+                for (j=0; j<numCoords; j++)
+                    newClusters[i*numCoords + j] = 0.0;
+                newClusterSize[i] = 0;
+            }
         }
 
         delta = 0.0;
@@ -83,16 +99,29 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             index = find_nearest_cluster(numClusters, numCoords, &objects[i*numCoords], clusters);
 
             // if membership changes, increase delta by 1 
-            if (membership[i] != index)
+            old = membership[i];
+            if (old != index)
                 delta += 1.0;
 
             // assign the membership to object i 
             membership[i] = index;
 
             // update new cluster centers : sum of objects located within
-            newClusterSize[index]++;
-            for (j=0; j<numCoords; j++)
-                newClusters[index*numCoords + j] += objects[i*numCoords + j];
+            if (full) {
+                newClusterSize[index]++;
+                for (j=0; j<numCoords; j++)
+                    newClusters[index*numCoords + j] += objects[i*numCoords + j];
+                accumulated++;
+            } else if (old != index) {
+                // move object i from its old cluster's sum to the new one
+                newClusterSize[old]--;
+                newClusterSize[index]++;
+                for (j=0; j<numCoords; j++) {
+                    newClusters[old*numCoords + j]   -= objects[i*numCoords + j];
+                    newClusters[index*numCoords + j] += objects[i*numCoords + j];
+                }
+                accumulated++;
+            }
         }
 
         // average the sum and replace old cluster centers with newClusters 
@@ -113,6 +142,9 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     } while (delta > threshold && loop < loop_threshold);
     timing = wtime() - timing;
     printf("\n        nloops = %3d   (total = %7.4fs)  (per loop = %7.4fs)\n", loop, timing, timing/loop);
+    if (recompute_every != 1)
+        printf("        accumulated = %ld of %ld object updates (%5.1f%%)\n",
+               accumulated, (long) loop * numObjs, 100.0 * accumulated / ((double) loop * numObjs));
 
     free(newClusters);
     free(newClusterSize);
@@ -2,8 +2,13 @@
 """
 Generate execution-time diagrams for every results_*.txt table.
 
+If lock-statistics runs exist (``STATS=1 run_on_queue.sh``, output in
+``../benchmarks/<lock>_stats/<tag>/output.txt``), each lock's diagram also
+gets the distribution of lock_acquire() wait times per thread count next to
+the time bars.
+
 Usage:
-    python diagrams.py [--metric {total,per_loop}]
+    python diagrams.py [--metric {total,per_loop}] [--stats-suffix SUFFIX]
 """
 
 from __future__ import annotations
@@ -11,7 +16,7 @@ from __future__ import annotations
 import argparse
 import re
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 import matplotlib
 
@@ -22,8 +27,12 @@ import matplotlib.pyplot as plt  # noqa: E402
 BASE_DIR = Path(__file__).resolve().parent
 RESULTS_DIR = BASE_DIR / "results"
 IMAGES_DIR = BASE_DIR / "images"
+BENCH_DIR = BASE_DIR.parent / "benchmarks"
 TAG_RE = re.compile(r"S\d+_N\d+_C\d+_L\d+_T\d+")
 
+# (lo_ns, hi_ns, count) buckets of one run, plus its (acquires, wait_total_ns) over all threads
+WaitStats = Tuple[List[Tuple[int, int, int]], int, int]
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -35,6 +44,12 @@ def parse_args() -> argparse.Namespace:
         default="total",
         help="Which time column to visualize (default: total).",
     )
+    parser.add_argument(
+        "--stats-suffix",
+        default="",
+        help="Run-tag suffix of the lock-statistics runs to plot, e.g. _locks4 "
+        "(default: none, the single-lock runs).",
+    )
     return parser.parse_args()
 
 
@@ -64,6 +79,61 @@ def parse_results_table(path: Path) -> List[Tuple[int, float, float]]:
     return rows
 
 
+def parse_lock_stats(path: Path) -> WaitStats | None:
+    """Return the wait-time histogram and totals of a LOCK_STATS block (see locks/lock_stats.c)."""
+    hist: List[Tuple[int, int, int]] = []
+    acquires = wait_total = 0
+    found = False
+    with path.open() as file:
+        for line in file:
+            fields = line.strip().split(",")
+            if fields[0] != "LOCK_STATS" or len(fields) < 2:
+                continue
+            found = True
+            if fields[1] == "thread":
+                acquires += int(fields[3])
+                wait_total += int(fields[4])
+            elif fields[1] == "hist":
+                hist.append((int(fields[2]), int(fields[3]), int(fields[4])))
+    return (hist, acquires, wait_total) if found else None
+
+
+def collect_wait_stats(lock_key: str, suffix: str) -> Dict[int, WaitStats]:
+    """Wait statistics of benchmarks/<lock_key>_stats/<tag><suffix>/, by thread count."""
+    by_threads: Dict[int, WaitStats] = {}
+    stats_dir = BENCH_DIR / f"{lock_key}_stats"
+    if not stats_dir.is_dir():
+        return by_threads
+    for run_dir in sorted(stats_dir.iterdir()):
+        tag_match = TAG_RE.match(run_dir.name)
+        if not tag_match or run_dir.name[tag_match.end():] != suffix:
+            continue
+        output = run_dir / "output.txt"
+        stats = parse_lock_stats(output) if output.is_file() else None
+        if stats:
+            threads = int(tag_match.group(0).rsplit("_T", 1)[-1])
+            by_threads[threads] = stats
+    return dict(sorted(by_threads.items()))
+
+
+def plot_wait_distribution(ax: plt.Axes, waits: Dict[int, WaitStats], lock_name: str) -> None:
+    for threads, (hist, acquires, wait_total) in waits.items():
+        if not acquires:
+            continue
+        # bucket [lo, hi) drawn at its upper edge, as a fraction of all acquires; log y shows the rare long waits
+        xs = [hi for _lo, hi, count in hist if count]
+        ys = [count / acquires for _lo, _hi, count in hist if count]
+        mean = wait_total / acquires
+        ax.plot(xs, ys, marker="o", markersize=3, label=f"T={threads} (mean {mean:.0f} ns)")
+    ax.set_xscale("log", base=2)
+    ax.set_yscale("log")
+    ax.set_title(f"{lock_name} - lock_acquire() wait")
+    ax.set_xlabel("Wait time (ns, upper bucket edge)")
+    ax.set_ylabel("Fraction of acquires")
+    ax.grid(True, linestyle="--", linewidth=0.5, alpha=0.7)
+    ax.legend(fontsize=8)
+
+
 def series_from_rows(
     rows: Iterable[Tuple[int, float, float]], metric: str
 ) -> Tuple[List[int], List[float]]:
@@ -92,7 +162,7 @@ def add_bar_labels(ax: plt.Axes, bars: Iterable[plt.Rectangle], fmt: str = "{:.4
         )
 
 
-def plot_results(path: Path, metric: str) -> Path | None:
+def plot_results(path: Path, metric: str, stats_suffix: str = "") -> Path | None:
     rows = parse_results_table(path)
     if not rows:
         return None
@@ -100,7 +170,12 @@ def plot_results(path: Path, metric: str) -> Path | None:
     lock_name = format_lock_label(path)
     metric_label = "Total time (s)" if metric == "total" else "Per-loop time (s)"
     positions = list(range(len(threads)))
-    fig, ax = plt.subplots(figsize=(8, 5))
+    waits = collect_wait_stats(path.stem.replace("results_", ""), stats_suffix)
+    if waits:
+        fig, (ax, wait_ax) = plt.subplots(1, 2, figsize=(15, 5))
+        plot_wait_distribution(wait_ax, waits, lock_name)
+    else:
+        fig, ax = plt.subplots(figsize=(8, 5))
     bars = ax.bar(positions, values, width=0.6, color="#4472c4")
     ax.set_xticks(positions)
     ax.set_xticklabels([str(t) for t in threads])
@@ -172,7 +247,7 @@ def main() -> None:
     IMAGES_DIR.mkdir(parents=True, exist_ok=True)
     generated = []
     for txt_file in sorted(RESULTS_DIR.glob("results_*.txt")):
-        image_path = plot_results(txt_file, args.metric)
+        image_path = plot_results(txt_file, args.metric, args.stats_suffix)
         if image_path:
             generated.append(image_path)
     combined = plot_combined(args.metric)
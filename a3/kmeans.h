@@ -5,6 +5,8 @@
 
 void kmeans(double * objects, int numCoords, int numObjs, int numClusters, double threshold, long loop_threshold, int *membership, double * clusters);
 
+void kmeans_parallel_init(double * objects, int numCoords, int numObjs, int numClusters, double * clusters);
+
 double * dataset_generation(int numObjs, int numCoords);
 
 int check_repeated_clusters(int, int, double*);
@@ -13,4 +15,10 @@ double wtime(void);
 
 extern int _debug;
 
+/* lock versions only (-L): no. locks guarding the new centers, 0 = one per cluster */
+extern long _lock_stripes;
+
+/* lock and critical versions (-M): objects summed privately per thread between locked flushes, 0 = once per loop */
+extern long _flush_every;
+
 #endif
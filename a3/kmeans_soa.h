@@ -0,0 +1,87 @@
+#ifndef _H_KMEANS_SOA
+#define _H_KMEANS_SOA
+
+/*
+ * Float32, structure-of-arrays distance kernel for the -DSOA builds.
+ *
+ * Objects are copied once into a coordinate-major float array
+ * soa[numCoords][numObjs] (the layout of cuda_kmeans_transpose.cu), so the
+ * distances of a block of SOA_BLOCK consecutive objects to one center are
+ * computed with unit-stride, vectorisable loops over the objects, and the
+ * object stream the loop reads is half the size of the double one.
+ * Sums for the new centers are still accumulated in double.
+ */
+
+#include <stdlib.h>
+#include <stdio.h>
+
+#define SOA_BLOCK 256   /* objects per block: dist[], best[] and index[] stay in L1 */
+
+// objects[numObjs][numCoords] (double) -> soa[numCoords][numObjs] (float), first touch in parallel
+static inline float *soa_transpose(const double *objects, int numObjs, int numCoords)
+{
+    float *soa;
+    long i, j;
+
+    if (posix_memalign((void **)&soa, 64, (size_t)numCoords * numObjs * sizeof(float)) != 0) {
+        fprintf(stderr, "Error: could not allocate the float object array\n");
+        exit(1);
+    }
+#pragma omp parallel for private(j) schedule(static)
+    for (i = 0; i < numObjs; i++)
+        for (j = 0; j < numCoords; j++)
+            soa[j * numObjs + i] = (float)objects[i * numCoords + j];
+    return soa;
+}
+
+// clusters[numClusters][numCoords] (double) -> float copy
+static inline void soa_clusters(const double *clusters, float *clusters_f, int numClusters, int numCoords)
+{
+    int i;
+
+    for (i = 0; i < numClusters * numCoords; i++)
+        clusters_f[i] = (float)clusters[i];
+}
+
+/*
+ * Nearest center of objects [start, start+len), len <= SOA_BLOCK, into index[0..len).
+ * Ties go to the lower center id, as in find_nearest_cluster.
+ */
+static inline void soa_find_nearest_block(const float *soa,        /* [numCoords][numObjs] */
+                                          int numObjs,
+                                          int numCoords,
+                                          const float *clusters_f, /* [numClusters][numCoords] */
+                                          int numClusters,
+                                          int start,
+                                          int len,
+                                          int *index)              /* out: [len] */
+{
+    float dist[SOA_BLOCK] __attribute__((aligned(64)));
+    float best[SOA_BLOCK] __attribute__((aligned(64)));
+    int o, j, k;
+
+    for (k = 0; k < numClusters; k++) {
+        const float *center = &clusters_f[k * numCoords];
+
+#pragma omp simd aligned(dist)
+        for (o = 0; o < len; o++)
+            dist[o] = 0.0f;
+        for (j = 0; j < numCoords; j++) {
+            const float *x = &soa[(size_t)j * numObjs + start];
+            const float c = center[j];
+#pragma omp simd aligned(dist)
+            for (o = 0; o < len; o++) {
+                float d = x[o] - c;
+                dist[o] += d * d;
+            }
+        }
+#pragma omp simd aligned(dist, best)
+        for (o = 0; o < len; o++) {
+            int closer = k == 0 || dist[o] < best[o];
+            best[o] = closer ? dist[o] : best[o];
+            index[o] = closer ? k : index[o];
+        }
+    }
+}
+
+#endif
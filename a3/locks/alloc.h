@@ -4,16 +4,22 @@
 #include <stdio.h>
 #include <stdlib.h>
 
+#define CACHE_LINE 64
+
 /**
  * A pretty malloc() wrapper with error handling.
+ * Allocations are cache-line aligned and padded to whole lines, so separate
+ * locks (e.g. the per-cluster locks of omp_lock_kmeans) never share a line.
  **/
 #define XMALLOC(var,N) \
 	do { \
-		(var) = malloc((N) * sizeof(*(var))); \
-		if (!(var)) { \
+		void *xmalloc_p_; \
+		size_t xmalloc_bytes_ = ((N) * sizeof(*(var)) + CACHE_LINE - 1) & ~(size_t)(CACHE_LINE - 1); \
+		if (posix_memalign(&xmalloc_p_, CACHE_LINE, xmalloc_bytes_) != 0) { \
 			fprintf(stderr, "Out of memory: %s:%d\n", __FILE__, __LINE__); \
 			exit(1); \
 		} \
+		(var) = xmalloc_p_; \
 	} while(0)
 
 #define XFREE(var) free(var)
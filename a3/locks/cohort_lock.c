@@ -0,0 +1,155 @@
+#define _GNU_SOURCE
+#include <sched.h>
+#include <unistd.h>
+
+#include "alloc.h"
+#include "lock.h"
+char LOCKNAME[32];
+
+/**
+ * Cohort lock (Dice, Marathe, Shavit, "Lock Cohorting"), C-TKT-TKT flavour:
+ * a global ticket lock plus one local ticket lock per socket.
+ *
+ * A thread first takes the local lock of its socket. The global lock is
+ * only taken if the previous local holder did not pass it on: on release,
+ * a holder that sees local waiters hands both locks to the next thread of
+ * its own socket, up to COHORT_MAX_PASSES times in a row, so the lock and
+ * the data it protects stay in one socket's caches instead of bouncing
+ * across the interconnect on every handover.
+ *
+ * The socket of a CPU is read once from
+ * /sys/devices/system/cpu/cpuN/topology/physical_package_id (one cohort if
+ * unavailable); threads are expected to be pinned (GOMP_CPU_AFFINITY).
+ **/
+
+#define COHORT_MAX_PASSES 64   /* local handovers before the global lock is released */
+#define COHORT_MAX_CPUS   1024
+
+typedef struct {
+	volatile unsigned int next_ticket;
+	char padding1[CACHE_LINE - sizeof(unsigned int)];
+	volatile unsigned int now_serving;
+	char padding2[CACHE_LINE - sizeof(unsigned int)];
+} ticket_t;
+
+typedef struct {
+	ticket_t ticket;
+	int global_passed; /* the global lock was handed over with the local one */
+	int passes;        /* consecutive local handovers */
+	char padding[CACHE_LINE - 2 * sizeof(int)];
+} cohort_t;
+
+struct lock_struct {
+	ticket_t global;
+	cohort_t *cohort; /* [ncohorts] */
+	int ncohorts;
+};
+
+static int cpu_cohort[COHORT_MAX_CPUS]; /* socket of each CPU */
+static int ncohorts_detected;
+
+__thread int myCohort = -1;
+
+static void detect_cohorts(void)
+{
+	char path[128];
+	FILE *fp;
+	int cpu, id, ncpus = sysconf(_SC_NPROCESSORS_CONF);
+
+	if (ncohorts_detected)
+		return;
+	if (ncpus > COHORT_MAX_CPUS)
+		ncpus = COHORT_MAX_CPUS;
+
+	ncohorts_detected = 1;
+	for (cpu = 0; cpu < ncpus; cpu++) {
+		id = 0;
+		snprintf(path, sizeof(path), "/sys/devices/system/cpu/cpu%d/topology/physical_package_id", cpu);
+		if ((fp = fopen(path, "r"))) {
+			if (fscanf(fp, "%d", &id) != 1 || id < 0)
+				id = 0;
+			fclose(fp);
+		}
+		cpu_cohort[cpu] = id;
+		if (id + 1 > ncohorts_detected)
+			ncohorts_detected = id + 1;
+	}
+}
+
+static inline void ticket_acquire(ticket_t *t)
+{
+	unsigned int ticket = __sync_fetch_and_add(&t->next_ticket, 1);
+
+	while (__atomic_load_n(&t->now_serving, __ATOMIC_ACQUIRE) != ticket)
+		/* do nothing */ ;
+}
+
+static inline void ticket_release(ticket_t *t)
+{
+	__atomic_store_n(&t->now_serving, t->now_serving + 1, __ATOMIC_RELEASE);
+}
+
+lock_t *lock_init(int nthreads)
+{
+	strcpy(LOCKNAME,"cohort-ticket");
+	lock_t *lock;
+	int i;
+
+	detect_cohorts();
+
+	XMALLOC(lock, 1);
+	lock->global.next_ticket = 0;
+	lock->global.now_serving = 0;
+	lock->ncohorts = ncohorts_detected;
+	XMALLOC(lock->cohort, lock->ncohorts);
+	for (i=0; i < lock->ncohorts; i++) {
+		lock->cohort[i].ticket.next_ticket = 0;
+		lock->cohort[i].ticket.now_serving = 0;
+		lock->cohort[i].global_passed = 0;
+		lock->cohort[i].passes = 0;
+	}
+	return lock;
+}
+
+void lock_free(lock_t *lock)
+{
+	lock_t *l = lock;
+	XFREE(l->cohort);
+	XFREE(l);
+}
+
+void lock_acquire(lock_t *lock)
+{
+	lock_t *l = lock;
+	cohort_t *c;
+
+	/* once per thread; also keeps acquire and release on the same cohort */
+	if (myCohort < 0) {
+		int cpu = sched_getcpu();
+		myCohort = (cpu >= 0 && cpu < COHORT_MAX_CPUS) ? cpu_cohort[cpu] : 0;
+	}
+	c = &l->cohort[myCohort % l->ncohorts];
+
+	ticket_acquire(&c->ticket);
+	if (!c->global_passed)
+		ticket_acquire(&l->global);
+}
+
+void lock_release(lock_t *lock)
+{
+	lock_t *l = lock;
+	cohort_t *c = &l->cohort[myCohort % l->ncohorts];
+	unsigned int waiting = __atomic_load_n(&c->ticket.next_ticket, __ATOMIC_RELAXED)
+	                       - c->ticket.now_serving - 1;
+
+	if (waiting > 0 && c->passes < COHORT_MAX_PASSES) {
+		/* keep the global lock inside the cohort */
+		c->passes++;
+		c->global_passed = 1;
+	} else {
+		c->passes = 0;
+		c->global_passed = 0;
+		ticket_release(&l->global);
+	}
+	ticket_release(&c->ticket);
+}
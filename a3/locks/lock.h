@@ -3,6 +3,19 @@
 #include <string.h>
 extern char LOCKNAME[32];
 
+/*
+ * Instrumented build (-DLOCK_STATS, see lock_stats.c): the implementation
+ * is compiled under lock_impl_* names and lock_stats.c provides the API
+ * above it, timing every acquire.
+ */
+#if defined(LOCK_STATS) && !defined(LOCK_STATS_WRAPPER)
+#define lock_struct  lock_impl_struct
+#define lock_init    lock_impl_init
+#define lock_free    lock_impl_free
+#define lock_acquire lock_impl_acquire
+#define lock_release lock_impl_release
+#endif
+
 typedef struct lock_struct lock_t;
 
 lock_t *lock_init(int nthreads);
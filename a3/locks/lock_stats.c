@@ -0,0 +1,139 @@
+#include <stdint.h>
+#include <time.h>
+
+#define LOCK_STATS_WRAPPER
+#include "alloc.h"
+#include "lock.h"
+
+/**
+ * Contention statistics for any lock implementation: linked in front of an
+ * implementation compiled with -DLOCK_STATS (make kmeans_omp_<lock>_stats).
+ *
+ * Every thread counts into its own cache-line-aligned slot, reached through
+ * a thread-local pointer: acquires, total and maximum time spent in
+ * lock_acquire(), and a log2 histogram of that wait. The counters cover all
+ * locks of the run (e.g. every stripe of omp_lock_kmeans -L) and are printed
+ * when the last lock is freed, as lines of the form
+ *
+ *   LOCK_STATS,begin,<lockname>,<threads>,<locks>
+ *   LOCK_STATS,thread,<id>,<acquires>,<wait_total_ns>,<wait_max_ns>
+ *   LOCK_STATS,hist,<lo_ns>,<hi_ns>,<count>    wait in [lo_ns, hi_ns)
+ *   LOCK_STATS,end
+ *
+ * parsed by diagrams/diagrams.py.
+ **/
+
+#define LOCK_STATS_MAX_THREADS 256
+#define LOCK_STATS_BUCKETS     40   /* bucket 0: < 1ns, bucket b: [2^(b-1), 2^b) ns */
+
+struct lock_impl_struct;
+struct lock_impl_struct *lock_impl_init(int nthreads);
+void lock_impl_free(struct lock_impl_struct *lock);
+void lock_impl_acquire(struct lock_impl_struct *lock);
+void lock_impl_release(struct lock_impl_struct *lock);
+
+struct lock_struct {
+	struct lock_impl_struct *impl;
+};
+
+typedef struct {
+	unsigned long acquires;
+	uint64_t wait_total_ns;
+	uint64_t wait_max_ns;
+	unsigned long hist[LOCK_STATS_BUCKETS];
+} __attribute__ ((aligned(CACHE_LINE))) lock_stats_t;
+
+static lock_stats_t stats[LOCK_STATS_MAX_THREADS];
+static int nstats_threads;   /* slots handed out */
+static int nlocks_live;      /* lock_init() - lock_free() */
+static int nlocks_total;     /* locks since the last report */
+
+__thread lock_stats_t *myStats;
+
+static inline uint64_t now_ns(void)
+{
+	struct timespec ts;
+
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return (uint64_t)ts.tv_sec * 1000000000ULL + ts.tv_nsec;
+}
+
+static void print_stats(void)
+{
+	unsigned long hist[LOCK_STATS_BUCKETS] = {0};
+	int t, b, last = 0;
+
+	printf("LOCK_STATS,begin,%s,%d,%d\n", LOCKNAME, nstats_threads, nlocks_total);
+	for (t=0; t < nstats_threads; t++) {
+		printf("LOCK_STATS,thread,%d,%lu,%llu,%llu\n", t, stats[t].acquires,
+		       (unsigned long long)stats[t].wait_total_ns, (unsigned long long)stats[t].wait_max_ns);
+		for (b=0; b < LOCK_STATS_BUCKETS; b++)
+			hist[b] += stats[t].hist[b];
+	}
+	for (b=0; b < LOCK_STATS_BUCKETS; b++)
+		if (hist[b])
+			last = b;
+	for (b=0; b <= last; b++)
+		printf("LOCK_STATS,hist,%llu,%llu,%lu\n",
+		       b ? 1ULL << (b - 1) : 0ULL, 1ULL << b, hist[b]);
+	printf("LOCK_STATS,end\n");
+	fflush(stdout);
+}
+
+lock_t *lock_init(int nthreads)
+{
+	lock_t *lock;
+
+	XMALLOC(lock, 1);
+	lock->impl = lock_impl_init(nthreads);
+	__sync_fetch_and_add(&nlocks_live, 1);
+	__sync_fetch_and_add(&nlocks_total, 1);
+	return lock;
+}
+
+void lock_free(lock_t *lock)
+{
+	lock_impl_free(lock->impl);
+	XFREE(lock);
+
+	if (__sync_sub_and_fetch(&nlocks_live, 1) == 0) {
+		print_stats();
+		memset(stats, 0, sizeof(stats));
+		nlocks_total = 0;
+		/* slots stay assigned to their threads */
+	}
+}
+
+void lock_acquire(lock_t *lock)
+{
+	lock_stats_t *s = myStats;
+	uint64_t start, wait;
+	int b;
+
+	if (!s) {
+		int slot = __sync_fetch_and_add(&nstats_threads, 1);
+		if (slot >= LOCK_STATS_MAX_THREADS) {
+			fprintf(stderr, "lock_stats: more than %d threads\n", LOCK_STATS_MAX_THREADS);
+			exit(1);
+		}
+		s = myStats = &stats[slot];
+	}
+
+	start = now_ns();
+	lock_impl_acquire(lock->impl);
+	wait = now_ns() - start;
+
+	b = wait ? 64 - __builtin_clzll(wait) : 0;
+	if (b >= LOCK_STATS_BUCKETS)
+		b = LOCK_STATS_BUCKETS - 1;
+	s->acquires++;
+	s->wait_total_ns += wait;
+	if (wait > s->wait_max_ns)
+		s->wait_max_ns = wait;
+	s->hist[b]++;
+}
+
+void lock_release(lock_t *lock)
+{
+	lock_impl_release(lock->impl);
+}
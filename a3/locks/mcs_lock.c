@@ -0,0 +1,77 @@
+#include "alloc.h"
+#include "lock.h"
+char LOCKNAME[32];
+
+#define FALSE 0
+#define TRUE  1
+
+/**
+ * MCS queue lock: every waiter spins on the flag of its own queue node,
+ * which its predecessor clears on release, so a handover touches one
+ * remote line regardless of the number of waiters.
+ *
+ * A thread holds at most one lock at a time in omp_lock_kmeans, so one
+ * node per thread is enough, even with several (striped) locks. The node
+ * is thread-local storage, aligned to its own cache line: nothing is
+ * allocated on the acquire path (cf. clh_lock.c).
+ **/
+typedef struct mcs_node {
+	struct mcs_node *volatile next;
+	volatile int locked; /* FALSE or TRUE. */
+} __attribute__ ((aligned(CACHE_LINE))) mcs_node_t;
+
+struct lock_struct {
+	mcs_node_t *volatile tail;
+	char padding[CACHE_LINE - sizeof(mcs_node_t *)];
+};
+
+__thread mcs_node_t myQNode;
+
+lock_t *lock_init(int nthreads)
+{
+	strcpy(LOCKNAME,"mcs-queue");
+	lock_t *lock;
+
+	XMALLOC(lock, 1);
+	lock->tail = NULL;
+	return lock;
+}
+
+void lock_free(lock_t *lock)
+{
+	XFREE(lock);
+}
+
+void lock_acquire(lock_t *lock)
+{
+	lock_t *l = lock;
+	mcs_node_t *node = &myQNode, *pred;
+
+	node->next = NULL;
+	node->locked = TRUE;
+	pred = __atomic_exchange_n(&l->tail, node, __ATOMIC_ACQ_REL);
+	if (pred) {
+		__atomic_store_n(&pred->next, node, __ATOMIC_RELEASE);
+		while (__atomic_load_n(&node->locked, __ATOMIC_ACQUIRE) == TRUE)
+			/* do nothing */ ;
+	}
+}
+
+void lock_release(lock_t *lock)
+{
+	lock_t *l = lock;
+	mcs_node_t *node = &myQNode, *succ, *expected;
+
+	succ = __atomic_load_n(&node->next, __ATOMIC_ACQUIRE);
+	if (!succ) {
+		/* no known successor: try to empty the queue */
+		expected = node;
+		if (__atomic_compare_exchange_n(&l->tail, &expected, NULL, 0,
+		                                __ATOMIC_RELEASE, __ATOMIC_RELAXED))
+			return;
+		/* a thread is enqueueing behind us: wait for it to link itself */
+		while (!(succ = __atomic_load_n(&node->next, __ATOMIC_ACQUIRE)))
+			/* do nothing */ ;
+	}
+	__atomic_store_n(&succ->locked, FALSE, __ATOMIC_RELEASE);
+}
@@ -0,0 +1,49 @@
+#include "alloc.h"
+#include "lock.h"
+char LOCKNAME[32];
+
+/**
+ * Ticket lock: FIFO order with two counters. A thread takes the next ticket
+ * with one fetch-and-add and spins reading now_serving, so waiting threads
+ * only read a shared line; the holder is the only writer of now_serving.
+ * The counters live on separate cache lines so taking a ticket does not
+ * invalidate the line the waiters spin on more than once per handover.
+ **/
+struct lock_struct {
+	volatile unsigned int next_ticket;
+	char padding1[CACHE_LINE - sizeof(unsigned int)];
+	volatile unsigned int now_serving;
+	char padding2[CACHE_LINE - sizeof(unsigned int)];
+};
+
+lock_t *lock_init(int nthreads)
+{
+	strcpy(LOCKNAME,"ticket");
+	lock_t *lock;
+
+	XMALLOC(lock, 1);
+	lock->next_ticket = 0;
+	lock->now_serving = 0;
+	return lock;
+}
+
+void lock_free(lock_t *lock)
+{
+	XFREE(lock);
+}
+
+void lock_acquire(lock_t *lock)
+{
+	lock_t *l = lock;
+	unsigned int ticket = __sync_fetch_and_add(&l->next_ticket, 1);
+
+	while (__atomic_load_n(&l->now_serving, __ATOMIC_ACQUIRE) != ticket)
+		/* do nothing */ ;
+}
+
+void lock_release(lock_t *lock)
+{
+	lock_t *l = lock;
+
+	__atomic_store_n(&l->now_serving, l->now_serving + 1, __ATOMIC_RELEASE);
+}
@@ -7,6 +7,8 @@
 #include <unistd.h>     /* getopt() */
 
 int _debug;
+long _lock_stripes;
+long _flush_every;
 #include "kmeans.h"
 
 static void usage(char *argv0) {
@@ -17,6 +19,12 @@ static void usage(char *argv0) {
         "       -n num_coords      : number of coordinates\n"
         "       -t threshold       : threshold value (default : 0.001)\n"
         "       -l loop_threshold  : iterations threshold (default : 10)\n"
+        "       -i                 : K-means|| initialisation (default : first num_clusters objects)\n"
+        "       -L num_locks       : lock versions: locks guarding the new centers, cluster i uses\n"
+        "                            lock i mod num_locks; 0 = one per cluster (default : 1)\n"
+        "       -M flush_every     : lock/critical versions: objects a thread sums privately before\n"
+        "                            adding them to the shared centers under the lock; 1 = lock per\n"
+        "                            object, 0 = once per loop (default : 1)\n"
         "       -d                 : enable debug mode\n"
         "       -h                 : print this help information\n";
     fprintf(stderr, help, argv0);
@@ -36,16 +44,21 @@ int main(int argc, char **argv)
     double   dataset_size = 0, threshold;
     long     loop_threshold;
     double   io_timing_read;
+    int      parallel_init;
+    double   init_timing;
 
     /* some default values */
     _debug         = 0;
     threshold      = 0.001;
     loop_threshold = 10;
     numClusters    = 0;
+    parallel_init  = 0;
+    _lock_stripes  = 1;
+    _flush_every   = 1;
 
     printf("\n~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n\n");
 
-    while ( (opt = getopt(argc,argv,"n:t:l:c:s:dh")) != EOF) {
+    while ( (opt = getopt(argc,argv,"n:t:l:c:s:iL:M:dh")) != EOF) {
         switch (opt) {
             case 'c': numClusters = atol(optarg);
                       break;
@@ -57,6 +70,12 @@ int main(int argc, char **argv)
                       break;
             case 'n': numCoords=atol(optarg);
                       break;
+            case 'i': parallel_init = 1;
+                      break;
+            case 'L': _lock_stripes = atol(optarg);
+                      break;
+            case 'M': _flush_every = atol(optarg);
+                      break;
             case 'd': _debug = 1;
                       break;
             case 'h':
@@ -64,7 +83,7 @@ int main(int argc, char **argv)
                       break;
         }
     }
-    if (numClusters <= 1)
+    if (numClusters <= 1 || _lock_stripes < 0 || _flush_every < 0)
         usage(argv[0]);
 
     numObjs = (dataset_size*1024*1024) / (numCoords*sizeof(double));
@@ -80,10 +99,18 @@ int main(int argc, char **argv)
     // Allocate space for clusters (coordinates of cluster centers)
     clusters = (double*)  malloc(numClusters * numCoords * sizeof(double));
 
-    // The first numClusters elements are selected as initial centers
-    for (i=0; i<numClusters; i++)
-        for (j=0; j<numCoords; j++)
-            clusters[i*numCoords + j] = objects[i*numCoords + j];
+    if (parallel_init) {
+        // K-means||: a few oversampling passes over the data, reduced to numClusters seeds
+        init_timing = wtime();
+        kmeans_parallel_init(objects, numCoords, numObjs, numClusters, clusters);
+        init_timing = wtime() - init_timing;
+        printf("K-means|| initialisation (total = %7.4fs)\n", init_timing);
+    } else {
+        // The first numClusters elements are selected as initial centers
+        for (i=0; i<numClusters; i++)
+            for (j=0; j<numCoords; j++)
+                clusters[i*numCoords + j] = objects[i*numCoords + j];
+    }
 
     // check initial cluster centers for repeatition 
     if (check_repeated_clusters(numClusters, numCoords, clusters) == 0) {
@@ -0,0 +1,162 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include "kmeans.h"
+#include <omp.h>
+
+/*
+ * Lock-free version: every object adds itself to the shared accumulators
+ * with hardware atomics instead of a lock. The size is an 'omp atomic'
+ * increment; each coordinate is a compare-and-swap loop on the bits of the
+ * double (x86 has no atomic floating-point add). Each cluster's size and
+ * sums sit in their own cache-line-aligned, line-padded block, so threads
+ * updating different clusters never touch the same line.
+ */
+
+#define CACHE_LINE 64
+
+// square of Euclid distance between two multi-dimensional points
+inline static double euclid_dist_2(int    numdims,  /* no. dimensions */
+                                 double * coord1,   /* [numdims] */
+                                 double * coord2)   /* [numdims] */
+{
+    int i;
+    double ans = 0.0;
+
+    for(i=0; i<numdims; i++)
+        ans += (coord1[i]-coord2[i]) * (coord1[i]-coord2[i]);
+
+    return ans;
+}
+
+inline static int find_nearest_cluster(int      numClusters, /* no. clusters */
+                                       int      numCoords,   /* no. coordinates */
+                                       double * object,      /* [numCoords] */
+                                       double * clusters)    /* [numClusters][numCoords] */
+{
+    int index, i;
+    double dist, min_dist;
+
+    // find the cluster id that has min distance to object
+    index = 0;
+    min_dist = euclid_dist_2(numCoords, object, clusters);
+
+    for(i=1; i<numClusters; i++) {
+        dist = euclid_dist_2(numCoords, object, &clusters[i*numCoords]);
+        // no need square root
+        if (dist < min_dist) { // find the min and its array index
+            min_dist = dist;
+            index    = i;
+        }
+    }
+    return index;
+}
+
+// *addr += val, atomically: retry the CAS until no other thread changed *addr in between
+inline static void atomic_add_double(double * addr, double val)
+{
+    uint64_t * bits = (uint64_t *) addr;
+    uint64_t old_bits = __atomic_load_n(bits, __ATOMIC_RELAXED), new_bits;
+    double old_val, new_val;
+
+    do {
+        memcpy(&old_val, &old_bits, sizeof(old_val));
+        new_val = old_val + val;
+        memcpy(&new_bits, &new_val, sizeof(new_bits));
+    } while (!__atomic_compare_exchange_n(bits, &old_bits, new_bits, 1,
+                                          __ATOMIC_RELAXED, __ATOMIC_RELAXED));
+}
+
+void kmeans(double * objects,          /* in: [numObjs][numCoords] */
+            int      numCoords,        /* no. coordinates */
+            int      numObjs,          /* no. objects */
+            int      numClusters,      /* no. clusters */
+            double   threshold,        /* minimum fraction of objects that change membership */
+            long     loop_threshold,   /* maximum number of iterations */
+            int    * membership,       /* out: [numObjs] */
+            double * clusters)         /* out: [numClusters][numCoords] */
+{
+    int i, j;
+    int index, loop=0;
+    double timing = 0;
+
+    double delta;          // fraction of objects whose clusters change in each loop
+    int nthreads;         // no. threads
+
+    nthreads = omp_get_max_threads();
+    printf("OpenMP Kmeans - Atomic\t(number of threads: %d)\n", nthreads);
+
+    /*
+     * Accumulator of cluster c: stride bytes at acc + c*stride, a long size
+     * followed by numCoords double sums (both 8 bytes); stride rounds that
+     * up to whole cache lines.
+     */
+    size_t stride = (sizeof(long) + numCoords * sizeof(double) + CACHE_LINE - 1) / CACHE_LINE * CACHE_LINE;
+    char * acc;
+    if (posix_memalign((void **) &acc, CACHE_LINE, numClusters * stride) != 0) {
+        fprintf(stderr, "Error: could not allocate the cluster accumulators\n");
+        exit(1);
+    }
+
+    // initialize membership
+    for (i=0; i<numObjs; i++)
+        membership[i] = -1;
+
+    timing = wtime();
+
+    do {
+        // before each loop, set cluster data to 0
+        memset(acc, 0, numClusters * stride);
+
+        delta = 0.0;
+
+        #pragma omp parallel for \
+        private(i,j,index) \
+        firstprivate(numObjs,numClusters,numCoords) \
+        shared(objects,clusters,membership,acc) \
+        schedule(static) reduction(+:delta)
+
+        for (i=0; i<numObjs; i++) {
+            // find the array index of nearest cluster center
+            index = find_nearest_cluster(numClusters, numCoords, &objects[i*numCoords], clusters);
+
+            // if membership changes, increase delta by 1
+            if (membership[i] != index)
+                delta += 1.0;
+
+            // assign the membership to object i
+            membership[i] = index;
+
+            // update new cluster centers : sum of objects located within, no lock
+            long * size = (long *) (acc + index*stride);
+            double * sums = (double *) (acc + index*stride + sizeof(long));
+            #pragma omp atomic
+            (*size)++;
+            for (j=0; j<numCoords; j++)
+                atomic_add_double(&sums[j], objects[i*numCoords + j]);
+        }
+
+        // average the sum and replace old cluster centers with newClusters
+        for (i=0; i<numClusters; i++) {
+            long size = *(long *) (acc + i*stride);
+            double * sums = (double *) (acc + i*stride + sizeof(long));
+            if (size > 0) {
+                for (j=0; j<numCoords; j++) {
+                    clusters[i*numCoords + j] = sums[j] / size;
+                }
+            }
+        }
+
+        // Get fraction of objects whose membership changed during this loop. This is used as a convergence criterion.
+        delta /= numObjs;
+
+        loop++;
+        printf("\r\tcompleted loop %d", loop);
+        fflush(stdout);
+    } while (delta > threshold && loop < loop_threshold);
+    timing = wtime() - timing;
+    printf("\n        nloops = %3d   (total = %7.4fs)  (per loop = %7.4fs)\n", loop, timing, timing/loop);
+
+    free(acc);
+}
@@ -43,6 +43,34 @@ inline static int find_nearest_cluster(int      numClusters, /* no. clusters */
     return index;
 }
 
+/*
+ * Add a thread's buffered sums to the shared arrays and clear them, in one
+ * critical section. Clusters with nothing buffered are skipped.
+ */
+inline static void flush_buffer(int      numClusters,
+                                int      numCoords,
+                                int    * bufSize,        /* [numClusters] */
+                                double * buf,            /* [numClusters][numCoords] */
+                                int    * newClusterSize, /* [numClusters] */
+                                double * newClusters)    /* [numClusters][numCoords] */
+{
+    int c, j;
+
+    #pragma omp critical
+    {
+        for (c=0; c<numClusters; c++) {
+            if (bufSize[c] == 0)
+                continue;
+            newClusterSize[c] += bufSize[c];
+            for (j=0; j<numCoords; j++) {
+                newClusters[c*numCoords + j] += buf[c*numCoords + j];
+                buf[c*numCoords + j] = 0.0;
+            }
+            bufSize[c] = 0;
+        }
+    }
+}
+
 void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             int      numCoords,        /* no. coordinates */
             int      numObjs,          /* no. objects */
@@ -52,7 +80,7 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             int    * membership,       /* out: [numObjs] */
             double * clusters)         /* out: [numClusters][numCoords] */
 {
-    int i, j;
+    int i, j, k;
     int index, loop=0;
     double timing = 0;
 
@@ -62,7 +90,23 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     int nthreads;         // no. threads 
 
     nthreads = omp_get_max_threads();
-    printf("OpenMP Kmeans - Naive-critical\t(number of threads: %d)\n", nthreads);
+
+    /*
+     * Batched updates (-M): with flush_every > 1 each thread sums its objects
+     * in a private buffer and adds it to the shared arrays in a critical
+     * section every flush_every objects, and once more at the end of its
+     * chunk (flush_every = 0: only then). 1 enters the critical section for
+     * every object.
+     */
+    long flush_every = _flush_every;
+    int * bufSize[nthreads];   // [nthreads][numClusters]
+    double * buf[nthreads];    // [nthreads][numClusters][numCoords]
+    for (k=0; k<nthreads; k++) {
+        bufSize[k] = (typeof(*bufSize)) calloc(numClusters, sizeof(**bufSize));
+        buf[k] = (typeof(*buf)) calloc(numClusters * numCoords, sizeof(**buf));
+    }
+
+    printf("OpenMP Kmeans - Naive-critical\t(number of threads: %d)\t(flush every: %ld)\n", nthreads, flush_every);
 
     // initialize membership
     for (i=0; i<numObjs; i++)
@@ -87,12 +131,16 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
         /* 
          * TODO: Detect parallelizable region and use appropriate OpenMP pragmas
          */
-        #pragma omp parallel for \
+        #pragma omp parallel \
         private(i,j,index) \
         firstprivate(numObjs,numClusters,numCoords) \
         shared(objects,clusters,membership,newClusters,newClusterSize) \
-        schedule(static) reduction(+:delta)
+        reduction(+:delta)
+        {
+        int tid = omp_get_thread_num();
+        long pending = 0;
 
+        #pragma omp for schedule(static) nowait
         for (i=0; i<numObjs; i++) {
             // find the array index of nearest cluster center 
             index = find_nearest_cluster(numClusters, numCoords, &objects[i*numCoords], clusters);
@@ -117,14 +165,28 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             //     #pragma omp atomic
             //     newClusters[index*numCoords + j] += objects[i*numCoords + j];
             // }
-            #pragma omp critical
-            {
-                newClusterSize[index]++;
-                for (j=0; j<numCoords; j++){
-                    newClusters[index*numCoords + j] += objects[i*numCoords + j];
+            if (flush_every == 1) {
+                #pragma omp critical
+                {
+                    newClusterSize[index]++;
+                    for (j=0; j<numCoords; j++){
+                        newClusters[index*numCoords + j] += objects[i*numCoords + j];
+                    }
+                }
+            } else {
+                bufSize[tid][index]++;
+                for (j=0; j<numCoords; j++)
+                    buf[tid][index*numCoords + j] += objects[i*numCoords + j];
+                if (++pending == flush_every) {
+                    flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters);
+                    pending = 0;
                 }
             }
         }
+        // the rest of this thread's chunk
+        if (pending)
+            flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters);
+        }
 
         // average the sum and replace old cluster centers with newClusters 
         for (i=0; i<numClusters; i++) {
@@ -145,6 +207,10 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     timing = wtime() - timing;
     printf("\n        nloops = %3d   (total = %7.4fs)  (per loop = %7.4fs)\n", loop, timing, timing/loop);
 
+    for (k=0; k<nthreads; k++) {
+        free(bufSize[k]);
+        free(buf[k]);
+    }
     free(newClusters);
     free(newClusterSize);
 }
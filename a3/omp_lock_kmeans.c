@@ -7,6 +7,9 @@
 #include <omp.h>
 
 #include "locks/lock.h"
+#ifdef SOA
+#include "kmeans_soa.h"
+#endif
 
 // square of Euclid distance between two multi-dimensional points
 inline static double euclid_dist_2(int    numdims,  /* no. dimensions */
@@ -45,6 +48,43 @@ inline static int find_nearest_cluster(int      numClusters, /* no. clusters */
     return index;
 }
 
+/*
+ * Add a thread's buffered sums to the shared arrays and clear them. Clusters
+ * with nothing buffered are skipped; each lock stripe with something to add
+ * is acquired once for all of its clusters.
+ */
+inline static void flush_buffer(int      numClusters,
+                                int      numCoords,
+                                int    * bufSize,        /* [numClusters] */
+                                double * buf,            /* [numClusters][numCoords] */
+                                int    * newClusterSize, /* [numClusters] */
+                                double * newClusters,    /* [numClusters][numCoords] */
+                                lock_t ** locks,
+                                int      nlocks)
+{
+    int s, c, j, held;
+
+    for (s=0; s<nlocks; s++) {
+        held = 0;
+        for (c=s; c<numClusters; c+=nlocks) {
+            if (bufSize[c] == 0)
+                continue;
+            if (!held) {
+                lock_acquire(locks[s]);
+                held = 1;
+            }
+            newClusterSize[c] += bufSize[c];
+            for (j=0; j<numCoords; j++) {
+                newClusters[c*numCoords + j] += buf[c*numCoords + j];
+                buf[c*numCoords + j] = 0.0;
+            }
+            bufSize[c] = 0;
+        }
+        if (held)
+            lock_release(locks[s]);
+    }
+}
+
 void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             int      numCoords,        /* no. coordinates */
             int      numObjs,          /* no. objects */
@@ -54,7 +94,7 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             int    * membership,       /* out: [numObjs] */
             double * clusters)         /* out: [numClusters][numCoords] */
 {
-    int i, j;
+    int i, j, s, k;
     int index, loop=0;
     double timing = 0;
 
@@ -64,10 +104,40 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     int nthreads;         // no. threads 
 
     nthreads = omp_get_max_threads();
-    lock_t *lock; // lock1 -> newClustersSize, lock2 -> newClusters
-    lock = lock_init(nthreads);
 
-    printf("OpenMP Kmeans - Lock (%s)\t(number of threads: %d)\n", LOCKNAME, nthreads);
+    /*
+     * Lock striping: cluster i is guarded by locks[i % nlocks], so objects of
+     * clusters with different locks are added in parallel. nlocks = 1 is the
+     * single global lock, nlocks = numClusters one lock per cluster.
+     */
+    int nlocks = (_lock_stripes <= 0 || _lock_stripes > numClusters) ? numClusters : _lock_stripes;
+    lock_t **locks = (lock_t **) malloc(nlocks * sizeof(*locks));
+    for (s=0; s<nlocks; s++)
+        locks[s] = lock_init(nthreads);
+
+    /*
+     * Batched updates (-M): with flush_every > 1 each thread sums its objects
+     * in a private buffer and adds it to the shared arrays under the lock(s)
+     * every flush_every objects, and once more at the end of its chunk
+     * (flush_every = 0: only then). 1 takes the lock for every object.
+     */
+    long flush_every = _flush_every;
+    int * bufSize[nthreads];   // [nthreads][numClusters]
+    double * buf[nthreads];    // [nthreads][numClusters][numCoords]
+    for (k=0; k<nthreads; k++) {
+        bufSize[k] = (typeof(*bufSize)) calloc(numClusters, sizeof(**bufSize));
+        buf[k] = (typeof(*buf)) calloc(numClusters * numCoords, sizeof(**buf));
+    }
+
+#ifdef SOA
+    printf("OpenMP Kmeans - Lock (%s), float SoA\t(number of threads: %d)\t(locks: %d)\t(flush every: %ld)\n", LOCKNAME, nthreads, nlocks, flush_every);
+
+    // float, coordinate-major copy of the objects: the only object data read by the loop
+    float * soa = soa_transpose(objects, numObjs, numCoords);           // [numCoords][numObjs]
+    float * clusters_f = (float *) malloc(numClusters * numCoords * sizeof(float));
+#else
+    printf("OpenMP Kmeans - Lock (%s)\t(number of threads: %d)\t(locks: %d)\t(flush every: %ld)\n", LOCKNAME, nthreads, nlocks, flush_every);
+#endif
 
     // initialize membership
     for (i=0; i<numObjs; i++)
@@ -89,15 +159,67 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
 
         delta = 0.0;
 
+#ifdef SOA
+        soa_clusters(clusters, clusters_f, numClusters, numCoords);
+
+        // blocks of SOA_BLOCK objects: distances to all centers at once, then the locked updates
+        #pragma omp parallel \
+        private(i,j,index) \
+        firstprivate(numObjs,numClusters,numCoords) \
+        shared(soa,clusters_f,membership,newClusters,newClusterSize) \
+        reduction(+:delta)
+        {
+        int tid = omp_get_thread_num();
+        long pending = 0;
+
+        #pragma omp for schedule(static) nowait
+        for (i=0; i<numObjs; i+=SOA_BLOCK) {
+            int block_index[SOA_BLOCK];
+            int len = numObjs - i < SOA_BLOCK ? numObjs - i : SOA_BLOCK;
+            int o;
+
+            soa_find_nearest_block(soa, numObjs, numCoords, clusters_f, numClusters, i, len, block_index);
+
+            for (o=0; o<len; o++) {
+                index = block_index[o];
+                if (membership[i+o] != index)
+                    delta += 1.0;
+                membership[i+o] = index;
+
+                if (flush_every == 1) {
+                    lock_acquire(locks[index % nlocks]);
+                    newClusterSize[index]++;
+                    for (j=0; j<numCoords; j++)
+                        newClusters[index*numCoords + j] += soa[(size_t)j*numObjs + i + o];
+                    lock_release(locks[index % nlocks]);
+                } else {
+                    bufSize[tid][index]++;
+                    for (j=0; j<numCoords; j++)
+                        buf[tid][index*numCoords + j] += soa[(size_t)j*numObjs + i + o];
+                    if (++pending == flush_every) {
+                        flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters, locks, nlocks);
+                        pending = 0;
+                    }
+                }
+            }
+        }
+        if (pending)
+            flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters, locks, nlocks);
+        }
+#else
         /* 
          * TODO: Detect parallelizable region and use appropriate OpenMP pragmas
          */
-        #pragma omp parallel for \
+        #pragma omp parallel \
         private(i,j,index) \
         firstprivate(numObjs,numClusters,numCoords) \
         shared(objects,clusters,membership,newClusters,newClusterSize) \
-        schedule(static) reduction(+:delta)
+        reduction(+:delta)
+        {
+        int tid = omp_get_thread_num();
+        long pending = 0;
 
+        #pragma omp for schedule(static) nowait
         for (i=0; i<numObjs; i++) {
             // find the array index of nearest cluster center 
             index = find_nearest_cluster(numClusters, numCoords, &objects[i*numCoords], clusters);
@@ -110,13 +232,28 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
             membership[i] = index;
 
             // update new cluster centers : sum of objects located within 
-            lock_acquire(lock);
-            newClusterSize[index]++;
-            for (j=0; j<numCoords; j++){
-                newClusters[index*numCoords + j] += objects[i*numCoords + j];
+            if (flush_every == 1) {
+                lock_acquire(locks[index % nlocks]);
+                newClusterSize[index]++;
+                for (j=0; j<numCoords; j++){
+                    newClusters[index*numCoords + j] += objects[i*numCoords + j];
+                }
+                lock_release(locks[index % nlocks]);
+            } else {
+                bufSize[tid][index]++;
+                for (j=0; j<numCoords; j++)
+                    buf[tid][index*numCoords + j] += objects[i*numCoords + j];
+                if (++pending == flush_every) {
+                    flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters, locks, nlocks);
+                    pending = 0;
+                }
             }
-            lock_release(lock);
         }
+        // the rest of this thread's chunk
+        if (pending)
+            flush_buffer(numClusters, numCoords, bufSize[tid], buf[tid], newClusterSize, newClusters, locks, nlocks);
+        }
+#endif
 
         // average the sum and replace old cluster centers with newClusters 
         for (i=0; i<numClusters; i++) {
@@ -137,8 +274,18 @@ void kmeans(double * objects,          /* in: [numObjs][numCoords] */
     timing = wtime() - timing;
     printf("\n        nloops = %3d   (total = %7.4fs)  (per loop = %7.4fs)\n", loop, timing, timing/loop);
 
+#ifdef SOA
+    free(soa);
+    free(clusters_f);
+#endif
     free(newClusters);
     free(newClusterSize);
 
-    lock_free(lock);
+    for (k=0; k<nthreads; k++) {
+        free(bufSize[k]);
+        free(buf[k]);
+    }
+    for (s=0; s<nlocks; s++)
+        lock_free(locks[s]);
+    free(locks);
 }
@@ -14,6 +14,15 @@
 ##   COORDS=16
 ##   CLUSTERS=32
 ##   LOOPS=10
+##   SOA=0      (1: float32 SoA builds, kmeans_omp_<lock>_soa; make them first)
+##   INIT=0     (1: K-means|| initialisation, -i)
+##   STATS=0    (1: lock-statistics builds, kmeans_omp_<lock>_stats; make them first;
+##               results in benchmarks/<lock>_stats/, plotted by diagrams/diagrams.py)
+##   STRIPES=1  (lock versions: locks guarding the centers, -L; space-separated
+##               list to sweep, 0 = one per cluster, e.g. STRIPES="1 2 4 8 0")
+##   FLUSH=1    (lock and critical versions: objects summed privately between locked
+##               flushes, -M; space-separated list to sweep, 0 = once per loop,
+##               e.g. FLUSH="1 4 16 64 256 0")
 
 set -euo pipefail
 
@@ -25,6 +34,15 @@ SIZE="${SIZE:-32}"
 COORDS="${COORDS:-16}"
 CLUSTERS="${CLUSTERS:-32}"
 LOOPS="${LOOPS:-10}"
+SOA="${SOA:-0}"
+STATS="${STATS:-0}"
+INIT="${INIT:-0}"
+read -r -a STRIPES_LIST <<< "${STRIPES:-1}"
+read -r -a FLUSH_LIST <<< "${FLUSH:-1}"
+INIT_ARGS=()
+if [[ "${INIT}" == "1" ]]; then
+  INIT_ARGS=(-i)
+fi
 
 # Thread configurations to test
 THREADS_LIST=(1 2 4 8 16 32 64)
@@ -38,19 +56,46 @@ LOCKS=(
   "ttas_lock"
   "array_lock"
   "clh_lock"
+  "mcs_lock"
+  "ticket_lock"
+  "cohort_lock"
 )
 
 run_one() {
   local lock_name="$1"
   local threads="$2"
+  local stripes="${3:-1}"
+  local flush="${4:-1}"
   local bin=""
+  local lock_args=(-M "${flush}")
 
   if [[ "${lock_name}" == "critical" ]]; then
     # OpenMP critical version
     bin="kmeans_omp_critical"
+  elif [[ "${lock_name}" == "atomic" ]]; then
+    # Lock-free version (no lock, so no -L/-M)
+    bin="kmeans_omp_atomic"
+    lock_args=()
   else
     # Lock-based versions (built from omp_lock_kmeans.c + one lock object)
     bin="kmeans_omp_${lock_name}"
+    lock_args+=(-L "${stripes}")
+  fi
+  if [[ "${SOA}" == "1" ]]; then
+    if [[ "${lock_name}" == "critical" || "${lock_name}" == "atomic" ]]; then
+      echo "[WARN] Skipping lock='${lock_name}': no SoA build"
+      return
+    fi
+    bin="${bin}_soa"
+    lock_name="${lock_name}_soa"
+  fi
+  if [[ "${STATS}" == "1" ]]; then
+    if [[ "${lock_name}" == "critical" || "${lock_name}" == "atomic" ]]; then
+      echo "[WARN] Skipping lock='${lock_name}': no lock-statistics build"
+      return
+    fi
+    bin="${bin}_stats"
+    lock_name="${lock_name}_stats"
   fi
 
   if [[ ! -x "./${bin}" ]]; then
@@ -72,6 +117,15 @@ run_one() {
   # Result directory:
   #   benchmarks/<lock_name>/S32_N16_C32_L10_T8/
   local result_dir="benchmarks/${lock_name}/S${SIZE}_N${COORDS}_C${CLUSTERS}_L${LOOPS}_T${threads}"
+  if [[ "${stripes}" != "1" ]]; then
+    result_dir="${result_dir}_locks${stripes}"
+  fi
+  if [[ "${flush}" != "1" ]]; then
+    result_dir="${result_dir}_flush${flush}"
+  fi
+  if [[ "${INIT}" == "1" ]]; then
+    result_dir="${result_dir}_init"
+  fi
   mkdir -p "${result_dir}"
 
   {
@@ -79,24 +133,36 @@ run_one() {
     echo "[run_on_queue] LOCK=${lock_name}"
     echo "[run_on_queue] OMP_NUM_THREADS=${OMP_NUM_THREADS}"
     echo "[run_on_queue] GOMP_CPU_AFFINITY=${GOMP_CPU_AFFINITY}"
-    echo "[run_on_queue] Params: -s ${SIZE} -n ${COORDS} -c ${CLUSTERS} -l ${LOOPS}"
+    echo "[run_on_queue] Params: -s ${SIZE} -n ${COORDS} -c ${CLUSTERS} -l ${LOOPS} ${lock_args[*]+${lock_args[*]}} ${INIT_ARGS[*]+${INIT_ARGS[*]}}"
     echo "[run_on_queue] Result dir: ${result_dir}"
   } > "${result_dir}/meta.txt"
 
-  echo "[INFO] Running lock='${lock_name}', threads=${threads}, bin='${bin}'"
+  echo "[INFO] Running lock='${lock_name}', threads=${threads}, locks=${stripes}, flush=${flush}, bin='${bin}'"
   ./"${bin}" -s "${SIZE}" -n "${COORDS}" -c "${CLUSTERS}" -l "${LOOPS}" \
+    ${lock_args[@]+"${lock_args[@]}"} ${INIT_ARGS[@]+"${INIT_ARGS[@]}"} \
     | tee "${result_dir}/output.txt"
 }
 
 # 1) Run all lock implementations (omp_lock_kmeans.c + locks/)
 for lock in "${LOCKS[@]}"; do
-  for t in "${THREADS_LIST[@]}"; do
-    run_one "${lock}" "${t}"
+  for stripes in "${STRIPES_LIST[@]}"; do
+    for flush in "${FLUSH_LIST[@]}"; do
+      for t in "${THREADS_LIST[@]}"; do
+        run_one "${lock}" "${t}" "${stripes}" "${flush}"
+      done
+    done
   done
 done
 
 # 2) Run the critical version (omp_critical_kmeans.c → kmeans_omp_critical)
+for flush in "${FLUSH_LIST[@]}"; do
+  for t in "${THREADS_LIST[@]}"; do
+    run_one "critical" "${t}" 1 "${flush}"
+  done
+done
+
+# 3) Run the lock-free atomic version (omp_atomic_kmeans.c → kmeans_omp_atomic)
 for t in "${THREADS_LIST[@]}"; do
-  run_one "critical" "${t}"
+  run_one "atomic" "${t}"
 done
 
@@ -51,7 +51,7 @@ void kmeans(double * objects,         /* in: [numObjs][numCoords] */
             double * clusters)        /* out: [numClusters][numCoords] */
 {
     int i, j;
-    int index, loop=0;
+    int index, old, loop=0;
     double timing = 0;
 
     /* Every variable has its "rank_" version, which is used to store local data,
@@ -61,9 +61,22 @@ void kmeans(double * objects,         /* in: [numObjs][numCoords] */
     int * rank_newClusterSize, * newClusterSize; // [numClusters]: no. objects assigned in each new cluster 
     double * rank_newClusters, *newClusters;     // [numClusters][numCoords] 
     
+    /*
+     * Incremental updates (-u): each rank keeps rank_newClusters/
+     * rank_newClusterSize across loops (its objects never move to another
+     * rank), and in a loop that is not a full recompute only moves the
+     * objects that change cluster from the old sum to the new one, so the
+     * local accumulation costs O(delta) instead of O(rank_numObjs); the
+     * Allreduce is unchanged. Every recompute_every loops (and in the first)
+     * the sums are rebuilt from scratch, which also drops the accumulated
+     * rounding error. 0 = only the first loop; 1 (default) = every loop.
+     */
+    long recompute_every = _recompute_every;
+
     // Get rank of this process    
     int rank;
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    if (rank == 0 && recompute_every != 1) fprintf(stdout, "incremental centre updates (full recompute every: %ld)\n", recompute_every);
 
     // initialize membership
     for (i=0; i<numObjs; i++)
@@ -77,11 +90,15 @@ void kmeans(double * objects,         /* in: [numObjs][numCoords] */
 
     timing = wtime();
     do {
-        // before each loop, set cluster data to 0
-        for (i=0; i<numClusters; i++) {
-            for (j=0; j<numCoords; j++)
-                rank_newClusters[i*numCoords + j] = 0.0;
-            rank_newClusterSize[i] = 0;
+        int full = (loop == 0 || (recompute_every > 0 && loop % recompute_every == 0));
+
+        // before each full recompute, set cluster data to 0
+        if (full) {
+            for (i=0; i<numClusters; i++) {
+                for (j=0; j<numCoords; j++)
+                    rank_newClusters[i*numCoords + j] = 0.0;
+                rank_newClusterSize[i] = 0;
+            }
         }
 
         rank_delta = 0.0;
@@ -91,16 +108,27 @@ void kmeans(double * objects,         /* in: [numObjs][numCoords] */
             index = find_nearest_cluster(numClusters, numCoords, &objects[i*numCoords], clusters);
             
             // if membership changes, increase rank_delta by 1 
-            if (membership[i] != index)
+            old = membership[i];
+            if (old != index)
                 rank_delta += 1.0;
             
             // assign the membership to object i 
             membership[i] = index;
             
             // update new cluster centers : sum of objects located within
-            rank_newClusterSize[index]++;
-            for (j=0; j<numCoords; j++)
-                rank_newClusters[index*numCoords + j] += objects[i*numCoords + j];
+            if (full) {
+                rank_newClusterSize[index]++;
+                for (j=0; j<numCoords; j++)
+                    rank_newClusters[index*numCoords + j] += objects[i*numCoords + j];
+            } else if (old != index) {
+                // move object i from its old cluster's sum to the new one
+                rank_newClusterSize[old]--;
+                rank_newClusterSize[index]++;
+                for (j=0; j<numCoords; j++) {
+                    rank_newClusters[old*numCoords + j]   -= objects[i*numCoords + j];
+                    rank_newClusters[index*numCoords + j] += objects[i*numCoords + j];
+                }
+            }
         }
 
         /*
@@ -5,6 +5,8 @@
 
 void kmeans(double * objects, int numCoords, int numObjs, int numClusters, double threshold, long loop_threshold, int *membership, double * clusters);
 
+void kmeans_parallel_init(double * objects, int numCoords, int rank_numObjs, int numObjs, int numClusters, double * clusters);
+
 double * dataset_generation(int numObjs, int numCoords, long *rank_numObjs);
 
 int check_repeated_clusters(int, int, double*);
@@ -12,5 +14,6 @@ int check_repeated_clusters(int, int, double*);
 double wtime(void);
 
 extern int _debug;
+extern long _recompute_every;   /* -u */
 
 #endif
@@ -0,0 +1,278 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <mpi.h>
+
+#include "kmeans.h"
+
+/*
+ * K-means|| initialisation (Bahmani et al., "Scalable K-Means++"), MPI version.
+ *
+ * Every rank works on its own objects: the cost of each pass is one
+ * MPI_Allreduce, and the objects a rank picks are shared with
+ * MPI_Allgatherv, so all ranks hold the same candidate set. Candidates are
+ * weighted by the number of objects closest to them (MPI_Allreduce) and
+ * reduced to numClusters centers with a weighted k-means++, computed
+ * redundantly by every rank on identical data.
+ *
+ * Random numbers are a hash of (stream, global object id), so the result
+ * does not depend on the number of ranks.
+ */
+
+#define INIT_ROUNDS       5   /* oversampling passes */
+#define INIT_OVERSAMPLING 2   /* expected candidates per pass, times numClusters */
+
+// square of Euclid distance between two multi-dimensional points
+inline static double euclid_dist_2(int numdims, double *coord1, double *coord2)
+{
+    int i;
+    double ans = 0.0;
+
+    for (i = 0; i < numdims; i++)
+        ans += (coord1[i] - coord2[i]) * (coord1[i] - coord2[i]);
+
+    return ans;
+}
+
+// uniform in [0, 1): splitmix64 of (stream, i)
+inline static double init_uniform(uint64_t stream, uint64_t i)
+{
+    uint64_t x = stream * 0xD1B54A32D192ED03ULL + i + 0x9E3779B97F4A7C15ULL;
+
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return (double)((x ^ (x >> 31)) >> 11) / 9007199254740992.0;
+}
+
+/*
+ * min_dist[i] = min(min_dist[i], distance to candidates [first, ncand)) and
+ * nearest[i] = the candidate at that distance (first one on ties); returns
+ * the new total cost of all ranks
+ */
+static double update_cost(double *objects, int numCoords, int numObjs, double *cand,
+                          int first, int ncand, double *min_dist, int *nearest)
+{
+    int i, c;
+    double d, cost = 0.0, total;
+
+    for (i = 0; i < numObjs; i++)
+    {
+        for (c = first; c < ncand; c++)
+        {
+            d = euclid_dist_2(numCoords, &objects[i * numCoords], &cand[c * numCoords]);
+            if (d < min_dist[i])
+            {
+                min_dist[i] = d;
+                nearest[i] = c;
+            }
+        }
+        cost += min_dist[i];
+    }
+    MPI_Allreduce(&cost, &total, 1, MPI_DOUBLE, MPI_SUM, MPI_COMM_WORLD);
+    return total;
+}
+
+/*
+ * Roulette draw: the first c whose running sum of p[] passes r, counting
+ * only the c with p[c] > 0 (a draw that rounds up past the end takes the
+ * last of them); -1 if every p[c] is 0.
+ */
+static int draw(const double *p, int n, double r)
+{
+    int c, last = -1;
+
+    for (c = 0; c < n; c++)
+    {
+        if (p[c] <= 0.0)
+            continue;
+        last = c;
+        if (r < p[c])
+            break;
+        r -= p[c];
+    }
+    return last;
+}
+
+/*
+ * Weighted k-means++ over the ncand candidates: up to numClusters of them
+ * become the initial centers. Serial, the candidate set is small. A
+ * candidate with weight * d2 == 0 is never drawn (d2 == 0: it coincides
+ * with a center already chosen), so the centers are distinct; returns how
+ * many were chosen, fewer than numClusters once no candidate is left that
+ * differs from all of them (tiny or degenerate data).
+ */
+static int weighted_kmeanspp(double *cand, double *weight, int ncand, int numCoords,
+                             int numClusters, double *clusters)
+{
+    double *d2 = (double *)malloc(ncand * sizeof(double));
+    double *p = (double *)malloc(ncand * sizeof(double));
+    double total, d;
+    int c, k, pick;
+
+    total = 0.0;
+    for (c = 0; c < ncand; c++)
+        total += (p[c] = weight[c]);
+    pick = draw(p, ncand, init_uniform(INIT_ROUNDS + 1, 0) * total);
+    k = 0;
+    if (pick >= 0)
+    {
+        memcpy(clusters, &cand[pick * numCoords], numCoords * sizeof(double));
+        for (c = 0; c < ncand; c++)
+            d2[c] = euclid_dist_2(numCoords, &cand[c * numCoords], clusters);
+
+        for (k = 1; k < numClusters; k++)
+        {
+            total = 0.0;
+            for (c = 0; c < ncand; c++)
+                total += (p[c] = weight[c] * d2[c]);
+            pick = draw(p, ncand, init_uniform(INIT_ROUNDS + 1, k) * total);
+            if (pick < 0)
+                break;
+            memcpy(&clusters[k * numCoords], &cand[pick * numCoords], numCoords * sizeof(double));
+
+            for (c = 0; c < ncand; c++)
+            {
+                d = euclid_dist_2(numCoords, &cand[c * numCoords], &clusters[k * numCoords]);
+                if (d < d2[c])
+                    d2[c] = d;
+            }
+        }
+    }
+    free(p);
+    free(d2);
+    return k;
+}
+
+// 1 if object differs from each of the first k centers
+inline static int is_new_center(int numCoords, double *object, double *clusters, int k)
+{
+    int c;
+
+    for (c = 0; c < k; c++)
+        if (euclid_dist_2(numCoords, object, &clusters[c * numCoords]) == 0.0)
+            return 0;
+    return 1;
+}
+
+/*
+ * Centers [k, numClusters) when the candidates ran out: the next object,
+ * in global order, that differs from every center so far. Each rank scans
+ * its own objects; the lowest rank with a match broadcasts it. With fewer
+ * distinct objects than clusters the previous center is repeated, and
+ * main()'s check_repeated_clusters() reports it.
+ */
+static void pad_centers(double *objects, int numCoords, int rank_numObjs, int k, int numClusters, double *clusters)
+{
+    int i = 0, rank, size, mine, owner;
+
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+
+    for (; k < numClusters; k++)
+    {
+        while (i < rank_numObjs && !is_new_center(numCoords, &objects[i * numCoords], clusters, k))
+            i++;
+        mine = i < rank_numObjs ? rank : size;
+        MPI_Allreduce(&mine, &owner, 1, MPI_INT, MPI_MIN, MPI_COMM_WORLD);
+        if (owner == size)
+        {
+            memcpy(&clusters[k * numCoords], &clusters[(k - 1) * numCoords], numCoords * sizeof(double));
+            continue;
+        }
+        if (rank == owner)
+            memcpy(&clusters[k * numCoords], &objects[i * numCoords], numCoords * sizeof(double));
+        MPI_Bcast(&clusters[k * numCoords], numCoords, MPI_DOUBLE, owner, MPI_COMM_WORLD);
+    }
+}
+
+void kmeans_parallel_init(double *objects,  /* in: [rank_numObjs][numCoords] */
+                          int numCoords,
+                          int rank_numObjs, /* no. objects of this rank */
+                          int numObjs,      /* no. objects of all ranks */
+                          int numClusters,
+                          double *clusters) /* out: [numClusters][numCoords], on every rank */
+{
+    int i, k, round, ncand, first, npicked, total_picked;
+    int rank, size;
+    long offset = 0, g;
+    double cost, l = (double)INIT_OVERSAMPLING * numClusters;
+
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+
+    // global id of this rank's first object (objects are scattered in order)
+    long local_n = rank_numObjs;
+    MPI_Exscan(&local_n, &offset, 1, MPI_LONG, MPI_SUM, MPI_COMM_WORLD);
+    if (rank == 0)
+        offset = 0;
+
+    int recvcounts[size], displs[size];
+    double *cand = (double *)malloc(numCoords * sizeof(double));
+    double *min_dist = (double *)malloc(rank_numObjs * sizeof(double));
+    int *nearest = (int *)malloc(rank_numObjs * sizeof(int));   // [rank_numObjs]: candidate at min_dist
+    double *picked = (double *)malloc(rank_numObjs * numCoords * sizeof(double));
+
+    // first candidate: one object, uniformly; its owner contributes it, everyone else zeros
+    g = (long)(init_uniform(0, 0) * numObjs);
+    // own buffer: picked[] is empty on a rank without objects (numObjs < no. ranks)
+    double contrib[numCoords];
+    for (k = 0; k < numCoords; k++)
+        contrib[k] = (g >= offset && g < offset + rank_numObjs) ? objects[(g - offset) * numCoords + k] : 0.0;
+    MPI_Allreduce(contrib, cand, numCoords, MPI_DOUBLE, MPI_SUM, MPI_COMM_WORLD);
+    ncand = 1;
+
+    for (i = 0; i < rank_numObjs; i++)
+    {
+        min_dist[i] = __builtin_inf();
+        nearest[i] = 0;
+    }
+    cost = update_cost(objects, numCoords, rank_numObjs, cand, 0, ncand, min_dist, nearest);
+
+    for (round = 1; round <= INIT_ROUNDS && cost > 0.0; round++)
+    {
+        // each object is picked independently with probability l * d^2 / cost
+        npicked = 0;
+        for (i = 0; i < rank_numObjs; i++)
+            if (init_uniform(round, offset + i) * cost < l * min_dist[i])
+                memcpy(&picked[npicked++ * numCoords], &objects[i * numCoords], numCoords * sizeof(double));
+
+        // share the picks: in rank order, i.e. in global object order
+        npicked *= numCoords;
+        MPI_Allgather(&npicked, 1, MPI_INT, recvcounts, 1, MPI_INT, MPI_COMM_WORLD);
+        total_picked = 0;
+        for (k = 0; k < size; k++)
+        {
+            displs[k] = ncand * numCoords + total_picked;
+            total_picked += recvcounts[k];
+        }
+        cand = (double *)realloc(cand, (ncand * numCoords + total_picked) * sizeof(double));
+        MPI_Allgatherv(picked, npicked, MPI_DOUBLE, cand, recvcounts, displs, MPI_DOUBLE, MPI_COMM_WORLD);
+
+        first = ncand;
+        ncand += total_picked / numCoords;
+        cost = update_cost(objects, numCoords, rank_numObjs, cand, first, ncand, min_dist, nearest);
+    }
+
+    // weight of a candidate: no. objects (of all ranks) closest to it, already tracked by update_cost
+    double *local_weight = (double *)calloc(ncand, sizeof(double));
+    double *weight = (double *)malloc(ncand * sizeof(double));
+    for (i = 0; i < rank_numObjs; i++)
+        local_weight[nearest[i]] += 1.0;
+    MPI_Allreduce(local_weight, weight, ncand, MPI_DOUBLE, MPI_SUM, MPI_COMM_WORLD);
+
+    // same on every rank; fewer distinct candidates than clusters (tiny or degenerate data): pad with other objects
+    k = weighted_kmeanspp(cand, weight, ncand, numCoords, numClusters, clusters);
+    if (k < numClusters)
+        pad_centers(objects, numCoords, rank_numObjs, k, numClusters, clusters);
+
+    if (_debug && rank == 0)
+        printf("kmeans|| init: %d candidates after %d rounds\n", ncand, round - 1);
+
+    free(local_weight);
+    free(weight);
+    free(picked);
+    free(nearest);
+    free(min_dist);
+    free(cand);
+}
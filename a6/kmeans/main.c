@@ -8,6 +8,7 @@
 #include <mpi.h>
 
 int _debug;
+long _recompute_every;
 #include "kmeans.h"
 
 static void usage(char *argv0) {
@@ -18,6 +19,10 @@ static void usage(char *argv0) {
         "       -n num_coords      : number of coordinates\n"
         "       -t threshold       : threshold value (default : 0.001)\n"
         "       -l loop_threshold  : iterations threshold (default : 10)\n"
+        "       -u period          : incremental centre updates, only the objects that change cluster\n"
+        "                            are moved between the sums, with a full recompute every\n"
+        "                            period loops; 0 = first loop only (default : 1)\n"
+        "       -i                 : K-means|| initialisation (default : first num_clusters objects)\n"
         "       -d                 : enable debug mode\n"
         "       -h                 : print this help information\n";
     fprintf(stderr, help, argv0);
@@ -39,14 +44,18 @@ int main(int argc, char **argv)
     double   dataset_size = 0, threshold;
     long    loop_threshold;
     double  io_timing_read;
+    int     parallel_init;
+    double  init_timing;
 
     /* some default values */
     _debug         = 0;
     threshold      = 0.001;
     loop_threshold = 10;
     numClusters    = 0;
+    _recompute_every = 1;
+    parallel_init  = 0;
 
-    while ( (opt = getopt(argc,argv,"n:t:l:c:s:dh")) != EOF) {
+    while ( (opt = getopt(argc,argv,"n:t:l:c:s:u:idh")) != EOF) {
         switch (opt) {
             case 'c': numClusters = atol(optarg);
                       break;
@@ -58,6 +67,10 @@ int main(int argc, char **argv)
                       break;
             case 'n': numCoords=atol(optarg);
                       break;
+            case 'u': _recompute_every=atol(optarg);
+                      break;
+            case 'i': parallel_init = 1;
+                      break;
             case 'd': _debug = 1;
                       break;
             case 'h':
@@ -65,7 +78,7 @@ int main(int argc, char **argv)
                       break;
         }
     }
-    if (numClusters <= 1) {
+    if (numClusters <= 1 || _recompute_every < 0) {
         usage(argv[0]);
     }
 
@@ -88,11 +101,21 @@ int main(int argc, char **argv)
     // Allocate space for clusters (coordinates of cluster centers)
     clusters = (double*)  malloc(numClusters * numCoords * sizeof(double));
 
+    if (parallel_init) {
+        // K-means||: a few oversampling passes over the data of all ranks, every rank gets the same seeds
+        MPI_Barrier(MPI_COMM_WORLD);
+        init_timing = wtime();
+        kmeans_parallel_init(objects, numCoords, rank_numObjs, numObjs, numClusters, clusters);
+        init_timing = wtime() - init_timing;
+        if (rank == 0) printf("K-means|| initialisation (total = %7.4fs)\n", init_timing);
+    }
+
     // The first numClusters elements are selected as initial centers. Only rank 0 needs to calculate this, and later broadcast it to all ranks.
     if (rank == 0) {
-        for (i=0; i<numClusters; i++)
-            for (j=0; j<numCoords; j++)
-                clusters[i*numCoords + j] = objects[i*numCoords + j];
+        if (!parallel_init)
+            for (i=0; i<numClusters; i++)
+                for (j=0; j<numCoords; j++)
+                    clusters[i*numCoords + j] = objects[i*numCoords + j];
 
         // check initial cluster centers for repetition 
         if (check_repeated_clusters(numClusters, numCoords, clusters) == 0) {
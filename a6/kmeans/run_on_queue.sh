@@ -34,15 +34,34 @@ COORDS=16
 CLUSTERS=32
 LOOPS=10
 
+## K-means|| initialisation: qsub -v INIT=1 run_on_queue.sh
+INIT=${INIT:-0}
+INIT_FLAG=""
+INIT_TAG=""
+if [ "$INIT" = "1" ]; then
+    INIT_FLAG="-i"
+    INIT_TAG="_init"
+fi
+
+## Incremental centre updates, full recompute every RECOMPUTE loops (0 = first loop only):
+## qsub -v RECOMPUTE=10 run_on_queue.sh
+RECOMPUTE=${RECOMPUTE:-1}
+RECOMPUTE_FLAG=""
+RECOMPUTE_TAG=""
+if [ "$RECOMPUTE" != "1" ]; then
+    RECOMPUTE_FLAG="-u $RECOMPUTE"
+    RECOMPUTE_TAG="_u${RECOMPUTE}"
+fi
+
 echo "Starting K-Means Benchmarks..."
-echo "Config: Size=$SIZE, Coords=$COORDS, Clusters=$CLUSTERS, Loops=$LOOPS"
+echo "Config: Size=$SIZE, Coords=$COORDS, Clusters=$CLUSTERS, Loops=$LOOPS, Init=$INIT, Recompute=$RECOMPUTE"
 
 ## Loop for different number of processes
 for p in 1 2 4 8 16 32 64; do
     echo "Running with $p processes..."
     
     # Δημιουργία ονόματος αρχείου εξόδου
-    OUT_FILE="benchmarks_kmeans/kmeans_np${p}.txt"
+    OUT_FILE="benchmarks_kmeans/kmeans_np${p}${RECOMPUTE_TAG}${INIT_TAG}.txt"
     
     # Εκτέλεση MPI
     # --mca btl tcp,self: Απαραίτητο για τα clones (αποφυγή sm BTL σε network filesystem)
@@ -51,6 +70,8 @@ for p in 1 2 4 8 16 32 64; do
         -n $COORDS \
         -c $CLUSTERS \
         -l $LOOPS \
+        $RECOMPUTE_FLAG \
+        $INIT_FLAG \
         > $OUT_FILE
         
     echo "Finished $p processes. Output saved to $OUT_FILE"